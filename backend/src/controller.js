@@ -11,6 +11,9 @@ import { generatePersonalizedEmail, generateCustomEmail } from "./ai.service.js"
 import { rateLimiter } from "./rateLimiter.service.js";
 import { sendEmailWithTracking } from "./resend.service.js";
 
+// email_source values of scraper addresses that Hunter hasn't confirmed
+const UNVERIFIED_EMAIL_SOURCES = ['pattern', 'author_page'];
+
 export const generateEmail = async (req, res) => {
   const { referenceContent, objective, tone, length, companyInfo, journalistId } = req.body;
 
@@ -134,6 +137,13 @@ export const startCampaign = async (req, res) => {
         );
         continue;
     }
+    // Addresses inferred from the domain's pattern or read off publisher pages aren't verified
+    if (UNVERIFIED_EMAIL_SOURCES.includes(journalistData.email_source)) {
+        console.log(
+        ` Saved ${j.first_name} ${j.last_name} but skipping email (unverified, source: ${journalistData.email_source})`
+        );
+        continue;
+    }
     const article = journalist.recent_articles?.[0];
 
     // Generate AI email using actual company name from company_info
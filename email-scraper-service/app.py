@@ -1,23 +1,103 @@
-from fastapi import FastAPI, Query
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-from run_scraper import scrape_journalists_from_publishers
+from fastapi.responses import StreamingResponse, PlainTextResponse
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
+from pydantic import BaseModel
+from typing import List, Optional
+import json
 import os
-import requests
 from dotenv import load_dotenv
 from pathlib import Path
 
-# Load .env from root directory
+# Load .env from root directory before importing modules that read their settings from it
 root_env = Path(__file__).parent.parent / ".env"
 load_dotenv(root_env)
 
+# The service's modules are imported here, but each imports its heavy third-party libraries on
+# first use: aiohttp (async_http, async_scraper, email_finder), requests (run_scraper and
+# enrichment, on the sync path only), feedparser (feed_parser's fallback parser) and tracemalloc
+# (journalists' CLI). benchmark.py --startup checks that importing the app leaves them unloaded.
+from run_scraper import (
+    scrape_journalists_from_publishers,
+    scrape_journalists_for_queries,
+    iter_journalists_from_publishers,
+    new_scrape_stats,
+    MATCH_MODES,
+    FEED_TIMEOUT,
+)
+from enrichment import (
+    enrich_journalists,
+    enrich_journalists_async,
+    enrich_journalist_lists,
+    enrich_journalist_lists_async,
+    iter_enrich_journalists,
+    iter_enrich_journalists_async,
+    new_enrichment_stats,
+    print_enrichment_summary,
+    hunter_quota,
+)
+from identity_index import merge_journalists, merge_journalists_async, IdentityMerger, IDENTITY_RESOLUTION
+from ranking import top_journalists, rank_enriched, SCRAPE_LIMIT, SCRAPE_MIN_SCORE
+from jobs import job_manager, JobQueueFull
+from feed_scheduler import feed_scheduler, FEED_SCHEDULER_ENABLED
+from feed_cache import feed_cache
+from article_store import get_article_store
+from publishers import publisher_registry
+from feed_health import feed_health
+from async_http import close_session
+from shared_cache import WEB_CONCURRENCY
+from email_finder import author_page_crawler
+from warmup import warm_up, STARTUP_WARMUP
+import async_scraper
+import metrics
+
 HUNTER_API_KEY = os.getenv("HUNTER_API_KEY")
+MAX_BATCH_QUERIES = int(os.getenv("MAX_BATCH_QUERIES", 25))
+# Scrape endpoints run on the event loop (shared async HTTP session, blocking work on a
+# small worker pool); "false" runs the thread-per-feed sync path on the request thread pool
+SCRAPE_ASYNC = os.getenv("SCRAPE_ASYNC", "true").lower() != "false"
 print("=" * 50)
 print("Email Scraper Service Starting...")
 print(f"Environment file: {root_env}")
 print(f"HUNTER_API_KEY loaded: {'Yes' if HUNTER_API_KEY else 'No'}")
 print("=" * 50)
 
-app = FastAPI()
+metrics.registry.gauge(
+    "scraper_feed_cache_requests_total", "Feed cache lookups by result",
+    lambda: {(result,): feed_cache.stats()[result] for result in ("hits", "revalidated", "misses", "adopted")},
+    labels=("result",), kind="counter",
+)
+metrics.registry.gauge("scraper_feed_cache_bytes", "Raw feed bytes held in the feed cache",
+                       lambda: feed_cache.stats()["bytes"])
+metrics.registry.gauge("scraper_hunter_quota_used", "Hunter.io calls counted against this month's quota",
+                       lambda: hunter_quota.used)
+metrics.registry.gauge("scraper_hunter_quota_remaining", "Hunter.io calls left this month (absent when unlimited)",
+                       hunter_quota.remaining)
+metrics.registry.gauge("scraper_article_store_articles", "Articles in the article store",
+                       lambda: get_article_store().stats()["articles"])
+metrics.registry.gauge("scraper_scheduler_failing_feeds", "Scheduled feeds whose last poll failed",
+                       lambda: feed_scheduler.status()["failing"])
+metrics.registry.gauge("scraper_feed_circuits_open", "Feeds skipped by an open circuit breaker",
+                       feed_health.open_count)
+metrics.registry.gauge("scraper_publishers", "Publishers in the loaded publisher registry",
+                       lambda: len(publisher_registry.index()))
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # Before uvicorn reports startup complete and accepts connections
+    if STARTUP_WARMUP:
+        await warm_up(SCRAPE_ASYNC)
+    if FEED_SCHEDULER_ENABLED:
+        feed_scheduler.start()
+    yield
+    feed_scheduler.stop()
+    await close_session()
+    await run_in_threadpool(author_page_crawler.close)
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -26,108 +106,256 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-def find_email_with_hunter(first_name, last_name, domain):
-    if not HUNTER_API_KEY:
-        print(f" HUNTER_API_KEY missing for {first_name} {last_name}")
-        return None, 0, "missing_api_key"
-
-    url = "https://api.hunter.io/v2/email-finder"
-    params = {
-        "first_name": first_name,
-        "last_name": last_name,
-        "domain": domain,
-        "api_key": HUNTER_API_KEY
-    }
+def check_match_mode(match):
+    if match is not None and match not in MATCH_MODES:
+        raise HTTPException(status_code=400, detail=f"match must be one of: {', '.join(MATCH_MODES)}")
 
-    try:
-        print(f"  [{params.get('first_name', '')} {params.get('last_name', '')}] Searching Hunter @ {domain}")
-        res = requests.get(url, params=params, timeout=5)
-        data = res.json()
-
-        if not res.ok:
-            print(f"Hunter API error: {data}")
-            return None, 0, "api_error"
-
-        if data.get("data") and data["data"].get("email"):
-            email = data["data"]["email"]
-            score = data["data"].get("score", 0)
-            print(f"    ✓ Found: {email} (score: {score})")
-            return (email, score, "hunter")
-        else:
-            print(f"    ✗ Not found")
-    except Exception as e:
-        print(f"Hunter error for {first_name} {last_name}: {e}")
 
-    return None, 0, "not_found"
+async def run_scrape_step(async_fn, sync_fn, *args, **kwargs):
+    """Await `async_fn`, or run `sync_fn` on the request thread pool when SCRAPE_ASYNC is off"""
+    if SCRAPE_ASYNC:
+        return await async_fn(*args, **kwargs)
+    return await run_in_threadpool(sync_fn, *args, **kwargs)
+
+
+def check_ranking(limit, min_score):
+    if limit < 0:
+        raise HTTPException(status_code=400, detail="limit must not be negative")
+    if min_score < 0:
+        raise HTTPException(status_code=400, detail="min_score must not be negative")
+
+
+async def merge_identities(journalists):
+    """One record per person across publications and spellings (see identity_index)"""
+    merged = await run_scrape_step(merge_journalists_async, merge_journalists, journalists)
+    if len(merged) < len(journalists):
+        print(f"Merged {len(journalists)} bylines into {len(merged)} journalists")
+    return merged
+
 
 @app.get("/scrape")
-def scrape_journalists(topic: str = Query(...), geography: str = Query(None)):
+async def scrape_journalists(topic: str = Query(...), geography: str = Query(None), match: str = Query(None),
+                             live: bool = Query(False), debug: bool = Query(False),
+                             limit: int = Query(SCRAPE_LIMIT), min_score: float = Query(SCRAPE_MIN_SCORE)):
+    """
+    Scrape journalists for a topic, most relevant first.
+    The same person's bylines at several publications are one record (at
+    the publication they wrote the most for), listing every publication
+    under "affiliations", and are enriched once.
+    Journalists are ranked by keyword hits (title over summary), matched
+    article count and recency; only the `limit` best (all when 0) scoring at
+    least `min_score` are enriched and returned, verified emails first among
+    similar scores. Each record carries its "relevance_score".
+    While the feed scheduler runs, feeds it has indexed are answered from the
+    article store; live=true fetches every feed inline instead.
+    debug=true wraps the result as {"journalists": [...], "timings": {...}, "enrichment": {...}}.
+    """
+    timings = metrics.Timings()
+    check_match_mode(match)
+    check_ranking(limit, min_score)
     print(f"\n{'='*60}")
     print(f"Starting scrape for topic: {topic}")
     if geography:
         print(f"Filtering by geography: {geography}")
     print(f"{'='*60}\n")
 
-    journalists = scrape_journalists_from_publishers(topic, geography)
+    journalists = await run_scrape_step(
+        async_scraper.scrape_journalists_from_publishers, scrape_journalists_from_publishers,
+        topic, geography, match, live=live or not feed_scheduler.running, timings=timings
+    )
     print(f"\nFound {len(journalists)} journalists from scraper\n")
-
-    enriched = []
-    MIN_CONFIDENCE = 70
-    stats = {"verified": 0, "low_confidence": 0, "fallback": 0, "not_found": 0}
+    if IDENTITY_RESOLUTION:
+        journalists = await merge_identities(journalists)
+    found = len(journalists)
+    journalists = top_journalists(journalists, limit, min_score)
+    if len(journalists) < found:
+        print(f"Kept the {len(journalists)} most relevant journalists")
 
     print(f"\nEnriching {len(journalists)} journalists with Hunter.io...")
-    for idx, j in enumerate(journalists, 1):
-        # Skip Hunter if no real author name
-        if not j["first_name"] or not j["last_name"]:
-            enriched.append({
-                **j,
-                "email": f"editor@{j['domain']}",
-                "email_confidence": 0,
-                "email_source": "fallback"
-            })
-            stats["fallback"] += 1
-            continue
-
-        email, confidence, source = find_email_with_hunter(
-            j["first_name"],
-            j["last_name"],
-            j["domain"]
-        )
-
-        # Reject low-confidence emails
-        if not email or confidence < MIN_CONFIDENCE:
-            enriched.append({
-                **j,
-                "email": f"editor@{j['domain']}",
-                "email_confidence": confidence,
-                "email_source": "low_confidence"
-            })
-            if confidence == 0:
-                stats["not_found"] += 1
+    enriched, stats = await run_scrape_step(
+        enrich_journalists_async, enrich_journalists, journalists, timings=timings
+    )
+    print_enrichment_summary(stats, len(enriched))
+    enriched = [j.to_dict() for j in rank_enriched(enriched)]
+
+    if debug:
+        return {"journalists": enriched, "timings": timings.to_dict(), "enrichment": stats}
+    return enriched
+
+@app.get("/scrape/stream")
+async def scrape_journalists_stream(topic: str = Query(...), geography: str = Query(None),
+                                    match: str = Query(None), live: bool = Query(False),
+                                    debug: bool = Query(False)):
+    """
+    Streaming variant of /scrape (NDJSON).
+    Emits {"type": "journalist", "journalist": {...}} as soon as each journalist's
+    feed is parsed and email resolved. A person found again at another
+    publication later in the scrape isn't enriched or emitted again; their
+    first record gains the affiliation and is re-sent as
+    {"type": "journalist_update", "journalist": {...}} before the final
+    {"type": "summary", "scraping": {...}, "enrichment": {...}} record
+    (with a "timings" block when debug=true).
+    """
+    check_match_mode(match)
+    print(f"\n{'='*60}")
+    print(f"Starting streaming scrape for topic: {topic}")
+    if geography:
+        print(f"Filtering by geography: {geography}")
+    print(f"{'='*60}\n")
+
+    async def generate():
+        scrape_stats = new_scrape_stats()
+        enrichment_stats = new_enrichment_stats()
+        timings = metrics.Timings()
+        scrape = (async_scraper.iter_journalists_from_publishers if SCRAPE_ASYNC
+                  else iter_journalists_from_publishers)
+        feeds = scrape(topic, geography, scrape_stats, match, live=live or not feed_scheduler.running,
+                       timings=timings)
+        merger = IdentityMerger() if IDENTITY_RESOLUTION else None
+        if SCRAPE_ASYNC:
+            if merger:
+                batches = (await merger.merge_async(journalists) async for _, journalists in feeds)
             else:
-                stats["low_confidence"] += 1
-            continue
+                batches = (journalists async for _, journalists in feeds)
+            records = iter_enrich_journalists_async(batches, enrichment_stats, timings=timings)
+        else:
+            batches = (merger.merge(journalists) if merger else journalists for _, journalists in feeds)
+            records = iterate_in_threadpool(iter_enrich_journalists(batches, enrichment_stats, timings=timings))
+
+        total = 0
+        async for record in records:
+            total += 1
+            yield json.dumps({"type": "journalist", "journalist": record.to_dict()}) + "\n"
+        for record in merger.updated if merger else ():
+            yield json.dumps({"type": "journalist_update", "journalist": record.to_dict()}) + "\n"
+
+        print_enrichment_summary(enrichment_stats, total)
+        summary = {
+            "type": "summary",
+            "total": total,
+            "scraping": scrape_stats,
+            "enrichment": enrichment_stats,
+        }
+        if debug:
+            summary["timings"] = timings.to_dict()
+        yield json.dumps(summary) + "\n"
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+class ScrapeQuery(BaseModel):
+    topic: str
+    geography: Optional[str] = None
+
+
+class BatchScrapeRequest(BaseModel):
+    queries: List[ScrapeQuery]
+    match: Optional[str] = None
+    live: bool = False
+    debug: bool = False
+    limit: int = SCRAPE_LIMIT
+    min_score: float = SCRAPE_MIN_SCORE
+
 
-        enriched.append({
-            **j,
-            "email": email,
-            "email_confidence": confidence,
-            "email_source": source
-        })
-        stats["verified"] += 1
+@app.post("/scrape/batch")
+async def scrape_journalists_batch(request: BatchScrapeRequest):
+    """
+    Scrape several (topic, geography) queries with one fetch pass.
+    Each needed feed is fetched once and matched against every query, and a
+    journalist found by several queries is enriched once. Each query's
+    journalists are merged across publications, ranked and cut to `limit` /
+    `min_score` as in /scrape.
+    Returns {"results": [{"topic", "geography", "journalists", "scraping"}, ...], "enrichment": {...}}.
+    """
+    if not request.queries:
+        raise HTTPException(status_code=400, detail="queries must not be empty")
+    if len(request.queries) > MAX_BATCH_QUERIES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_QUERIES} queries per batch")
+    check_match_mode(request.match)
+    check_ranking(request.limit, request.min_score)
 
+    queries = [(q.topic, q.geography) for q in request.queries]
     print(f"\n{'='*60}")
-    print(f" Enrichment Summary:")
-    print(f" Verified emails (>={MIN_CONFIDENCE}% confidence): {stats['verified']}")
-    print(f" Low confidence emails: {stats['low_confidence']}")
-    print(f" No email found: {stats['not_found']}")
-    print(f" Fallback emails: {stats['fallback']}")
-    print(f" Total journalists: {len(enriched)}")
+    print(f"Starting batch scrape for {len(queries)} queries")
     print(f"{'='*60}\n")
 
-    return enriched
+    timings = metrics.Timings()
+    scraped = await run_scrape_step(
+        async_scraper.scrape_journalists_for_queries, scrape_journalists_for_queries,
+        queries, request.match, live=request.live or not feed_scheduler.running, timings=timings
+    )
+    journalist_lists = [journalists for journalists, _ in scraped]
+    if IDENTITY_RESOLUTION:
+        journalist_lists = [await merge_identities(journalists) for journalists in journalist_lists]
+    enriched_lists, stats = await run_scrape_step(
+        enrich_journalist_lists_async, enrich_journalist_lists,
+        [top_journalists(journalists, request.limit, request.min_score) for journalists in journalist_lists],
+        timings=timings
+    )
+    distinct = sum(stats[bucket] for bucket in
+                   ("verified", "unverified", "low_confidence", "not_found", "fallback"))
+    print_enrichment_summary(stats, distinct)
+
+    response = {
+        "results": [
+            {"topic": topic, "geography": geography,
+             "journalists": [j.to_dict() for j in rank_enriched(journalists)],
+             "scraping": scrape_stats}
+            for (topic, geography), journalists, (_, scrape_stats) in zip(queries, enriched_lists, scraped)
+        ],
+        "enrichment": stats,
+    }
+    if request.debug:
+        response["timings"] = timings.to_dict()
+    return response
+
+@app.post("/scrape/jobs", status_code=202)
+def create_scrape_job(topic: str = Query(...), geography: str = Query(None)):
+    """Start a background scrape; identical in-flight jobs are shared"""
+    try:
+        job, coalesced = job_manager.submit(topic, geography)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    return {**job.to_dict(), "coalesced": coalesced}
+
+@app.get("/scrape/jobs/{job_id}")
+def get_scrape_job(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+@app.get("/scrape/jobs/{job_id}/results")
+def get_scrape_job_results(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status == "failed":
+        raise HTTPException(status_code=500, detail=f"Job failed: {job.error}")
+    if not job.finished:
+        raise HTTPException(status_code=409, detail=f"Job is still {job.status}")
+    return job.result_dicts()
+
+@app.get("/scheduler")
+def get_feed_scheduler_status():
+    """Polling interval, failures and last outcome of every scheduled feed"""
+    return feed_scheduler.status()
+
+@app.get("/feeds/health")
+def get_feed_health():
+    """Latency percentiles, error rate, adaptive timeout, health score and circuit state per feed, worst first"""
+    return feed_health.status(FEED_TIMEOUT)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Prometheus text format: stage timings, feed failures, cache and Hunter counters"""
+    return metrics.registry.render()
 
 if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("PORT", 5001))
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    if WEB_CONCURRENCY > 1:
+        # Worker processes import the app themselves and share state through shared_cache
+        uvicorn.run("app:app", host="0.0.0.0", port=port, workers=WEB_CONCURRENCY)
+    else:
+        uvicorn.run(app, host="0.0.0.0", port=port)
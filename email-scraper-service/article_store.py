@@ -0,0 +1,291 @@
+import calendar
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+ARTICLE_STORE_PATH = os.getenv(
+    "ARTICLE_STORE_PATH",
+    str(Path(__file__).parent / "article_store.sqlite3")
+)
+# Articles are searchable for 7 days after they were published (or first seen)
+ARTICLE_RETENTION = int(os.getenv("ARTICLE_RETENTION", 7 * 24 * 3600))
+
+# A re-indexed feed that brought nothing new is written to the file at most this often (seconds)
+_FEED_RECORD_INTERVAL = 60
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text):
+    return set(_TOKEN_RE.findall((text or "").lower()))
+
+
+def entry_guid(entry):
+    return entry.get("id") or entry.get("link") or entry.get("title", "")
+
+
+def entry_published_ts(entry):
+    parsed = entry.get("published_parsed") or entry.get("updated_parsed")
+    if parsed:
+        try:
+            return calendar.timegm(parsed)
+        except (TypeError, ValueError):
+            pass
+    return None
+
+
+class Article:
+    __slots__ = ("id", "feed_url", "guid", "title", "url", "published", "published_ts",
+                 "author", "terms", "first_seen")
+
+    def __init__(self, id, feed_url, guid, title, url, published, published_ts, author,
+                 terms, first_seen):
+        self.id = id
+        self.feed_url = feed_url
+        self.guid = guid
+        self.title = title
+        self.url = url
+        self.published = published
+        self.published_ts = published_ts
+        self.author = author
+        self.terms = terms
+        self.first_seen = first_seen
+
+    @property
+    def sort_ts(self):
+        return self.published_ts or self.first_seen
+
+    def to_dict(self, keywords=()):
+        return {
+            "title": self.title,
+            "url": self.url,
+            "published": self.published,
+            "published_ts": self.published_ts,
+            "author": self.author,
+            "matched_keywords": [k for k in keywords if k in self.terms],
+        }
+
+
+class ArticleStore:
+    """
+    Articles seen in publisher feeds, persisted in SQLite, with an in-memory
+    inverted index (term -> article ids) over title and summary.
+    Feeds are indexed incrementally: only entries not seen before are added,
+    and articles older than the retention window are dropped. Worker
+    processes sharing the file pick up each other's articles with sync().
+    """
+
+    def __init__(self, path=ARTICLE_STORE_PATH, retention=ARTICLE_RETENTION):
+        self.path = path
+        self.retention = retention
+        self._lock = threading.Lock()
+        self._articles = {}
+        self._by_guid = {}
+        self._by_feed = {}
+        self._postings = {}
+        self._indexed_feeds = {}
+        self._indexed_at = {}
+        self._recorded_at = {}
+        # Highest article id read from the file; rows other processes add come after it
+        self._synced_id = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS articles (
+                id INTEGER PRIMARY KEY,
+                feed_url TEXT NOT NULL,
+                guid TEXT NOT NULL,
+                title TEXT NOT NULL,
+                url TEXT NOT NULL,
+                published TEXT NOT NULL,
+                published_ts REAL,
+                author TEXT NOT NULL,
+                terms TEXT NOT NULL,
+                first_seen REAL NOT NULL,
+                UNIQUE (feed_url, guid)
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS feeds (
+                feed_url TEXT PRIMARY KEY,
+                indexed_at REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+        self._load()
+
+    def _load(self):
+        self._read_rows()
+        self._prune()
+
+    def _read_articles(self, where, params):
+        rows = self._conn.execute(
+            "SELECT id, feed_url, guid, title, url, published, published_ts, author, terms, first_seen "
+            f"FROM articles WHERE {where} ORDER BY id", params
+        ).fetchall()
+        for row in rows:
+            if row[0] not in self._articles:
+                self._add(Article(*row[:8], set(row[8].split()), row[9]))
+        return rows
+
+    def _read_rows(self):
+        rows = self._read_articles("id > ?", (self._synced_id,))
+        if rows:
+            self._synced_id = rows[-1][0]
+        for feed_url, indexed_at in self._conn.execute("SELECT feed_url, indexed_at FROM feeds"):
+            if indexed_at > self._indexed_at.get(feed_url, 0):
+                self._indexed_at[feed_url] = indexed_at
+        return bool(rows)
+
+    def sync(self):
+        """Load the articles and feed index times other processes wrote since the last sync"""
+        with self._lock:
+            if self._read_rows():
+                self._prune()
+
+    def _add(self, article):
+        self._articles[article.id] = article
+        self._by_guid[(article.feed_url, article.guid)] = article.id
+        self._by_feed.setdefault(article.feed_url, set()).add(article.id)
+        for term in article.terms:
+            self._postings.setdefault(term, set()).add(article.id)
+
+    def _remove(self, article_id):
+        article = self._articles.pop(article_id)
+        del self._by_guid[(article.feed_url, article.guid)]
+        self._by_feed[article.feed_url].discard(article_id)
+        for term in article.terms:
+            ids = self._postings.get(term)
+            if ids is not None:
+                ids.discard(article_id)
+                if not ids:
+                    del self._postings[term]
+
+    def update_feed(self, pub, feed, extract_author):
+        """
+        Index the entries of a freshly fetched feed.
+        A feed object that was already indexed (e.g. served from the feed cache)
+        is skipped. Returns the number of new articles.
+        """
+        feed_url = pub["rss"]
+        with self._lock:
+            now = time.time()
+            self._indexed_at[feed_url] = now
+            if self._indexed_feeds.get(feed_url) is feed:
+                if now - self._recorded_at.get(feed_url, 0) >= _FEED_RECORD_INTERVAL:
+                    self._record_feed(feed_url, now)
+                    self._conn.commit()
+                return 0
+
+            self._record_feed(feed_url, now)
+            rows = []
+            for entry in feed.entries:
+                guid = entry_guid(entry)
+                if not guid or (feed_url, guid) in self._by_guid:
+                    continue
+                terms = tokenize(f"{entry.get('title', '')} {entry.get('summary', '')}")
+                rows.append((
+                    feed_url,
+                    guid,
+                    entry.get("title", ""),
+                    entry.get("link", ""),
+                    entry.get("published", ""),
+                    entry_published_ts(entry),
+                    extract_author(entry, pub["author_fields"]),
+                    terms,
+                    now,
+                ))
+
+            stored_elsewhere = []
+            for row in rows:
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO articles "
+                    "(feed_url, guid, title, url, published, published_ts, author, terms, first_seen) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (*row[:7], " ".join(sorted(row[7])), row[8])
+                )
+                if cursor.rowcount:
+                    self._add(Article(cursor.lastrowid, *row))
+                else:
+                    stored_elsewhere.append(row[1])
+            if stored_elsewhere:
+                # Another process indexed them since this one last synced
+                self._read_articles(
+                    f"feed_url = ? AND guid IN ({', '.join('?' * len(stored_elsewhere))})",
+                    (feed_url, *stored_elsewhere)
+                )
+
+            self._prune()
+            self._conn.commit()
+            self._indexed_feeds[feed_url] = feed
+        return len(rows)
+
+    def _record_feed(self, feed_url, indexed_at):
+        # For other processes' is_fresh()
+        self._recorded_at[feed_url] = indexed_at
+        self._conn.execute(
+            "INSERT OR REPLACE INTO feeds (feed_url, indexed_at) VALUES (?, ?)", (feed_url, indexed_at)
+        )
+
+    def _prune(self):
+        cutoff = time.time() - self.retention
+        expired = [a.id for a in self._articles.values() if a.sort_ts < cutoff]
+        for article_id in expired:
+            self._remove(article_id)
+        if expired:
+            self._conn.execute(
+                "DELETE FROM articles WHERE COALESCE(published_ts, first_seen) < ?", (cutoff,)
+            )
+            self._conn.commit()
+
+    def is_fresh(self, feed_url, max_age):
+        """Whether the feed was indexed within `max_age` seconds (by another process: as of the last sync)"""
+        with self._lock:
+            indexed_at = self._indexed_at.get(feed_url)
+        return indexed_at is not None and time.time() - indexed_at < max_age
+
+    def feed_size(self, feed_url):
+        with self._lock:
+            return len(self._by_feed.get(feed_url, ()))
+
+    def search(self, keywords, feed_url=None):
+        """
+        Articles containing any of the keywords as a whole term, newest first,
+        with the keywords each one matched.
+        Restricted to one feed when `feed_url` is given.
+        """
+        keywords = [keyword.lower() for keyword in keywords]
+        with self._lock:
+            ids = set()
+            for keyword in keywords:
+                ids |= self._postings.get(keyword, set())
+            if feed_url is not None:
+                ids &= self._by_feed.get(feed_url, set())
+            articles = [self._articles[i] for i in ids]
+
+        articles.sort(key=lambda a: (a.sort_ts, a.id), reverse=True)
+        return [a.to_dict(keywords) for a in articles]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "articles": len(self._articles),
+                "feeds": sum(1 for ids in self._by_feed.values() if ids),
+                "terms": len(self._postings),
+            }
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_article_store():
+    """Shared store instance, opened and loaded on first use"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ArticleStore()
+    return _store
@@ -0,0 +1,98 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+# Connections the shared async session may hold open in total and per host
+# (0 = no per-host cap); idle ones are kept alive for this many seconds so
+# repeated fetches from a publisher or Hunter reuse them
+ASYNC_HTTP_MAX_CONNECTIONS = int(os.getenv("ASYNC_HTTP_MAX_CONNECTIONS", 200))
+ASYNC_HTTP_CONNECTIONS_PER_HOST = int(os.getenv("ASYNC_HTTP_CONNECTIONS_PER_HOST", 0))
+ASYNC_HTTP_KEEPALIVE = float(os.getenv("ASYNC_HTTP_KEEPALIVE", 30))
+# Threads running the blocking parts of async scrapes (feed parsing, topic
+# matching, name parsing, SQLite) so the event loop stays responsive
+ASYNC_WORKERS = int(os.getenv("ASYNC_WORKERS", 4))
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+
+# aiohttp is imported where it is used rather than here: it is the slowest import
+# after FastAPI, and startup shouldn't pay for it before the first request (or warm-up)
+
+_session = None
+_session_loop = None
+# key -> task of the call single_flight is running for it
+_in_flight = {}
+_executor = ThreadPoolExecutor(max_workers=max(1, ASYNC_WORKERS), thread_name_prefix="async-work")
+
+
+def get_session():
+    """
+    The process-wide aiohttp session for feeds and Hunter, created on first
+    use in the running event loop. Its connector pools connections per host
+    and keeps them alive between requests.
+    """
+    global _session, _session_loop
+    import aiohttp
+
+    loop = asyncio.get_running_loop()
+    if _session is None or _session.closed or _session_loop is not loop:
+        _session_loop = loop
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=ASYNC_HTTP_MAX_CONNECTIONS,
+                limit_per_host=ASYNC_HTTP_CONNECTIONS_PER_HOST,
+                keepalive_timeout=ASYNC_HTTP_KEEPALIVE,
+            ),
+            headers={"User-Agent": USER_AGENT},
+        )
+    return _session
+
+
+async def close_session():
+    global _session, _session_loop
+    if _session is not None:
+        session, _session, _session_loop = _session, None, None
+        await session.close()
+
+
+async def http_get(url, timeout, headers=None, params=None, raise_for_status=False):
+    """
+    GET `url` on the shared session; returns (status, headers, body bytes).
+    `timeout` bounds connecting and each read, like requests' timeout; time
+    spent waiting for a free pooled connection is not counted, as under load
+    that is queueing in this process rather than a slow host.
+    """
+    import aiohttp
+
+    client_timeout = aiohttp.ClientTimeout(total=None, sock_connect=timeout, sock_read=timeout)
+    async with get_session().get(url, headers=headers, params=params, timeout=client_timeout,
+                                 raise_for_status=raise_for_status) as response:
+        return response.status, response.headers, await response.read()
+
+
+async def run_blocking(fn, *args, **kwargs):
+    """Run `fn` on the worker pool and await its result"""
+    return await asyncio.get_running_loop().run_in_executor(_executor, partial(fn, *args, **kwargs))
+
+
+async def single_flight(key, fn, *args):
+    """
+    Await fn(*args), sharing one call among concurrent callers with the same
+    key, so simultaneous scrapes fetch a cold feed or look up a journalist
+    once. Returns (result, shared), shared being True for callers that joined
+    a call already in flight. Cancelling one caller leaves the call running
+    for the others.
+    """
+    task = _in_flight.get(key)
+    shared = task is not None
+    if not shared:
+        task = _in_flight[key] = asyncio.ensure_future(fn(*args))
+        task.add_done_callback(partial(_landed, key))
+    return await asyncio.shield(task), shared
+
+
+def _landed(key, task):
+    _in_flight.pop(key, None)
+    if not task.cancelled():
+        # Retrieved here so a failure nobody is left waiting for isn't logged as unhandled
+        task.exception()
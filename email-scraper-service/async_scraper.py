@@ -0,0 +1,207 @@
+import asyncio
+import time
+
+import metrics
+from async_http import http_get, run_blocking, single_flight
+from feed_cache import feed_cache
+from feed_health import feed_health
+from shared_cache import get_shared_cache
+from run_scraper import (
+    FEED_TIMEOUT,
+    MAX_FETCH_WORKERS,
+    SCRAPE_DEADLINE,
+    build_topic_keywords,
+    collect_journalists,
+    feed_result,
+    journalists_from_feeds,
+    match_queries,
+    new_scrape_stats,
+    parse_and_cache_feed,
+    plan_queries,
+    print_scrape_stats,
+    report_fetches,
+    reuse_feed,
+    select_publishers,
+    skip_open_circuits,
+    stored_feeds,
+)
+
+# Async counterparts of run_scraper's scrape functions, for the API's event
+# loop. Feeds are fetched on the shared keep-alive session instead of a thread
+# per feed; parsing, matching and article store queries run on the async_http
+# worker pool. Results, stats and output match the sync functions.
+
+
+async def fetch_feed(rss_url, timeout=10, ttl=None, publisher=None, timings=None):
+    """
+    fetch_feed_with_timeout on the shared async session: served from the feed
+    cache while fresh, revalidated with a conditional GET once stale.
+    Concurrent scrapes needing the same stale feed share one request, and
+    other workers wait for it and reuse what it fetched.
+    """
+    cached, fresh = feed_cache.get(rss_url, ttl)
+    if fresh:
+        return cached.feed
+
+    started = time.perf_counter()
+    feed, shared = await single_flight(
+        ("feed", rss_url), _fetch_shared_feed, rss_url, ttl, timeout, publisher, timings
+    )
+    if shared and timings is not None:
+        timings.add("fetch", time.perf_counter() - started, publisher)
+    return feed
+
+
+async def _fetch_shared_feed(rss_url, ttl, timeout, publisher, timings):
+    # Held for the fetch plus parsing, as in fetch_feed_with_timeout
+    async with get_shared_cache().lock_async(f"feed:{rss_url}", timeout + 5):
+        cached, feed = await run_blocking(reuse_feed, rss_url, ttl, publisher, timings)
+        if feed is not None:
+            return feed
+        return await _fetch_feed(rss_url, cached, timeout, publisher, timings)
+
+
+async def _fetch_feed(rss_url, cached, timeout, publisher, timings):
+    import aiohttp
+
+    headers = cached.conditional_headers() if cached else {}
+    try:
+        started = time.perf_counter()
+        with metrics.span("fetch", publisher, timings):
+            status, response_headers, content = await http_get(
+                rss_url, timeout, headers=headers, raise_for_status=True
+            )
+        fetch_seconds = time.perf_counter() - started
+        feed_health.record_success(rss_url, fetch_seconds, publisher)
+        if status == 304 and cached:
+            # Publishes the refreshed entry to the shared cache when workers share feeds
+            await run_blocking(feed_cache.touch, rss_url)
+            return cached.feed
+    except asyncio.TimeoutError:
+        feed_health.record_failure(rss_url, f"timed out after {timeout:g}s", publisher)
+        raise TimeoutError(f"Feed fetch timed out after {timeout:g}s")
+    except aiohttp.ClientError as e:
+        feed_health.record_failure(rss_url, e, publisher)
+        raise Exception(f"Failed to fetch feed: {str(e)}")
+
+    return await run_blocking(parse_and_cache_feed, rss_url, content, response_headers, publisher, timings)
+
+
+async def iter_feeds(publishers, timeout=FEED_TIMEOUT, max_fetches=MAX_FETCH_WORKERS,
+                     deadline=SCRAPE_DEADLINE, timings=None):
+    """
+    Fetch the RSS feeds of several publishers concurrently, as run_scraper.iter_feeds.
+    Up to `max_fetches` requests per scrape are in flight at once, so
+    concurrent scrapes share the connection pool fairly. Yields (publisher,
+    parsed feed) in completion order until the deadline; fetches still
+    running then are cancelled.
+    """
+    publishers = skip_open_circuits(publishers)
+    if not publishers:
+        return
+
+    started = time.monotonic()
+    fetched = 0
+    limit = asyncio.Semaphore(max(1, max_fetches))
+
+    async def fetch(pub):
+        async with limit:
+            return await fetch_feed(
+                pub["rss"], feed_health.timeout_for(pub["rss"], timeout), pub.get("cache_ttl"), pub["name"], timings
+            )
+
+    tasks = {asyncio.ensure_future(fetch(pub)): pub for pub in publishers}
+    pending = set(tasks)
+
+    try:
+        while pending:
+            remaining = deadline - (time.monotonic() - started)
+            if remaining <= 0:
+                break
+
+            done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                pub = tasks[task]
+                feed = feed_result(pub, task)
+                if feed is not None:
+                    fetched += 1
+                    yield pub, feed
+    finally:
+        for task in pending:
+            task.cancel()
+
+    report_fetches(publishers, fetched, [tasks[task] for task in pending], deadline, started)
+
+
+async def fetch_feeds_concurrently(publishers, timeout=FEED_TIMEOUT, max_fetches=MAX_FETCH_WORKERS,
+                                   deadline=SCRAPE_DEADLINE, timings=None):
+    """Fetch feeds concurrently; returns a dict of rss url -> parsed feed (see iter_feeds)"""
+    return {
+        pub["rss"]: feed
+        async for pub, feed in iter_feeds(publishers, timeout, max_fetches, deadline, timings)
+    }
+
+
+async def scrape_journalists_from_publishers(topic: str, geography: str = None, match_mode: str = None,
+                                             live: bool = True, timings=None):
+    """Find journalists writing about `topic`, as run_scraper.scrape_journalists_from_publishers"""
+    topic_keywords = build_topic_keywords(topic)
+    print(f"Topic keywords for matching: {topic_keywords}")
+
+    publishers_to_scrape = select_publishers(geography)
+
+    stored = await run_blocking(stored_feeds, publishers_to_scrape, match_mode, live)
+    feeds = await fetch_feeds_concurrently(
+        [pub for pub in publishers_to_scrape if pub["rss"] not in stored], timings=timings
+    )
+    return await run_blocking(
+        journalists_from_feeds, publishers_to_scrape, topic_keywords, feeds, stored, match_mode, timings
+    )
+
+
+async def iter_journalists_from_publishers(topic: str, geography: str = None, stats=None,
+                                           match_mode: str = None, live: bool = True, timings=None):
+    """
+    Streaming variant of scrape_journalists_from_publishers, as
+    run_scraper.iter_journalists_from_publishers: yields (publisher,
+    journalists first seen in its feed) as each feed finishes.
+    """
+    topic_keywords = build_topic_keywords(topic)
+    print(f"Topic keywords for matching: {topic_keywords}")
+
+    publishers_to_scrape = select_publishers(geography)
+
+    journalists = {}
+    if stats is None:
+        stats = new_scrape_stats()
+    stats["feeds_total"] = len(publishers_to_scrape)
+    stats["feeds_fetched"] = 0
+    stats["feeds_from_store"] = 0
+
+    stored = await run_blocking(stored_feeds, publishers_to_scrape, match_mode, live)
+    for pub in publishers_to_scrape:
+        if pub["rss"] in stored:
+            stats["feeds_from_store"] += 1
+            yield pub, await run_blocking(
+                collect_journalists, pub, None, topic_keywords, journalists, stats, match_mode, timings
+            )
+
+    to_fetch = [pub for pub in publishers_to_scrape if pub["rss"] not in stored]
+    async for pub, feed in iter_feeds(to_fetch, timings=timings):
+        stats["feeds_fetched"] += 1
+        yield pub, await run_blocking(
+            collect_journalists, pub, feed, topic_keywords, journalists, stats, match_mode, timings
+        )
+
+    print_scrape_stats(stats)
+
+
+async def scrape_journalists_for_queries(queries, match_mode: str = None, live: bool = True, timings=None):
+    """Scrape several (topic, geography) queries with one fetch pass, as run_scraper.scrape_journalists_for_queries"""
+    plans, publishers_to_scrape = plan_queries(queries)
+    stored = await run_blocking(stored_feeds, publishers_to_scrape, match_mode, live)
+    feeds = await fetch_feeds_concurrently(
+        [pub for pub in publishers_to_scrape if pub["rss"] not in stored], timings=timings
+    )
+    return await run_blocking(match_queries, queries, plans, publishers_to_scrape, feeds, stored, match_mode,
+                              timings)
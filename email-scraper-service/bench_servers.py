@@ -0,0 +1,388 @@
+import hashlib
+import json
+import random
+import threading
+import time
+import zlib
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from email_patterns import format_email
+
+VOCABULARY = [
+    "ai", "education", "climate", "robotics", "startups", "security", "health",
+    "energy", "space", "finance", "chips", "cloud", "privacy", "mobility", "biotech",
+]
+FIRST_NAMES = ["Alex", "Sam", "Jordan", "Taylor", "Morgan", "Casey", "Riley", "Jamie", "Avery", "Quinn"]
+LAST_NAMES = ["Smith", "Garcia", "Chen", "Patel", "Okafor", "Novak", "Silva", "Kim", "Muller", "Haddad"]
+
+
+def synthetic_items(index, entries=30, seed=0):
+    """(topic words, author names) of each item in feed `index`, in feed order"""
+    rng = random.Random(f"{seed}-{index}")
+    for _ in range(entries):
+        words = rng.sample(VOCABULARY, 3)
+        authors = [f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"]
+        if rng.random() < 0.15:
+            authors.append(f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}")
+        yield words, authors
+
+
+def synthetic_feed(index, entries=30, seed=0, article_url=None):
+    """
+    RSS 2.0 document for feed `index`; the same arguments always give the same bytes.
+    `article_url(index, n)` overrides the items' links.
+    """
+    now = time.time()
+    items = []
+    for n, (words, authors) in enumerate(synthetic_items(index, entries, seed)):
+        link = article_url(index, n) if article_url else f"https://feed{index}.example.com/articles/{n}"
+        author = " and ".join(authors)
+        items.append(
+            "<item>"
+            f"<title>{words[0].title()} news: {words[1]} meets {words[2]}</title>"
+            f"<link>{link}</link>"
+            f"<guid>feed{index}-{n}</guid>"
+            f"<description>Coverage of {' and '.join(words)} from publisher {index}.</description>"
+            f"<dc:creator>{author}</dc:creator>"
+            f"<pubDate>{formatdate(now - n * 3600, usegmt=True)}</pubDate>"
+            "</item>"
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<rss version="2.0" xmlns:dc="http://purl.org/dc/elements/1.1/"><channel>'
+        f"<title>Publisher {index}</title><link>https://feed{index}.example.com/</link>"
+        f"{''.join(items)}</channel></rss>"
+    ).encode("utf-8")
+
+
+class _QuietHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body=b"", headers=None, content_type="application/xml"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+
+class _ThreadingServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Set on the class: listen() runs in the constructor. The default backlog
+    # of 5 drops SYNs when many clients connect at once, stalling each for
+    # a full 1s retransmit.
+    request_queue_size = 512
+
+
+class _StubServer:
+    def __init__(self, handler):
+        self._server = _ThreadingServer(("127.0.0.1", 0), handler)
+        self._server.stub = self
+        self._thread = None
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def count_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class _FeedHandler(_QuietHandler):
+    def do_GET(self):
+        stub = self.server.stub
+        stub.count_request()
+        try:
+            index = int(urlparse(self.path).path.rsplit("/", 1)[-1].split(".")[0])
+        except ValueError:
+            return self._send(404)
+
+        behaviour = stub.behaviour(index)
+        if behaviour == "timeout":
+            time.sleep(stub.timeout_latency)
+        elif behaviour == "slow":
+            time.sleep(stub.slow_latency)
+        elif stub.latency:
+            time.sleep(stub.latency)
+
+        if behaviour == "fail":
+            return self._send(500)
+
+        body = stub.feed_body(index)
+        etag = '"%s"' % hashlib.md5(body).hexdigest()
+        if self.headers.get("If-None-Match") == etag:
+            return self._send(304, headers={"ETag": etag})
+        self._send(200, body, {"ETag": etag})
+
+
+class FeedServer(_StubServer):
+    """
+    Serves synthetic RSS at /feed/<index>.xml.
+    A fixed share of feeds (chosen by `seed`) are slow, fail with a 500, or
+    hang for `timeout_latency` seconds; the rest answer after `latency`.
+    """
+
+    def __init__(self, entries=30, latency=0.0, slow_fraction=0.0, slow_latency=2.0,
+                 failure_fraction=0.0, timeout_fraction=0.0, timeout_latency=15.0, seed=0, article_url=None):
+        super().__init__(_FeedHandler)
+        self.entries = entries
+        self.latency = latency
+        self.slow_fraction = slow_fraction
+        self.slow_latency = slow_latency
+        self.failure_fraction = failure_fraction
+        self.timeout_fraction = timeout_fraction
+        self.timeout_latency = timeout_latency
+        self.seed = seed
+        self.article_url = article_url
+        self._bodies = {}
+
+    def feed_url(self, index):
+        return f"{self.base_url}/feed/{index}.xml"
+
+    def feed_body(self, index):
+        body = self._bodies.get(index)
+        if body is None:
+            body = self._bodies[index] = synthetic_feed(index, self.entries, self.seed, self.article_url)
+        return body
+
+    def behaviour(self, index):
+        roll = random.Random(f"{self.seed}-behaviour-{index}").random()
+        if roll < self.failure_fraction:
+            return "fail"
+        roll -= self.failure_fraction
+        if roll < self.timeout_fraction:
+            return "timeout"
+        roll -= self.timeout_fraction
+        if roll < self.slow_fraction:
+            return "slow"
+        return "normal"
+
+    def publishers(self, count):
+        """PUBLISHERS-style entries pointing at this server"""
+        regions = ["Northeast", "West Coast", "National", "Midwest", "Southeast", "International"]
+        return [
+            {
+                "name": f"Bench Publisher {i}",
+                "rss": self.feed_url(i),
+                "domain": f"feed{i}.example.com",
+                "region": regions[i % len(regions)],
+                "author_fields": ["author", "dc_creator"],
+            }
+            for i in range(count)
+        ]
+
+
+class _HunterHandler(_QuietHandler):
+    def do_GET(self):
+        stub = self.server.stub
+        stub.count_request()
+        if stub.latency:
+            time.sleep(stub.latency)
+
+        if stub.rate_limit_fraction and random.random() < stub.rate_limit_fraction:
+            with stub._lock:
+                stub.rate_limited += 1
+            body = json.dumps({"errors": [{"id": "too_many_requests"}]}).encode()
+            return self._send(429, body, {"Retry-After": str(stub.retry_after)}, "application/json")
+
+        params = parse_qs(urlparse(self.path).query)
+        first = params.get("first_name", [""])[0]
+        last = params.get("last_name", [""])[0]
+        domain = params.get("domain", [""])[0]
+        email = format_email(stub.pattern_for(domain), first, last, domain)
+        body = json.dumps({"data": {"email": email, "score": 91 if email else 0}}).encode()
+        self._send(200, body, content_type="application/json")
+
+
+class HunterServer(_StubServer):
+    """
+    Fake Hunter Email Finder: answers after `latency`, with a share of 429 replies.
+    Each domain consistently uses one of `patterns` (email_patterns names).
+    """
+
+    def __init__(self, latency=0.05, rate_limit_fraction=0.0, retry_after=0.1, patterns=("first.last",)):
+        super().__init__(_HunterHandler)
+        self.latency = latency
+        self.rate_limit_fraction = rate_limit_fraction
+        self.retry_after = retry_after
+        self.patterns = tuple(patterns)
+        self.rate_limited = 0
+
+    def pattern_for(self, domain):
+        return self.patterns[zlib.crc32(domain.encode()) % len(self.patterns)]
+
+    @property
+    def api_url(self):
+        return f"{self.base_url}/v2/email-finder"
+
+
+# Navigation, related links and footer text around the article, so pages are realistically sized
+_PAGE_PADDING = "".join(
+    f'<li><a href="/section/{word}/{n}">More {word} coverage, part {n}</a> '
+    f"Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor.</li>"
+    for n in range(60) for word in VOCABULARY[:5]
+)
+
+
+def _slug(name):
+    return name.lower().replace(" ", "-")
+
+
+class _PageHandler(_QuietHandler):
+    def do_GET(self):
+        site = self.server.stub.site
+        site.count_request()
+        if site.latency:
+            time.sleep(site.latency)
+
+        parts = urlparse(self.path).path.strip("/").split("/")
+        if parts == ["robots.txt"]:
+            body = "User-agent: *\nDisallow: /private/\n"
+            if site.crawl_delay:
+                body += f"Crawl-delay: {site.crawl_delay}\n"
+            return self._send(200, body.encode(), content_type="text/plain")
+        try:
+            index = int(parts[0])
+            if parts[1:2] == ["articles"]:
+                html = site.article_html(index, int(parts[2]))
+            elif parts[1:2] == ["authors"]:
+                html = site.author_html(index, parts[2])
+            elif parts[1:] in (["contact"], ["about"]):
+                html = site.contact_html(index)
+            else:
+                return self._send(404)
+        except (ValueError, IndexError):
+            return self._send(404)
+        self._send(200, html, content_type="text/html; charset=utf-8")
+
+
+class _PageHost(_StubServer):
+    def __init__(self, site):
+        super().__init__(_PageHandler)
+        self.site = site
+
+
+class AuthorPageServer:
+    """
+    Publisher websites for the author page crawler, one origin (port) per
+    `hosts`: article pages bylined with a link to each author's page, author
+    pages of which `email_fraction` (chosen by `seed`) publish the author's
+    first.last address, contact pages listing only shared mailboxes, and a
+    robots.txt with an optional Crawl-delay. Article URLs follow FeedServer's
+    synthetic feeds, so feeds built with `article_url=site.article_url` link here.
+    """
+
+    def __init__(self, hosts=8, latency=0.02, email_fraction=0.6, crawl_delay=None, entries=30, seed=0):
+        self.latency = latency
+        self.email_fraction = email_fraction
+        self.crawl_delay = crawl_delay
+        self.entries = entries
+        self.seed = seed
+        self._hosts = [_PageHost(self) for _ in range(max(1, hosts))]
+        self._authors = {}
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def start(self):
+        for host in self._hosts:
+            host.start()
+        return self
+
+    def stop(self):
+        for host in self._hosts:
+            host.stop()
+
+    def count_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def article_url(self, index, n):
+        return f"{self._hosts[index % len(self._hosts)].base_url}/{index}/articles/{n}"
+
+    def _items(self, index):
+        items = self._authors.get(index)
+        if items is None:
+            items = self._authors[index] = list(synthetic_items(index, self.entries, self.seed))
+        return items
+
+    def published_email(self, index, name):
+        """The address `name`'s author page at publisher `index` shows, or None"""
+        if random.Random(f"{self.seed}-page-{index}-{name}").random() >= self.email_fraction:
+            return None
+        first, last = name.split(" ", 1)
+        return format_email("first.last", first, last, f"feed{index}.example.com")
+
+    def article_html(self, index, n):
+        words, authors = self._items(index)[n]
+        byline = " and ".join(f'<a rel="author" href="/{index}/authors/{_slug(name)}">{name}</a>'
+                              for name in authors)
+        return (
+            f"<!DOCTYPE html><html><head><title>{words[0].title()} news</title></head><body>"
+            f"<nav><ul>{_PAGE_PADDING}</ul></nav>"
+            f"<article><h1>{words[0].title()} news: {words[1]} meets {words[2]}</h1>"
+            f'<p class="byline">By {byline}</p>'
+            f"<p>Coverage of {' and '.join(words)} from publisher {index}.</p></article>"
+            f'<footer><a href="/{index}/contact">Contact us</a> '
+            f"Send tips to tips@feed{index}.example.com</footer></body></html>"
+        ).encode()
+
+    def author_html(self, index, slug):
+        name = slug.replace("-", " ").title()
+        email = self.published_email(index, name)
+        contact = f'<p>Email: <a href="mailto:{email}">{email}</a></p>' if email else ""
+        return (
+            f"<!DOCTYPE html><html><head><title>{name}</title></head><body>"
+            f"<nav><ul>{_PAGE_PADDING}</ul></nav>"
+            f"<h1>{name}</h1><p>{name} covers technology for publisher {index}.</p>{contact}"
+            f'<footer><a href="/{index}/about">About us</a></footer></body></html>'
+        ).encode()
+
+    def contact_html(self, index):
+        return (
+            f"<!DOCTYPE html><html><head><title>Contact</title></head><body>"
+            f"<h1>Contact publisher {index}</h1>"
+            f"<p>News tips: tips@feed{index}.example.com. Press: press@feed{index}.example.com</p>"
+            f"</body></html>"
+        ).encode()
+
+    def sample_authors(self, count, publishers):
+        """
+        `count` distinct (publisher, author) pairs taken round-robin over
+        `publishers`, with their article URL and published address
+        """
+        people = []
+        seen = set()
+        for n in range(self.entries):
+            for index in range(publishers):
+                _, authors = self._items(index)[n]
+                for name in authors:
+                    if (index, name) in seen:
+                        continue
+                    seen.add((index, name))
+                    first, last = name.split(" ", 1)
+                    people.append({
+                        "first_name": first, "last_name": last, "domain": f"feed{index}.example.com",
+                        "article": self.article_url(index, n), "email": self.published_email(index, name),
+                    })
+                    if len(people) == count:
+                        return people
+        return people
@@ -0,0 +1,587 @@
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import platform
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from bench_servers import AuthorPageServer, FeedServer, HunterServer
+
+BENCHMARK_RESULTS_DIR = Path(__file__).parent / "benchmark_results"
+# "endpoint" is /scrape as served by default (async); "endpoint-sync" runs it with SCRAPE_ASYNC off
+TARGETS = ("scraper", "endpoint", "endpoint-sync")
+
+DEFAULTS = {
+    "feeds": 35,
+    "entries": 30,
+    "feed_latency": 0.05,
+    "slow_fraction": 0.0,
+    "slow_latency": 3.0,
+    "failure_fraction": 0.0,
+    "timeout_fraction": 0.0,
+    "feed_timeout": 10,
+    "deadline": 30,
+    "fetch_workers": 8,
+    "hunter_latency": 0.05,
+    "hunter_429_fraction": 0.0,
+    # 0 disables the client-side Hunter rate limit so runs measure the service, not the quota
+    "hunter_rate": 0,
+    "hunter_patterns": ["first.last"],
+    "topic": "AI in Education",
+    "match": None,
+    # Most relevant journalists kept (and enriched) per scrape; 0 keeps them all
+    "limit": 0,
+    # Scrapes running at once in each iteration (e.g. concurrent campaigns)
+    "concurrency": 1,
+    # Look for addresses on stand-in publisher sites (one origin per feed) before Hunter;
+    # `page_email_fraction` of author pages publish one
+    "crawl": False,
+    "page_latency": 0.02,
+    "page_email_fraction": 0.6,
+    "crawl_delay": 0.25,
+    # uvicorn worker processes serving the endpoint targets; above 1 they run as a separate
+    # server sharing state through a SQLite shared cache, restarted cold for each iteration
+    "workers": 1,
+}
+
+SCENARIOS = {
+    "35-feeds": {},
+    "35-feeds-broad-topic": {
+        "topic": "AI, Climate, Robotics, Security, Health, Energy, Space, Finance",
+    },
+    "35-feeds-broad-topic-top-25": {
+        "topic": "AI, Climate, Robotics, Security, Health, Energy, Space, Finance", "limit": 25,
+    },
+    "35-feeds-substring": {"match": "substring"},
+    "500-feeds": {"feeds": 500},
+    "slow-tail": {"slow_fraction": 0.1, "slow_latency": 3.0},
+    "failures-and-timeouts": {
+        "failure_fraction": 0.1, "timeout_fraction": 0.05, "feed_timeout": 2, "deadline": 5,
+    },
+    "hunter-429s": {"hunter_429_fraction": 0.2},
+    "slow-hunter": {"hunter_latency": 0.5},
+    "hunter-mixed-patterns": {"hunter_patterns": ["first.last", "flast", "first"]},
+    "concurrent-25": {"concurrency": 25},
+    "concurrent-100": {"concurrency": 100},
+    "author-pages": {"crawl": True},
+    "author-pages-concurrent-25": {"crawl": True, "concurrency": 25},
+}
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def summarize(latencies, elapsed):
+    ms = [latency * 1000 for latency in latencies]
+    return {
+        "iterations": len(ms),
+        "p50_ms": round(percentile(ms, 50), 1),
+        "p95_ms": round(percentile(ms, 95), 1),
+        "p99_ms": round(percentile(ms, 99), 1),
+        "min_ms": round(min(ms), 1),
+        "max_ms": round(max(ms), 1),
+        "mean_ms": round(sum(ms) / len(ms), 1),
+        "throughput_per_s": round(len(ms) / elapsed, 3) if elapsed else None,
+    }
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _reset_caches(workdir, iteration):
+    """Drop every cache so each iteration measures a cold scrape"""
+    import article_store
+    import email_finder
+    import identity_index
+    import email_patterns
+    import shared_cache
+    from feed_cache import feed_cache
+    from enrichment_cache import get_enrichment_cache
+    from feed_delta import feed_deltas
+    from feed_health import feed_health
+
+    feed_cache.clear()
+    feed_deltas.clear()
+    feed_health.clear()
+    email_finder.author_page_crawler.clear()
+    shared_cache.get_shared_cache().clear()
+    email_patterns._learner = None
+    get_enrichment_cache().purge(expired_only=False)
+    article_store._store = article_store.ArticleStore(path=str(Path(workdir) / f"articles-{iteration}.sqlite3"))
+    identity_index._index = identity_index.IdentityIndex(path=str(Path(workdir) / f"identities-{iteration}.sqlite3"))
+
+
+class WorkerServer:
+    """
+    The app served by `workers` uvicorn processes, as `WEB_CONCURRENCY=n python
+    app.py` runs it, with its caches, stores and shared cache in `workdir`
+    """
+
+    def __init__(self, target, workers, workdir, verbose=False):
+        self.target = target
+        self.workers = workers
+        self.workdir = Path(workdir)
+        self.verbose = verbose
+        self.port = _free_port()
+        self.base_url = f"http://127.0.0.1:{self.port}"
+        self._process = None
+
+    def start(self):
+        self.workdir.mkdir(parents=True, exist_ok=True)
+        env = {
+            **os.environ,
+            "WEB_CONCURRENCY": str(self.workers),
+            "SCRAPE_ASYNC": "true" if self.target == "endpoint" else "false",
+            "ENRICHMENT_CACHE_PATH": str(self.workdir / "enrichment.sqlite3"),
+            "ARTICLE_STORE_PATH": str(self.workdir / "articles.sqlite3"),
+            "SHARED_CACHE_PATH": str(self.workdir / "shared.sqlite3"),
+            "IDENTITY_INDEX_PATH": str(self.workdir / "identities.sqlite3"),
+        }
+        self._process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app:app", "--host", "127.0.0.1", "--port", str(self.port),
+             "--workers", str(self.workers), "--backlog", "4096", "--log-level", "info"],
+            cwd=Path(__file__).parent, env=env, stdout=None if self.verbose else subprocess.DEVNULL,
+            stderr=subprocess.PIPE, text=True,
+        )
+        # Wait until every worker has started, so the first iteration isn't measuring imports
+        started = 0
+        for line in self._process.stderr:
+            if self.verbose:
+                print(line, end="")
+            if "Application startup complete" in line:
+                started += 1
+                if started == self.workers:
+                    break
+        else:
+            raise RuntimeError(f"uvicorn exited with code {self._process.wait()}")
+        threading.Thread(target=self._drain, daemon=True).start()
+        return self
+
+    def _drain(self):
+        for line in self._process.stderr:
+            if self.verbose:
+                print(line, end="")
+
+    def stop(self):
+        if self._process is not None:
+            self._process.terminate()
+            self._process.wait(timeout=30)
+            self._process = None
+
+
+def _run_target(target, config, iterations, warm, workdir, verbose=False):
+    """Runs inside the scenario process; returns latencies, elapsed time and result sizes"""
+    import requests
+    from run_scraper import scrape_journalists_from_publishers
+    from ranking import top_journalists
+    from identity_index import merge_journalists, IDENTITY_RESOLUTION
+
+    server = None
+    base_url = None
+    workers = config["workers"] if target != "scraper" else 1
+    if workers > 1:
+        # Cold runs start their servers per iteration below
+        if warm:
+            server = WorkerServer(target, workers, Path(workdir) / f"{target}-warm", verbose).start()
+            base_url = server.base_url
+    elif target != "scraper":
+        import uvicorn
+        import app as service
+
+        service.SCRAPE_ASYNC = target == "endpoint"
+        port = _free_port()
+        server = uvicorn.Server(uvicorn.Config(service.app, host="127.0.0.1", port=port, log_level="warning",
+                                               backlog=4096))
+        threading.Thread(target=server.run, daemon=True).start()
+        while not server.started:
+            time.sleep(0.05)
+        base_url = f"http://127.0.0.1:{port}"
+
+    def scrape_once():
+        started = time.perf_counter()
+        if target != "scraper":
+            params = {"topic": config["topic"]}
+            if config["match"]:
+                params["match"] = config["match"]
+            if config["limit"]:
+                params["limit"] = config["limit"]
+            response = requests.get(f"{base_url}/scrape", params=params, timeout=600)
+            response.raise_for_status()
+            found = len(response.json())
+        else:
+            journalists = scrape_journalists_from_publishers(config["topic"], match_mode=config["match"])
+            if IDENTITY_RESOLUTION:
+                journalists = merge_journalists(journalists)
+            found = len(top_journalists(journalists, config["limit"]))
+        return time.perf_counter() - started, found
+
+    concurrency = max(1, config["concurrency"])
+    clients = ThreadPoolExecutor(max_workers=concurrency)
+    try:
+        if warm:
+            scrape_once()
+
+        latencies = []
+        journalists = 0
+        elapsed = 0.0
+        for i in range(iterations):
+            if not warm and workers > 1:
+                # Worker processes' caches are dropped by starting new ones, outside the timed part
+                if server is not None:
+                    server.stop()
+                server = WorkerServer(target, workers, Path(workdir) / f"{target}-{i}", verbose).start()
+                base_url = server.base_url
+            elif not warm:
+                _reset_caches(workdir, f"{target}-{i}")
+            started = time.perf_counter()
+            for latency, journalists in clients.map(lambda _: scrape_once(), range(concurrency)):
+                latencies.append(latency)
+            elapsed += time.perf_counter() - started
+    finally:
+        clients.shutdown()
+        if isinstance(server, WorkerServer):
+            server.stop()
+        elif server is not None:
+            server.should_exit = True
+
+    return latencies, elapsed, journalists
+
+
+def _service_env(config, feed_publishers, hunter_url, workdir):
+    """Settings pointing the service at the stand-in feeds and Hunter, with its files in `workdir`"""
+    publishers_path = Path(workdir) / "publishers.json"
+    publishers_path.write_text(json.dumps({"publishers": feed_publishers}))
+    return {
+        "PUBLISHERS_PATH": str(publishers_path),
+        "HUNTER_API_URL": hunter_url,
+        "HUNTER_API_KEY": "benchmark",
+        "HUNTER_RATE_PER_SECOND": str(config["hunter_rate"]),
+        "HUNTER_MONTHLY_QUOTA": "0",
+        "ENRICHMENT_CACHE_PATH": str(Path(workdir) / "enrichment.sqlite3"),
+        "ARTICLE_STORE_PATH": str(Path(workdir) / "articles.sqlite3"),
+        "IDENTITY_INDEX_PATH": str(Path(workdir) / "identities.sqlite3"),
+        "FEED_TIMEOUT": str(config["feed_timeout"]),
+        "SCRAPE_DEADLINE": str(config["deadline"]),
+        "MAX_FETCH_WORKERS": str(config["fetch_workers"]),
+        "FEED_SCHEDULER_ENABLED": "false",
+        "AUTHOR_PAGE_CRAWL": "true" if config["crawl"] else "false",
+        "CRAWL_DOMAIN_DELAY": str(config["crawl_delay"]),
+    }
+
+
+def _scenario_process(config, feed_publishers, hunter_url, targets, iterations, warm, verbose, results):
+    """Entry point of the child process that runs one scenario"""
+    workdir = tempfile.mkdtemp(prefix="scraper-bench-")
+    # Point the service at the stand-in feeds before anything loads the registry
+    os.environ.update(_service_env(config, feed_publishers, hunter_url, workdir))
+    if not verbose:
+        sys.stdout = open(os.devnull, "w")
+
+    report = {}
+    for target in targets:
+        latencies, elapsed, journalists = _run_target(target, config, iterations, warm, workdir, verbose)
+        report[target] = {**summarize(latencies, elapsed), "journalists": journalists}
+
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    report["peak_rss_mb"] = round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+    results.put(report)
+
+
+def _start_stand_ins(config, article_url=None):
+    """The stand-in feed server and Hunter API for `config`, started"""
+    feed_server = FeedServer(
+        entries=config["entries"],
+        latency=config["feed_latency"],
+        slow_fraction=config["slow_fraction"],
+        slow_latency=config["slow_latency"],
+        failure_fraction=config["failure_fraction"],
+        timeout_fraction=config["timeout_fraction"],
+        timeout_latency=config["feed_timeout"] + 5,
+        article_url=article_url,
+    ).start()
+    hunter_server = HunterServer(
+        latency=config["hunter_latency"],
+        rate_limit_fraction=config["hunter_429_fraction"],
+        patterns=config["hunter_patterns"],
+    ).start()
+    return feed_server, hunter_server
+
+
+def run_scenario(name, overrides, targets, iterations, warm, verbose):
+    config = {**DEFAULTS, **overrides}
+    page_server = None
+    if config["crawl"]:
+        page_server = AuthorPageServer(hosts=config["feeds"], latency=config["page_latency"],
+                                       email_fraction=config["page_email_fraction"],
+                                       entries=config["entries"]).start()
+    feed_server, hunter_server = _start_stand_ins(config, article_url=page_server.article_url if page_server else None)
+
+    # Each scenario gets a fresh interpreter so module settings and peak memory don't leak between runs
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(
+        target=_scenario_process,
+        args=(config, feed_server.publishers(config["feeds"]), hunter_server.api_url,
+              targets, iterations, warm, verbose, results),
+    )
+    try:
+        process.start()
+        process.join()
+        if process.exitcode != 0:
+            raise RuntimeError(f"scenario {name} exited with code {process.exitcode}")
+        report = results.get()
+    finally:
+        feed_server.stop()
+        hunter_server.stop()
+        if page_server:
+            page_server.stop()
+
+    report["feed_requests"] = feed_server.requests
+    report["hunter_requests"] = hunter_server.requests
+    report["hunter_429s"] = hunter_server.rate_limited
+    report["page_requests"] = page_server.requests if page_server else 0
+    return {"config": config, **report}
+
+
+# Libraries the service imports on first use rather than with the app (see app.py)
+DEFERRED_IMPORTS = ("aiohttp", "requests", "feedparser", "tracemalloc")
+# Run in a fresh interpreter: the seconds `import app` takes, all of which come before serving,
+# and which of DEFERRED_IMPORTS it loaded anyway
+_IMPORT_APP = (
+    "import json, sys, time; started = time.perf_counter(); import app; "
+    "print(json.dumps({'seconds': time.perf_counter() - started, "
+    f"'loaded': [name for name in {DEFERRED_IMPORTS!r} if name in sys.modules]}}))"
+)
+STARTUP_METRICS = ("import_ms", "ready_ms", "first_response_ms", "first_scrape_ms")
+
+
+def _start_once(env, topic, verbose=False):
+    """
+    One cold start of `python app.py` as deployed: milliseconds to import the
+    app, from launch until it accepts connections (uvicorn binds its port after
+    the app's startup, warm-up included) and until its first /scrape answers
+    """
+    import requests
+
+    module_dir = Path(__file__).parent
+    output = subprocess.run([sys.executable, "-c", _IMPORT_APP], cwd=module_dir, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    imported = json.loads(output.splitlines()[-1])
+    import_s = imported["seconds"]
+
+    port = _free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "app.py"], cwd=module_dir, env={**env, "PORT": str(port)},
+        stdout=None if verbose else subprocess.DEVNULL, stderr=None if verbose else subprocess.DEVNULL,
+    )
+    try:
+        while True:
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=1).close()
+                break
+            except OSError:
+                if process.poll() is not None:
+                    raise RuntimeError(f"app.py exited with code {process.returncode}")
+                time.sleep(0.01)
+        ready_s = time.perf_counter() - started
+        response = requests.get(f"http://127.0.0.1:{port}/scrape", params={"topic": topic}, timeout=600)
+        response.raise_for_status()
+        first_s = time.perf_counter() - started
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+    return {
+        "import_ms": import_s * 1000,
+        "ready_ms": ready_s * 1000,
+        "first_response_ms": first_s * 1000,
+        "first_scrape_ms": (first_s - ready_s) * 1000,
+        "journalists": len(response.json()),
+        "deferred_loaded": imported["loaded"],
+    }
+
+
+def run_startup(overrides, iterations, verbose):
+    """
+    Median cold starts of the service with STARTUP_WARMUP off and on, each
+    start in a new work directory so no cache survives from the last one
+    """
+    config = {**DEFAULTS, **overrides}
+    feed_server, hunter_server = _start_stand_ins(config)
+    report = {"config": config}
+    try:
+        for warmup in ("off", "on"):
+            runs = []
+            for _ in range(iterations):
+                workdir = tempfile.mkdtemp(prefix="scraper-startup-")
+                env = {
+                    **os.environ,
+                    **_service_env(config, feed_server.publishers(config["feeds"]), hunter_server.api_url, workdir),
+                    "WEB_CONCURRENCY": "1",
+                    "SHARED_CACHE_PATH": str(Path(workdir) / "shared.sqlite3"),
+                    "STARTUP_WARMUP": "true" if warmup == "on" else "false",
+                }
+                runs.append(_start_once(env, config["topic"], verbose))
+            report[warmup] = {
+                metric: round(percentile([run[metric] for run in runs], 50), 1) for metric in STARTUP_METRICS
+            }
+            report[warmup]["journalists"] = runs[-1]["journalists"]
+            report[warmup]["deferred_loaded"] = sorted({name for run in runs for name in run["deferred_loaded"]})
+    finally:
+        feed_server.stop()
+        hunter_server.stop()
+    report["feed_requests"] = feed_server.requests
+    return report
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, cwd=Path(__file__).parent, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(results, targets):
+    print(f"\n{'scenario':<24} {'target':<14} {'workers':>7} {'clients':>7} {'p50 ms':>9} {'p95 ms':>9} "
+          f"{'p99 ms':>9} {'scrapes/s':>10} {'journalists':>12} {'peak MB':>8}")
+    for name, scenario in results["scenarios"].items():
+        for target in targets:
+            r = scenario[target]
+            workers = scenario["config"]["workers"] if target != "scraper" else 1
+            print(f"{name:<24} {target:<14} {workers:>7} {scenario['config']['concurrency']:>7} {r['p50_ms']:>9} "
+                  f"{r['p95_ms']:>9} {r['p99_ms']:>9} {r['throughput_per_s']:>10} {r['journalists']:>12} "
+                  f"{scenario['peak_rss_mb']:>8}")
+
+
+def print_startup_report(results):
+    print(f"\n{'scenario':<24} {'warm-up':<8} {'import ms':>10} {'ready ms':>10} {'first response ms':>18} "
+          f"{'first scrape ms':>16} {'journalists':>12}")
+    for name, scenario in results["startup"].items():
+        for warmup in ("off", "on"):
+            r = scenario[warmup]
+            print(f"{name:<24} {warmup:<8} {r['import_ms']:>10} {r['ready_ms']:>10} {r['first_response_ms']:>18} "
+                  f"{r['first_scrape_ms']:>16} {r['journalists']:>12}")
+    loaded = sorted({name for scenario in results["startup"].values()
+                     for warmup in ("off", "on") for name in scenario[warmup]["deferred_loaded"]})
+    if loaded:
+        print(f"\nImporting the app loaded {', '.join(loaded)}, which should be deferred to first use")
+    else:
+        print(f"\nImporting the app left {', '.join(DEFERRED_IMPORTS)} unloaded")
+
+
+def print_comparison(results, baseline_path):
+    baseline = json.loads(Path(baseline_path).read_text())
+    print(f"\nCompared with {baseline_path} (commit {baseline.get('commit')}):")
+    for name, scenario in results["scenarios"].items():
+        old = baseline.get("scenarios", {}).get(name)
+        if not old:
+            continue
+        for target, r in scenario.items():
+            if not isinstance(r, dict) or target == "config" or target not in old:
+                continue
+            for metric in ("p50_ms", "p95_ms", "p99_ms"):
+                before, after = old[target][metric], r[metric]
+                change = (after - before) / before * 100 if before else 0.0
+                print(f"  {name} {target} {metric}: {before} -> {after} ({change:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the scraper service against local stand-ins for RSS feeds and Hunter.io"
+    )
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="scenario to run (repeatable, default: all)")
+    parser.add_argument("--target", choices=[*TARGETS, "both", "all"], default="both",
+                        help="scrape_journalists_from_publishers, the /scrape endpoint (async, or the "
+                             "sync path), both scraper and endpoint, or all three")
+    parser.add_argument("--concurrency", type=int,
+                        help="concurrent scrapes per iteration, overriding the scenarios' setting")
+    parser.add_argument("--workers", type=int,
+                        help="uvicorn worker processes serving the endpoint targets (default 1)")
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--warm", action="store_true",
+                        help="keep caches between iterations (after one warm-up run)")
+    parser.add_argument("--output", default=str(BENCHMARK_RESULTS_DIR), help="directory for the JSON report")
+    parser.add_argument("--compare", help="earlier JSON report to compare against")
+    parser.add_argument("--list", action="store_true", help="list scenarios and exit")
+    parser.add_argument("--verbose", action="store_true", help="show the service's own output")
+    parser.add_argument("--startup", action="store_true",
+                        help="instead of scrapes, time cold starts of app.py (import, ready, first /scrape) "
+                             "with STARTUP_WARMUP off and on, for the scenarios given (default 35-feeds)")
+    args = parser.parse_args()
+
+    if args.list:
+        for name, overrides in SCENARIOS.items():
+            print(f"{name}: {overrides or 'defaults'}")
+        return
+
+    if args.target == "all":
+        targets = list(TARGETS)
+    elif args.target == "both":
+        targets = ["scraper", "endpoint"]
+    else:
+        targets = [args.target]
+    names = args.scenario or list(SCENARIOS)
+
+    results = {
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "iterations": args.iterations,
+        "warm": args.warm,
+        "scenarios": {},
+    }
+    if args.startup:
+        results["startup"] = {}
+        for name in args.scenario or ["35-feeds"]:
+            print(f"Starting the service for {name}...")
+            results["startup"][name] = run_startup(SCENARIOS[name], args.iterations, args.verbose)
+    else:
+        for name in names:
+            print(f"Running {name}...")
+            overrides = dict(SCENARIOS[name])
+            if args.concurrency:
+                overrides["concurrency"] = args.concurrency
+            if args.workers:
+                overrides["workers"] = args.workers
+            results["scenarios"][name] = run_scenario(
+                name, overrides, targets, args.iterations, args.warm, args.verbose
+            )
+
+    output_dir = Path(args.output)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    output_path = output_dir / f"benchmark-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    output_path.write_text(json.dumps(results, indent=2))
+
+    if args.startup:
+        print_startup_report(results)
+    else:
+        print_report(results, targets)
+    print(f"\nSaved results to {output_path}")
+    if args.compare:
+        print_comparison(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
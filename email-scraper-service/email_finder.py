@@ -0,0 +1,596 @@
+import argparse
+import asyncio
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from difflib import SequenceMatcher
+from urllib.parse import urljoin, urlsplit
+from urllib.robotparser import RobotFileParser
+
+import metrics
+from async_http import ASYNC_HTTP_KEEPALIVE, single_flight
+from email_patterns import EMAIL_PATTERN_MAX_SCORE, _local_name, detect_patterns
+
+# Look for a journalist's address on the publisher's own pages (article -> author page ->
+# contact/about page) before spending a Hunter lookup; such addresses are reported as unverified
+AUTHOR_PAGE_CRAWL = os.getenv("AUTHOR_PAGE_CRAWL", "false").lower() == "true"
+# Pages fetched at once across all crawls, and connections kept per publisher host
+CRAWL_CONCURRENCY = int(os.getenv("CRAWL_CONCURRENCY", 16))
+CRAWL_CONNECTIONS_PER_HOST = int(os.getenv("CRAWL_CONNECTIONS_PER_HOST", 2))
+# Politeness: seconds between requests to one host, raised to the host's robots.txt Crawl-delay
+CRAWL_DOMAIN_DELAY = float(os.getenv("CRAWL_DOMAIN_DELAY", 0.25))
+# Per-page timeout, and the most one journalist's crawl may take before Hunter is asked instead
+CRAWL_TIMEOUT = float(os.getenv("CRAWL_TIMEOUT", 5))
+CRAWL_DEADLINE = float(os.getenv("CRAWL_DEADLINE", 10))
+# Bytes read from a page (the rest is never downloaded) and pages fetched per journalist
+CRAWL_MAX_BYTES = int(os.getenv("CRAWL_MAX_BYTES", 512 * 1024))
+CRAWL_MAX_PAGES = int(os.getenv("CRAWL_MAX_PAGES", 5))
+# Scanned pages and robots.txt files are reused for this many seconds
+CRAWL_CACHE_TTL = float(os.getenv("CRAWL_CACHE_TTL", 3600))
+CRAWL_USER_AGENT = os.getenv("CRAWL_USER_AGENT", "pr-outreach-crawler/1.0")
+
+# Most recent articles a crawl starts from, and scanned pages kept in memory
+_START_ARTICLES = 2
+_PAGE_CACHE_SIZE = 2048
+_ROBOTS_MAX_BYTES = 64 * 1024
+# An unreachable robots.txt blocks its origin for this many seconds before it is tried again
+_ROBOTS_RETRY = 300
+# Bytes of one chunk carried into the next so matches spanning chunks are still seen
+_CARRY = 2048
+
+# Shared mailboxes: on the right domain, but nobody's personal address
+ROLE_ADDRESSES = frozenset({
+    "info", "contact", "contactus", "editor", "editors", "editorial", "news", "newsroom", "newsdesk",
+    "tips", "press", "pr", "media", "letters", "feedback", "support", "help", "hello", "admin",
+    "webmaster", "advertising", "ads", "sales", "subscriptions", "corrections", "privacy", "legal",
+    "jobs", "careers", "noreply", "no-reply", "desk", "team", "office",
+})
+# How much an address found on each kind of page is trusted, before name and domain matching
+_PAGE_WEIGHTS = {"author": 1.0, "article": 0.6, "contact": 0.3}
+
+_LOCAL_TAIL_RE = re.compile(rb"[A-Za-z0-9._%+-]{1,64}\Z")
+_DOMAIN_HEAD_RE = re.compile(rb"(?:[A-Za-z0-9-]{1,63}\.)+[A-Za-z]{2,24}(?![A-Za-z0-9-])")
+_OBFUSCATED_AT_RE = re.compile(rb"\s?[\[(]\s?at\s?[\])]\s?", re.I)
+_OBFUSCATED_DOT_RE = re.compile(rb"\s?[\[(]\s?dot\s?[\])]\s?", re.I)
+_ENCODED_AT = (b"&#64;", b"&#x40;", b"&commat;", b"%40")
+_ANCHOR_RE = re.compile(rb"<a\s([^>]{0,1000})>(.{0,300}?)</a\s*>", re.I | re.S)
+# Only anchors with one of these in their attributes are parsed; found with bytes.find, as a
+# case-insensitive alternation regex is many times slower over a whole page
+_LINK_HINTS = (b"author", b"/by/", b"staff", b"people", b"profile", b"writer", b"reporter", b"contributor",
+               b"contact", b"about")
+_HREF_RE = re.compile(rb"""\bhref\s*=\s*["']?([^"'\s>]+)""", re.I)
+_REL_AUTHOR_RE = re.compile(rb"""\brel\s*=\s*["']?[^"'>]*\bauthor\b""", re.I)
+_TAG_RE = re.compile(rb"<[^>]*>")
+_AUTHOR_PATH_RE = re.compile(r"/(?:authors?|by|staff|people|profiles?|writers?|reporters?|contributors?)/", re.I)
+_CONTACT_PATH_RE = re.compile(r"/(?:contact|about)(?:[-_/.]|us\b|$)", re.I)
+
+
+class PageScanner:
+    """
+    Streaming scan of one HTML page: addresses (including mailto:, entity
+    encoded and "name [at] host [dot] com" forms) and the author and
+    contact/about links, fed one chunk at a time without building the page.
+    Addresses are found by locating each "@" and matching the local part and
+    domain around it, so the scan stays linear on long runs of text.
+    """
+
+    __slots__ = ("emails", "links", "_tail")
+
+    def __init__(self):
+        self.emails = []
+        # (href as written, "author" or "contact", anchor text) in page order
+        self.links = []
+        self._tail = None
+
+    def feed(self, chunk):
+        # The end of the previous chunk is scanned again so matches spanning chunks are seen whole
+        data = chunk if self._tail is None else self._tail + chunk
+        self._scan(data, self._tail is not None, False)
+        self._tail = data[-_CARRY:]
+
+    def close(self):
+        """Scan the last chunk's end, where an address may have been cut off"""
+        if self._tail is not None:
+            self._scan(self._tail, True, True)
+            self._tail = None
+
+    def _scan(self, data, carried, final):
+        text = data
+        for encoded in _ENCODED_AT:
+            if encoded in text:
+                text = text.replace(encoded, b"@")
+        if b"at]" in text or b"at)" in text or b"AT]" in text or b"AT)" in text:
+            text = _OBFUSCATED_DOT_RE.sub(b".", _OBFUSCATED_AT_RE.sub(b"@", text))
+
+        at = text.find(b"@")
+        while at != -1:
+            local = _LOCAL_TAIL_RE.search(text, max(0, at - 64), at)
+            domain = _DOMAIN_HEAD_RE.match(text, at + 1)
+            # Skip matches touching either end of a partial buffer: they may be cut off there
+            if (local and domain and not (carried and local.start() == 0)
+                    and (final or domain.end() < len(text))):
+                email = (local.group().lstrip(b".") + b"@" + domain.group()).decode("ascii").lower()
+                if email[0] != "@" and email not in self.emails:
+                    self.emails.append(email)
+            at = text.find(b"@", at + 1)
+
+        lowered = data.lower()
+        starts = set()
+        for hint in _LINK_HINTS:
+            at = lowered.find(hint)
+            while at != -1:
+                start = lowered.rfind(b"<a", max(0, at - 1000), at)
+                if start != -1 and lowered.find(b">", start, at) == -1:
+                    starts.add(start)
+                at = lowered.find(hint, at + len(hint))
+
+        for start in sorted(starts):
+            anchor = _ANCHOR_RE.match(data, start)
+            if anchor is None:
+                continue
+            attributes = anchor.group(1)
+            href = _HREF_RE.search(attributes)
+            if href is None:
+                continue
+            url = href.group(1).decode("utf-8", "replace")
+            if url.startswith(("mailto:", "javascript:", "#")):
+                continue
+            if _REL_AUTHOR_RE.search(attributes) or _AUTHOR_PATH_RE.search(url):
+                kind = "author"
+            elif _CONTACT_PATH_RE.search(url):
+                kind = "contact"
+            else:
+                continue
+            link = (url, kind, _TAG_RE.sub(b"", anchor.group(2)).decode("utf-8", "replace").strip())
+            if link not in self.links:
+                self.links.append(link)
+
+
+def scan_page(html):
+    """PageScanner over a whole document; returns (emails, links)"""
+    scanner = PageScanner()
+    for start in range(0, len(html), 64 * 1024):
+        scanner.feed(html[start:start + 64 * 1024])
+    scanner.close()
+    return scanner.emails, scanner.links
+
+
+def _same_site(email_domain, domain):
+    """The publication's domain (ignoring "www.") or a subdomain of it"""
+    domain = domain.lower().removeprefix("www.")
+    return email_domain == domain or email_domain.endswith("." + domain)
+
+
+def score_email(email, first_name, last_name, domain, page):
+    """
+    0-95 confidence that `email` is this journalist's address: mostly how well
+    its local part fits the name, then whether it is at the publication's
+    domain, then the kind of page it was found on.
+    """
+    local, _, email_domain = email.partition("@")
+    first, last = _local_name(first_name), _local_name(last_name)
+    squashed = re.sub(r"[^a-z0-9]", "", local)
+    if local in ROLE_ADDRESSES or not first or not last:
+        name = 0.0
+    elif detect_patterns(first_name, last_name, email):
+        name = 1.0
+    elif first in squashed and last in squashed:
+        name = 0.9
+    elif last in squashed and squashed.startswith(first[0]):
+        name = 0.8
+    elif last in squashed:
+        # Could as well be a colleague sharing the surname
+        name = 0.4
+    else:
+        name = SequenceMatcher(None, squashed, first + last).ratio() * 0.6
+    site = 1.0 if _same_site(email_domain, domain) else 0.0
+    score = 100 * (0.6 * name + 0.3 * site + 0.1 * _PAGE_WEIGHTS[page])
+    return min(EMAIL_PATTERN_MAX_SCORE, round(score))
+
+
+def _mentions(text, url, first_name, last_name):
+    """Whether an author link's text or URL names this journalist"""
+    last = _local_name(last_name).replace("-", "")
+    return bool(last) and (last in _local_name(text).replace("-", "")
+                           or last in url.lower().replace("-", "").replace("_", ""))
+
+
+def _author_template(url, first_name, last_name):
+    """`url` with the journalist's name replaced by {first}/{last} placeholders, or None if it isn't in it"""
+    first, last = _local_name(first_name), _local_name(last_name)
+    if not first or not last:
+        return None
+    lowered = url.lower()
+    for separator in ("-", "_", ".", ""):
+        slug = f"{first}{separator}{last}"
+        at = lowered.rfind(slug)
+        if at != -1:
+            return f"{url[:at]}{{first}}{separator}{{last}}{url[at + len(slug):]}"
+    return None
+
+
+def _origin(url):
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+class _Host:
+    """Politeness state of one origin (scheme://host:port)"""
+
+    __slots__ = ("robots", "delay", "next_at", "expires")
+
+    def __init__(self):
+        self.robots = None
+        self.delay = CRAWL_DOMAIN_DELAY
+        self.next_at = 0.0
+        self.expires = 0.0
+
+
+class AuthorPageCrawler:
+    """
+    Finds journalists' published addresses by following work_flow.txt's chain:
+    a recent article, the author page it links to, then the site's contact and
+    about pages. Runs on its own event loop thread with its own keep-alive
+    session, so sync enrichment threads and the API's event loop share one
+    bounded crawler. Each origin's robots.txt is honoured, requests to one
+    origin are spaced by the politeness delay, and pages are read only up to
+    CRAWL_MAX_BYTES. Scanned pages are cached, so journalists at one
+    publication share its contact page, and once one author page is found
+    the site's author URL format is reused to go straight to the next
+    journalist's page, skipping the article.
+    """
+
+    def __init__(self, concurrency=CRAWL_CONCURRENCY, connections_per_host=CRAWL_CONNECTIONS_PER_HOST,
+                 delay=CRAWL_DOMAIN_DELAY, timeout=CRAWL_TIMEOUT, deadline=CRAWL_DEADLINE,
+                 max_bytes=CRAWL_MAX_BYTES, max_pages=CRAWL_MAX_PAGES, cache_ttl=CRAWL_CACHE_TTL):
+        self.concurrency = concurrency
+        self.connections_per_host = connections_per_host
+        self.delay = delay
+        self.timeout = timeout
+        self.deadline = deadline
+        self.max_bytes = max_bytes
+        self.max_pages = max_pages
+        self.cache_ttl = cache_ttl
+        self._loop = None
+        self._loop_lock = threading.Lock()
+        # Only touched on the crawler's loop
+        self._session = None
+        self._limit = None
+        self._hosts = {}
+        self._pages = OrderedDict()
+        # origin -> author page URL with {first}/{last} placeholders, or None if the
+        # site's author URLs don't contain names; and the futures of first crawls still learning it
+        self._author_templates = {}
+        self._learning = {}
+
+    def _ensure_loop(self):
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="author-page-crawler", daemon=True).start()
+            return self._loop
+
+    def submit(self, first_name, last_name, domain, article_urls, min_score):
+        """
+        Start a crawl on the crawler's loop; returns a concurrent.futures.Future
+        of the best (email, score) scoring at least `min_score`, or None.
+        """
+        return asyncio.run_coroutine_threadsafe(
+            self._find(first_name, last_name, domain, article_urls, min_score), self._ensure_loop()
+        )
+
+    def find_email(self, first_name, last_name, domain, article_urls, min_score):
+        """submit, blocking the calling thread until the crawl is done"""
+        return self.submit(first_name, last_name, domain, article_urls, min_score).result()
+
+    async def find_email_async(self, first_name, last_name, domain, article_urls, min_score):
+        """submit, for callers on another event loop"""
+        return await asyncio.wrap_future(self.submit(first_name, last_name, domain, article_urls, min_score))
+
+    def clear(self):
+        """Forget scanned pages, robots.txt files and author URL formats (only while no crawl is running)"""
+        self._pages.clear()
+        self._hosts.clear()
+        self._author_templates.clear()
+
+    def close(self):
+        with self._loop_lock:
+            loop, self._loop = self._loop, None
+        if loop is not None:
+            asyncio.run_coroutine_threadsafe(self._close(), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
+
+    async def _close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _find(self, first_name, last_name, domain, article_urls, min_score):
+        try:
+            found = await asyncio.wait_for(
+                self._crawl(first_name, last_name, domain, article_urls, min_score), self.deadline
+            )
+        except asyncio.TimeoutError:
+            metrics.author_page_lookups.inc("timeout")
+            return None
+        metrics.author_page_lookups.inc("not_found" if found is None else "found")
+        return found
+
+    async def _crawl(self, first_name, last_name, domain, article_urls, min_score):
+        best = None
+        contact_pages = []
+        visited = set()
+
+        def good():
+            return best is not None and best[1] >= min_score
+
+        async def visit(url, page):
+            """Scan a page into `best` and `contact_pages`; its links, or None if it couldn't be read"""
+            nonlocal best
+            visited.add(url)
+            scanned = await self._scan(url)
+            if scanned is None:
+                return None
+            emails, links = scanned
+            for email in emails:
+                score = score_email(email, first_name, last_name, domain, page)
+                if best is None or score > best[1]:
+                    best = (email, score)
+            for href, kind, _ in links:
+                target = urljoin(url, href)
+                if kind == "contact" and target not in contact_pages:
+                    contact_pages.append(target)
+            return links
+
+        origin = _origin(article_urls[0]) if article_urls else None
+        learning = None
+        if origin and origin not in self._author_templates:
+            if origin in self._learning:
+                # Another crawl is learning this site's author URL format; wait for it rather than fetch an article too
+                await asyncio.shield(self._learning[origin])
+            else:
+                learning = self._learning[origin] = asyncio.get_running_loop().create_future()
+        try:
+            template = self._author_templates.get(origin)
+            first, last = _local_name(first_name), _local_name(last_name)
+            found_author_page = False
+            if template and first and last:
+                found_author_page = await visit(template.replace("{first}", first).replace("{last}", last),
+                                                "author") is not None
+                if good():
+                    return best
+
+            for article_url in ([] if found_author_page else article_urls[:_START_ARTICLES]):
+                if len(visited) >= self.max_pages:
+                    break
+                links = await visit(article_url, "article")
+                if good():
+                    return best
+                if links is None:
+                    continue
+                author_pages = [urljoin(article_url, href) for href, kind, text in links
+                                if kind == "author" and _mentions(text, href, first_name, last_name)]
+                for author_url in author_pages[:1]:
+                    template = _author_template(author_url, first_name, last_name)
+                    if template:
+                        self._author_templates[_origin(author_url)] = template
+                    if author_url not in visited and len(visited) < self.max_pages:
+                        await visit(author_url, "author")
+                if good():
+                    return best
+                # The article was readable; another one would lead to the same author page
+                break
+        finally:
+            if learning is not None:
+                self._author_templates.setdefault(origin, None)
+                del self._learning[origin]
+                learning.set_result(None)
+
+        if origin and not contact_pages:
+            contact_pages.extend((urljoin(origin, "/contact"), urljoin(origin, "/about")))
+        for url in contact_pages:
+            if len(visited) >= self.max_pages:
+                break
+            if url not in visited:
+                await visit(url, "contact")
+                if good():
+                    return best
+        return best if good() else None
+
+    async def _scan(self, url):
+        """(emails, links) of a page, or None if it couldn't be read; from the page cache or one shared fetch"""
+        now = time.monotonic()
+        cached = self._pages.get(url)
+        if cached is not None and cached[0] > now:
+            self._pages.move_to_end(url)
+            return cached[1]
+        result, _ = await single_flight(("crawl", url), self._fetch_and_scan, url)
+        return result
+
+    async def _fetch_and_scan(self, url):
+        # aiohttp is imported on first use, as in async_http
+        import aiohttp
+
+        result = None
+        try:
+            scanner = await self._fetch(url)
+            if scanner is not None:
+                result = (scanner.emails, scanner.links)
+        except (aiohttp.ClientError, asyncio.TimeoutError, UnicodeError, ValueError) as e:
+            metrics.crawler_pages.inc("error")
+            print(f"    Crawl error for {url}: {e}")
+        self._pages[url] = (time.monotonic() + self.cache_ttl, result)
+        self._pages.move_to_end(url)
+        while len(self._pages) > _PAGE_CACHE_SIZE:
+            self._pages.popitem(last=False)
+        return result
+
+    def _session_for_loop(self):
+        import aiohttp
+
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.concurrency,
+                    limit_per_host=self.connections_per_host,
+                    keepalive_timeout=ASYNC_HTTP_KEEPALIVE,
+                ),
+                headers={"User-Agent": CRAWL_USER_AGENT},
+                timeout=aiohttp.ClientTimeout(total=None, sock_connect=self.timeout, sock_read=self.timeout),
+            )
+            self._limit = asyncio.Semaphore(max(1, self.concurrency))
+        return self._session
+
+    async def _fetch(self, url):
+        """Stream an HTML page through a PageScanner; None if robots.txt disallows it or it isn't HTML"""
+        if urlsplit(url).scheme not in ("http", "https"):
+            return None
+        host = await self._host(_origin(url))
+        if host.robots is not None and not host.robots.can_fetch(CRAWL_USER_AGENT, url):
+            metrics.crawler_pages.inc("disallowed")
+            return None
+
+        async with self._polite(host):
+            async with self._session_for_loop().get(url, allow_redirects=True) as response:
+                if response.status >= 400:
+                    metrics.crawler_pages.inc(str(response.status))
+                    return None
+                if "html" not in response.headers.get("Content-Type", "text/html"):
+                    metrics.crawler_pages.inc("not_html")
+                    return None
+                scanner = PageScanner()
+                read = 0
+                async for chunk in response.content.iter_chunked(64 * 1024):
+                    scanner.feed(chunk[:self.max_bytes - read])
+                    read += len(chunk)
+                    if read >= self.max_bytes:
+                        metrics.crawler_pages.inc("truncated")
+                        break
+                else:
+                    metrics.crawler_pages.inc("ok")
+                scanner.close()
+                return scanner
+
+    async def _host(self, origin):
+        host = self._hosts.get(origin)
+        if host is None or host.expires <= time.monotonic():
+            host, _ = await single_flight(("robots", origin), self._load_robots, origin)
+        return host
+
+    async def _load_robots(self, origin):
+        import aiohttp
+
+        host = self._hosts.get(origin) or _Host()
+        host.delay = self.delay
+        host.robots = None
+        try:
+            async with self._polite(host):
+                async with self._session_for_loop().get(f"{origin}/robots.txt") as response:
+                    body = await response.content.read(_ROBOTS_MAX_BYTES)
+                    status = response.status
+            if status < 400:
+                host.robots = RobotFileParser()
+                host.robots.parse(body.decode("utf-8", "replace").splitlines())
+                crawl_delay = host.robots.crawl_delay(CRAWL_USER_AGENT)
+                if crawl_delay:
+                    host.delay = max(self.delay, float(crawl_delay))
+            elif status >= 500:
+                # RFC 9309: a server error means the whole site is off limits for now
+                host.robots = RobotFileParser()
+                host.robots.disallow_all = True
+            host.expires = time.monotonic() + self.cache_ttl
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            # As for a server error, but asked again sooner
+            print(f"    robots.txt unavailable for {origin}: {e}")
+            host.robots = RobotFileParser()
+            host.robots.disallow_all = True
+            host.expires = time.monotonic() + min(self.cache_ttl, _ROBOTS_RETRY)
+        self._hosts[origin] = host
+        return host
+
+    @asynccontextmanager
+    async def _polite(self, host):
+        """Hold a crawl slot for a request to `host`, starting it no sooner than the host's delay allows"""
+        now = time.monotonic()
+        wait = host.next_at - now
+        host.next_at = max(now, host.next_at) + host.delay
+        if wait > 0:
+            await asyncio.sleep(wait)
+        self._session_for_loop()
+        async with self._limit:
+            yield
+
+
+author_page_crawler = AuthorPageCrawler()
+
+
+def benchmark(journalists, hosts, delay, email_fraction, latency, concurrency, clients):
+    """Crawl stand-in publisher sites for `journalists` names, `clients` at a time, and report throughput"""
+    from concurrent.futures import ThreadPoolExecutor
+    from bench_servers import AuthorPageServer
+
+    server = AuthorPageServer(hosts=hosts, latency=latency, email_fraction=email_fraction).start()
+    crawler = AuthorPageCrawler(concurrency=concurrency, delay=delay)
+    people = server.sample_authors(journalists, hosts)
+    try:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=clients) as pool:
+            found = list(pool.map(
+                lambda p: crawler.find_email(p["first_name"], p["last_name"], p["domain"], [p["article"]], 70),
+                people,
+            ))
+        elapsed = time.perf_counter() - started
+    finally:
+        crawler.close()
+        server.stop()
+
+    correct = sum(1 for p, hit in zip(people, found) if hit and hit[0] == p["email"])
+    wrong = sum(1 for p, hit in zip(people, found) if hit and hit[0] != p["email"])
+    published = sum(1 for p in people if p["email"])
+    print(f"{len(people)} journalists on {hosts} hosts in {elapsed:.2f}s: "
+          f"{len(people) / elapsed:.1f} journalists/s, {server.requests / elapsed:.1f} pages/s "
+          f"({server.requests} requests)")
+    print(f"found {correct} of {published} published addresses, {wrong} wrong")
+
+    html = server.article_html(0, 0)
+    rounds = 200
+    started = time.perf_counter()
+    for _ in range(rounds):
+        scan_page(html)
+    elapsed = time.perf_counter() - started
+    print(f"page scan: {len(html) * rounds / elapsed / 1e6:.1f} MB/s on a {len(html) // 1024} KiB article page")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find a journalist's address on the publisher's pages")
+    commands = parser.add_subparsers(dest="command", required=True)
+    find_cmd = commands.add_parser("find", help="crawl from one article URL")
+    find_cmd.add_argument("first_name")
+    find_cmd.add_argument("last_name")
+    find_cmd.add_argument("domain")
+    find_cmd.add_argument("article_url")
+    bench_cmd = commands.add_parser("bench", help="throughput against local publisher site stand-ins")
+    bench_cmd.add_argument("--journalists", type=int, default=300)
+    bench_cmd.add_argument("--hosts", type=int, default=30)
+    bench_cmd.add_argument("--delay", type=float, default=CRAWL_DOMAIN_DELAY)
+    bench_cmd.add_argument("--email-fraction", type=float, default=0.6)
+    bench_cmd.add_argument("--latency", type=float, default=0.02)
+    bench_cmd.add_argument("--concurrency", type=int, default=CRAWL_CONCURRENCY, help="pages in flight")
+    bench_cmd.add_argument("--clients", type=int, default=64, help="journalists looked up at once")
+    args = parser.parse_args()
+
+    if args.command == "find":
+        found = author_page_crawler.find_email(args.first_name, args.last_name, args.domain,
+                                               [args.article_url], 0)
+        print(f"{found[0]} (score: {found[1]})" if found else "no address found")
+        author_page_crawler.close()
+    elif args.command == "bench":
+        benchmark(args.journalists, args.hosts, args.delay, args.email_fraction, args.latency, args.concurrency,
+                  args.clients)
+
+
+if __name__ == "__main__":
+    main()
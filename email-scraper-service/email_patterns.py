@@ -0,0 +1,148 @@
+import os
+import re
+import threading
+import unicodedata
+
+# A domain's pattern is trusted once this many verified addresses were seen...
+EMAIL_PATTERN_MIN_SAMPLES = int(os.getenv("EMAIL_PATTERN_MIN_SAMPLES", 5))
+# ...and at least this share of them follow it
+EMAIL_PATTERN_MIN_SHARE = float(os.getenv("EMAIL_PATTERN_MIN_SHARE", 0.8))
+# Every Nth inferred address is still looked up on Hunter to confirm the pattern (0 = never)
+EMAIL_PATTERN_CONFIRM_EVERY = int(os.getenv("EMAIL_PATTERN_CONFIRM_EVERY", 10))
+# Inferred addresses are scored by pattern share, but never above this
+EMAIL_PATTERN_MAX_SCORE = 95
+
+# Local-part formats, from most to least common at publishers
+PATTERNS = {
+    "first.last": lambda f, l: f"{f}.{l}",
+    "flast": lambda f, l: f"{f[0]}{l}",
+    "first": lambda f, l: f,
+    "firstlast": lambda f, l: f"{f}{l}",
+    "first_last": lambda f, l: f"{f}_{l}",
+    "f.last": lambda f, l: f"{f[0]}.{l}",
+    "firstl": lambda f, l: f"{f}{l[0]}",
+    "last": lambda f, l: l,
+    "last.first": lambda f, l: f"{l}.{f}",
+    "lastf": lambda f, l: f"{l}{f[0]}",
+}
+
+_LOCAL_CHARS_RE = re.compile(r"[^a-z0-9-]")
+
+
+def _local_name(name):
+    """A name as it appears in an address: "José" -> "jose", "Van der Berg" -> "vanderberg" """
+    decomposed = unicodedata.normalize("NFKD", name or "")
+    ascii_name = "".join(c for c in decomposed if not unicodedata.combining(c)).lower()
+    return _LOCAL_CHARS_RE.sub("", ascii_name)
+
+
+def format_email(pattern, first_name, last_name, domain):
+    """The address `pattern` gives for a name, or None if the name can't fill it"""
+    first, last = _local_name(first_name), _local_name(last_name)
+    if not first or not last:
+        return None
+    return f"{PATTERNS[pattern](first, last)}@{domain.lower()}"
+
+
+def detect_patterns(first_name, last_name, email):
+    """Names of the patterns that produce `email`'s local part for this name"""
+    local, _, _ = email.lower().partition("@")
+    first, last = _local_name(first_name), _local_name(last_name)
+    if not first or not last:
+        return []
+    return [name for name, build in PATTERNS.items() if build(first, last) == local]
+
+
+class _DomainPatterns:
+    __slots__ = ("counts", "samples", "inferred")
+
+    def __init__(self):
+        self.counts = {}
+        self.samples = 0
+        self.inferred = 0
+
+
+class EmailPatternLearner:
+    """
+    Learns each domain's address format from verified lookups and, once one
+    format clearly dominates, predicts addresses for new names at that domain.
+    An address matching several formats (e.g. a one-letter first name) splits
+    its weight between them; one matching none counts against every format.
+    """
+
+    def __init__(self, min_samples=EMAIL_PATTERN_MIN_SAMPLES, min_share=EMAIL_PATTERN_MIN_SHARE,
+                 confirm_every=EMAIL_PATTERN_CONFIRM_EVERY):
+        self.min_samples = min_samples
+        self.min_share = min_share
+        self.confirm_every = confirm_every
+        self._domains = {}
+        self._lock = threading.Lock()
+
+    def observe(self, first_name, last_name, domain, email):
+        """Record a verified address; returns the domain's pattern afterwards, as pattern()"""
+        domain = domain.lower()
+        matches = []
+        if email.lower().endswith(f"@{domain}"):
+            matches = detect_patterns(first_name, last_name, email)
+        with self._lock:
+            state = self._domains.setdefault(domain, _DomainPatterns())
+            state.samples += 1
+            for name in matches:
+                state.counts[name] = state.counts.get(name, 0.0) + 1.0 / len(matches)
+            return self._pattern(state)
+
+    def _pattern(self, state):
+        if state.samples < self.min_samples or not state.counts:
+            return None
+        name, weight = max(state.counts.items(), key=lambda item: item[1])
+        share = weight / state.samples
+        return (name, share) if share >= self.min_share else None
+
+    def pattern(self, domain):
+        """(pattern name, share of verified addresses) when the domain has a confident pattern"""
+        with self._lock:
+            state = self._domains.get(domain.lower())
+            return self._pattern(state) if state is not None else None
+
+    def infer(self, first_name, last_name, domain):
+        """
+        Predicted (email, score, confirm) for a name, or None when the domain's
+        format is unknown or ambiguous. `confirm` marks the inferences that
+        should still be checked against Hunter.
+        """
+        with self._lock:
+            state = self._domains.get(domain.lower())
+            found = self._pattern(state) if state is not None else None
+            if found is None:
+                return None
+            email = format_email(found[0], first_name, last_name, domain)
+            if email is None:
+                return None
+            state.inferred += 1
+            confirm = bool(self.confirm_every) and state.inferred % self.confirm_every == 0
+        return email, min(EMAIL_PATTERN_MAX_SCORE, round(found[1] * 100)), confirm
+
+    def stats(self):
+        with self._lock:
+            domains = list(self._domains.values())
+        confident = sum(1 for state in domains if self._pattern(state) is not None)
+        return {"domains": len(domains), "confident_domains": confident}
+
+
+_learner = None
+_learner_lock = threading.Lock()
+
+
+def get_email_patterns(cache=None, min_score=0):
+    """
+    Shared learner. On first use it is seeded with the verified Hunter answers
+    (score >= `min_score`) still live in the enrichment cache `cache`.
+    """
+    global _learner
+    with _learner_lock:
+        if _learner is None:
+            _learner = EmailPatternLearner()
+            if cache is not None:
+                for first_name, last_name, domain, email in cache.verified(min_score):
+                    _learner.observe(first_name, last_name, domain, email)
+    return _learner
@@ -0,0 +1,669 @@
+import asyncio
+import json
+import os
+import queue
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import metrics
+from async_http import http_get, run_blocking, single_flight
+from enrichment_cache import get_enrichment_cache, cache_key
+from email_patterns import get_email_patterns
+from email_finder import AUTHOR_PAGE_CRAWL, author_page_crawler
+from rate_limiter import TokenBucket, MonthlyQuota
+from shared_cache import WEB_CONCURRENCY, get_shared_cache
+
+MIN_CONFIDENCE = 70
+# Addresses no one has confirmed: predicted from the domain's pattern or read off the publisher's
+# pages. Kept apart from "verified" (and from Hunter's email_source) whatever their score, so
+# nothing is sent to them as if Hunter had checked them
+UNVERIFIED_SOURCES = ("pattern", "author_page")
+
+HUNTER_API_URL = os.getenv("HUNTER_API_URL", "https://api.hunter.io/v2/email-finder")
+# Hunter's Email Finder allows 15 requests/second; the monthly quota depends on the plan (0 = unlimited)
+HUNTER_RATE_PER_SECOND = float(os.getenv("HUNTER_RATE_PER_SECOND", 15))
+HUNTER_MONTHLY_QUOTA = int(os.getenv("HUNTER_MONTHLY_QUOTA", 0))
+HUNTER_MAX_RETRIES = int(os.getenv("HUNTER_MAX_RETRIES", 3))
+HUNTER_BACKOFF_BASE = float(os.getenv("HUNTER_BACKOFF_BASE", 0.5))
+ENRICHMENT_WORKERS = int(os.getenv("ENRICHMENT_WORKERS", 8))
+# find_email_with_hunter sources meaning no lookup happened, as opposed to "not_found"
+HUNTER_UNAVAILABLE = ("missing_api_key", "quota_exceeded", "api_error", "error")
+
+# Each worker process gets an equal share of the rate; the quota is counted in the shared cache
+hunter_rate_limiter = TokenBucket(HUNTER_RATE_PER_SECOND / WEB_CONCURRENCY)
+hunter_quota = MonthlyQuota(HUNTER_MONTHLY_QUOTA, get_shared_cache, "hunter-quota")
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def _hunter_session():
+    """
+    The sync path's pooled Hunter session, created on first use: requests is
+    only imported then, so a service on the async path never loads it
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            _session = requests.Session()
+            _session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=ENRICHMENT_WORKERS))
+            _session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=ENRICHMENT_WORKERS))
+    return _session
+
+
+def _backoff_delay(attempt, retry_after=None):
+    """Exponential backoff with full jitter, honouring Retry-After when given"""
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+    return HUNTER_BACKOFF_BASE * (2 ** attempt) * random.uniform(0.5, 1.5)
+
+
+def _retry_delay(status, headers, attempt):
+    """Seconds to wait before retrying a 429 or 5xx reply, or None to stop"""
+    if (status == 429 or status >= 500) and attempt < HUNTER_MAX_RETRIES:
+        delay = _backoff_delay(attempt, headers.get("Retry-After"))
+        print(f"    Hunter returned {status}, retrying in {delay:.1f}s")
+        return delay
+    return None
+
+
+def _hunter_params(first_name, last_name, domain):
+    api_key = os.getenv("HUNTER_API_KEY")
+    if not api_key:
+        print(f" HUNTER_API_KEY missing for {first_name} {last_name}")
+        return None
+
+    return {
+        "first_name": first_name,
+        "last_name": last_name,
+        "domain": domain,
+        "api_key": api_key
+    }
+
+
+def _hunter_answer(first_name, last_name, domain, ok, data):
+    """(email, score, source) from Hunter's reply, caching answers and misses"""
+    if not ok:
+        print(f"Hunter API error: {data}")
+        return None, 0, "api_error"
+
+    if data.get("data") and data["data"].get("email"):
+        email = data["data"]["email"]
+        score = data["data"].get("score", 0)
+        print(f"    ✓ Found: {email} (score: {score})")
+        get_enrichment_cache().put(first_name, last_name, domain, email, score, "hunter")
+        return (email, score, "hunter")
+
+    print(f"    ✗ Not found")
+    get_enrichment_cache().put(first_name, last_name, domain, None, 0, "not_found")
+    return None, 0, "not_found"
+
+
+def find_email_with_hunter(first_name, last_name, domain):
+    """
+    Look up a journalist's email with Hunter.io.
+    Answers and misses are stored in the enrichment cache; API errors are not.
+    Rate limited to Hunter's quotas, retrying 429 and 5xx replies with backoff.
+    """
+    params = _hunter_params(first_name, last_name, domain)
+    if params is None:
+        return None, 0, "missing_api_key"
+
+    try:
+        print(f"  [{first_name} {last_name}] Searching Hunter @ {domain}")
+        for attempt in range(HUNTER_MAX_RETRIES + 1):
+            if not hunter_quota.try_consume():
+                print(f"Hunter monthly quota of {hunter_quota.limit} reached, skipping {first_name} {last_name}")
+                return None, 0, "quota_exceeded"
+            hunter_rate_limiter.acquire()
+
+            res = _hunter_session().get(HUNTER_API_URL, params=params, timeout=5)
+            metrics.hunter_requests.inc(str(res.status_code))
+            delay = _retry_delay(res.status_code, res.headers, attempt)
+            if delay is None:
+                break
+            time.sleep(delay)
+
+        return _hunter_answer(first_name, last_name, domain, res.ok, res.json())
+    except Exception as e:
+        print(f"Hunter error for {first_name} {last_name}: {e}")
+        return None, 0, "error"
+
+
+async def find_email_with_hunter_async(first_name, last_name, domain):
+    """find_email_with_hunter on the shared async session"""
+    params = _hunter_params(first_name, last_name, domain)
+    if params is None:
+        return None, 0, "missing_api_key"
+
+    try:
+        print(f"  [{first_name} {last_name}] Searching Hunter @ {domain}")
+        for attempt in range(HUNTER_MAX_RETRIES + 1):
+            if not await hunter_quota.try_consume_async():
+                print(f"Hunter monthly quota of {hunter_quota.limit} reached, skipping {first_name} {last_name}")
+                return None, 0, "quota_exceeded"
+            await hunter_rate_limiter.acquire_async()
+
+            status, headers, body = await http_get(HUNTER_API_URL, 5, params=params)
+            metrics.hunter_requests.inc(str(status))
+            delay = _retry_delay(status, headers, attempt)
+            if delay is None:
+                break
+            await asyncio.sleep(delay)
+
+        # Caching the answer writes to SQLite, so it goes to the worker pool
+        return await run_blocking(_hunter_answer, first_name, last_name, domain, status < 400, json.loads(body))
+    except Exception as e:
+        print(f"Hunter error for {first_name} {last_name}: {e}")
+        return None, 0, "error"
+
+
+def _lookup_local(first_name, last_name, domain):
+    """
+    The answer lookup_email can give without Hunter, as (answer, None), or
+    (None, the domain pattern's prediction for Hunter to confirm, if any).
+    """
+    cache = get_enrichment_cache()
+    cached = cache.get(first_name, last_name, domain)
+    metrics.enrichment_cache_lookups.inc("miss" if cached is None else "hit")
+    if cached is not None:
+        email, score, source = cached
+        print(f"  [{first_name} {last_name}] Cache hit @ {domain}: {email or 'not found'}")
+        return (email, score, source, "cache"), None
+
+    patterns = get_email_patterns(cache, MIN_CONFIDENCE)
+    inferred = patterns.infer(first_name, last_name, domain)
+    if inferred is not None and not inferred[2]:
+        email, score, _ = inferred
+        metrics.email_pattern_lookups.inc("inferred")
+        print(f"  [{first_name} {last_name}] Inferred @ {domain}: {email} (score: {score})")
+        cache.put(first_name, last_name, domain, email, score, "pattern")
+        return (email, score, "pattern", "pattern"), None
+    return None, inferred
+
+
+def _lookup_key(first_name, last_name, domain):
+    return "lookup:" + "|".join(cache_key(first_name, last_name, domain))
+
+
+def _peer_answer(first_name, last_name, domain):
+    """
+    lookup_email's answer when another thread or worker resolved the
+    journalist while this one waited for the lookup lock, else None
+    """
+    cached = get_enrichment_cache().get(first_name, last_name, domain)
+    if cached is None:
+        return None
+    metrics.enrichment_cache_lookups.inc("hit")
+    return (*cached, "cache")
+
+
+def _settle_lookup(first_name, last_name, domain, inferred, found):
+    """
+    lookup_email's answer from Hunter's (email, score, source), or from the
+    crawler's. Only Hunter-verified addresses teach the domain's pattern, as
+    only those re-seed the learner after a restart.
+    """
+    email, score, source = found
+    cache = get_enrichment_cache()
+    patterns = get_email_patterns(cache, MIN_CONFIDENCE)
+    if inferred is not None and source in HUNTER_UNAVAILABLE:
+        # The confirmation couldn't happen; the prediction is still the best answer we have
+        metrics.email_pattern_lookups.inc("inferred")
+        cache.put(first_name, last_name, domain, inferred[0], inferred[1], "pattern")
+        return inferred[0], inferred[1], "pattern", "pattern"
+    if source == "hunter" and email and score >= MIN_CONFIDENCE:
+        before = patterns.pattern(domain)
+        after = patterns.observe(first_name, last_name, domain, email)
+        if before is not None and (after is None or after[0] != before[0]):
+            # The domain's format is no longer clear; stop serving addresses inferred from it
+            removed = cache.purge(expired_only=False, domain=domain, source="pattern")
+            print(f"    Email pattern for {domain} no longer holds, dropped {removed} inferred addresses")
+    if inferred is not None:
+        if email == inferred[0]:
+            metrics.email_pattern_lookups.inc("confirmed")
+        else:
+            metrics.email_pattern_lookups.inc("mismatch" if email else "unconfirmed")
+    return email, score, source, None
+
+
+def _settle_crawl(first_name, last_name, domain, inferred, crawled):
+    """lookup_email's answer from the (email, score) the publisher's own pages list"""
+    email, score = crawled
+    print(f"  [{first_name} {last_name}] Found on publisher pages @ {domain}: {email} (score: {score})")
+    get_enrichment_cache().put(first_name, last_name, domain, email, score, "author_page")
+    email, score, source, _ = _settle_lookup(first_name, last_name, domain, inferred, (email, score, "author_page"))
+    return email, score, source, "author_page"
+
+
+def lookup_email(first_name, last_name, domain, article_urls=()):
+    """
+    Resolve an email from the enrichment cache, then from the domain's learned
+    address pattern, then from the publisher's pages reachable from
+    `article_urls`, falling back to Hunter.io. One thread across all workers
+    looks a journalist up remotely at a time; the others use its answer.
+    Returns (email, score, source, served_from) where served_from is "cache",
+    "pattern", "author_page" or None for a Hunter lookup.
+    """
+    answer, inferred = _lookup_local(first_name, last_name, domain)
+    if answer is not None:
+        return answer
+    with get_shared_cache().lock(_lookup_key(first_name, last_name, domain)):
+        return _peer_answer(first_name, last_name, domain) \
+            or _lookup_remote(first_name, last_name, domain, article_urls, inferred)
+
+
+def _lookup_remote(first_name, last_name, domain, article_urls, inferred):
+    if AUTHOR_PAGE_CRAWL and article_urls:
+        crawled = author_page_crawler.find_email(first_name, last_name, domain, article_urls, MIN_CONFIDENCE)
+        if crawled is not None:
+            return _settle_crawl(first_name, last_name, domain, inferred, crawled)
+    found = find_email_with_hunter(first_name, last_name, domain)
+    return _settle_lookup(first_name, last_name, domain, inferred, found)
+
+
+def _article_urls(j):
+    return [url for _, url, _ in list(j.recent_articles) if url]
+
+
+def new_enrichment_stats():
+    return {"verified": 0, "unverified": 0, "low_confidence": 0, "fallback": 0, "not_found": 0,
+            "cache_hits": 0, "pattern_inferred": 0, "author_pages": 0}
+
+
+def enrich_journalist(j, timings=None):
+    """
+    Attach an email to one Journalist record in place, timed as the enrich stage.
+    Returns (the journalist, stats bucket, served_from) as lookup_email.
+    """
+    with metrics.span("enrich", j.publication_name, timings):
+        return _enrich_journalist(j)
+
+
+def _enrich_locally(journalists, timings=None):
+    """
+    Enrichment's first step (run on the worker pool by the async path):
+    enrich the journalists that need no network call (fallbacks, cache hits and pattern
+    inferences) in one pass. Returns a result per journalist as
+    enrich_journalist, None where a crawl or Hunter is still needed, and the
+    (index, inferred) pairs of those.
+    """
+    results = []
+    pending = []
+    for i, j in enumerate(journalists):
+        started = time.perf_counter()
+        if not j.first_name or not j.last_name:
+            j.set_email(f"editor@{j.domain}", 0, "fallback")
+            results.append((j, "fallback", None))
+        else:
+            answer, inferred = _lookup_local(j.first_name, j.last_name, j.domain)
+            if answer is None:
+                results.append(None)
+                pending.append((i, inferred))
+                continue
+            results.append(_apply_lookup(j, *answer))
+        metrics.record("enrich", time.perf_counter() - started, j.publication_name, timings)
+    return results, pending
+
+
+async def _enrich_remotely(j, inferred, limit, timings=None):
+    """
+    Finish enriching `j` from the publisher's pages or, failing that, a Hunter
+    lookup on the async session holding `limit` during the call. Concurrent
+    requests for the same person share one lookup; those that joined it count
+    it as a cache hit, as do other workers waiting on its lookup lock.
+    """
+    with metrics.span("enrich", j.publication_name, timings):
+        answer, shared = await single_flight(
+            ("lookup", j.first_name, j.last_name, j.domain), _remote_lookup,
+            j.first_name, j.last_name, j.domain, _article_urls(j), inferred, limit
+        )
+        if shared:
+            answer = (*answer[:3], answer[3] or "cache")
+        return _apply_lookup(j, *answer)
+
+
+async def _remote_lookup(first_name, last_name, domain, article_urls, inferred, limit):
+    async with get_shared_cache().lock_async(_lookup_key(first_name, last_name, domain)):
+        # Cache reads and writes go through the worker pool: a busy SQLite file can block them for seconds
+        return await run_blocking(_peer_answer, first_name, last_name, domain) \
+            or await _lookup_remote_async(first_name, last_name, domain, article_urls, inferred, limit)
+
+
+async def _lookup_remote_async(first_name, last_name, domain, article_urls, inferred, limit):
+    if AUTHOR_PAGE_CRAWL and article_urls:
+        crawled = await author_page_crawler.find_email_async(
+            first_name, last_name, domain, article_urls, MIN_CONFIDENCE
+        )
+        if crawled is not None:
+            return await run_blocking(_settle_crawl, first_name, last_name, domain, inferred, crawled)
+    async with limit:
+        found = await find_email_with_hunter_async(first_name, last_name, domain)
+    return await run_blocking(_settle_lookup, first_name, last_name, domain, inferred, found)
+
+
+def _submit_remote(j, inferred, executor, timings=None):
+    """
+    The sync path's counterpart of _enrich_remotely: a Future of
+    enrich_journalist's result for `j`, whose local lookup came up empty. The
+    crawl runs on the crawler's own loop, so no thread waits on it; its
+    answer is settled, or Hunter asked, on `executor`. The journalist's
+    lookup lock is held until the Future is done. Waiting for a lock another
+    thread or worker holds doesn't take one of `executor`'s threads either:
+    that holder may need a thread from its own executor to finish, and
+    blocked waiters on both sides would deadlock until the lock expires.
+    """
+    started = time.perf_counter()
+    store = get_shared_cache()
+    key = _lookup_key(j.first_name, j.last_name, j.domain)
+    result = Future()
+
+    def locked(acquired):
+        token = acquired.result()
+        try:
+            answer = _peer_answer(j.first_name, j.last_name, j.domain)
+            if answer is None:
+                step = _crawl_then_enrich(j, inferred, executor, started, timings)
+                step.add_done_callback(lambda done: (store.unlock(key, token), _copy_outcome(done, result)))
+                return
+            store.unlock(key, token)
+            metrics.record("enrich", time.perf_counter() - started, j.publication_name, timings)
+            result.set_result(_apply_lookup(j, *answer))
+        except Exception as e:
+            store.unlock(key, token)
+            result.set_exception(e)
+
+    store.acquire(key).add_done_callback(locked)
+    return result
+
+
+def _crawl_then_enrich(j, inferred, executor, started, timings=None):
+    article_urls = _article_urls(j)
+    if not (AUTHOR_PAGE_CRAWL and article_urls):
+        return executor.submit(_enrich_after_crawl, j, inferred, None, started, timings)
+
+    result = Future()
+
+    def crawled(crawl):
+        try:
+            step = executor.submit(_enrich_after_crawl, j, inferred, crawl.result(), started, timings)
+            step.add_done_callback(lambda done: _copy_outcome(done, result))
+        except Exception as e:
+            result.set_exception(e)
+
+    author_page_crawler.submit(j.first_name, j.last_name, j.domain, article_urls, MIN_CONFIDENCE) \
+        .add_done_callback(crawled)
+    return result
+
+
+def _enrich_after_crawl(j, inferred, crawled, started, timings=None):
+    if crawled is not None:
+        answer = _settle_crawl(j.first_name, j.last_name, j.domain, inferred, crawled)
+    else:
+        found = find_email_with_hunter(j.first_name, j.last_name, j.domain)
+        answer = _settle_lookup(j.first_name, j.last_name, j.domain, inferred, found)
+    metrics.record("enrich", time.perf_counter() - started, j.publication_name, timings)
+    return _apply_lookup(j, *answer)
+
+
+def _copy_outcome(source, target):
+    if source.cancelled():
+        target.cancel()
+    elif source.exception() is not None:
+        target.set_exception(source.exception())
+    else:
+        target.set_result(source.result())
+
+
+def _resolved(value):
+    future = Future()
+    future.set_result(value)
+    return future
+
+
+def _enrich_journalist(j):
+    # Skip Hunter if no real author name
+    if not j.first_name or not j.last_name:
+        j.set_email(f"editor@{j.domain}", 0, "fallback")
+        return j, "fallback", None
+
+    return _apply_lookup(j, *lookup_email(j.first_name, j.last_name, j.domain, _article_urls(j)))
+
+
+def _apply_lookup(j, email, confidence, source, served_from):
+    # Reject low-confidence emails
+    if not email or confidence < MIN_CONFIDENCE:
+        j.set_email(f"editor@{j.domain}", confidence, "low_confidence")
+        return j, "not_found" if confidence == 0 else "low_confidence", served_from
+
+    j.set_email(email, confidence, source)
+    return j, "unverified" if source in UNVERIFIED_SOURCES else "verified", served_from
+
+
+def record_enrichment(stats, bucket, served_from):
+    stats[bucket] += 1
+    if served_from == "cache":
+        stats["cache_hits"] += 1
+    elif served_from == "pattern":
+        stats["pattern_inferred"] += 1
+    elif served_from == "author_page":
+        stats["author_pages"] += 1
+
+
+def enrich_journalists(journalists, max_workers=ENRICHMENT_WORKERS, timings=None):
+    """
+    Enrich journalists concurrently: cache hits and inferences first, then
+    every remaining journalist's publisher pages crawled at once, and Hunter
+    lookups over a pooled session for those still unresolved.
+    Output keeps the input order, so results and stats match a sequential run.
+    """
+    stats = new_enrichment_stats()
+    if not journalists:
+        return [], stats
+
+    results, pending = _enrich_locally(journalists, timings)
+    if pending:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(pending)))) as executor:
+            remote = [(i, _submit_remote(journalists[i], inferred, executor, timings)) for i, inferred in pending]
+            for i, future in remote:
+                results[i] = future.result()
+    return _collect_results(results, stats)
+
+
+async def enrich_journalists_async(journalists, max_workers=ENRICHMENT_WORKERS, timings=None):
+    """
+    enrich_journalists on the event loop: cache hits and inferences are
+    resolved in one worker pool call, then the rest are looked for on the
+    publisher's pages, with up to `max_workers` Hunter lookups for those
+    still unresolved running concurrently on the shared async client.
+    """
+    stats = new_enrichment_stats()
+    if not journalists:
+        return [], stats
+
+    results, pending = await run_blocking(_enrich_locally, journalists, timings)
+    if pending:
+        limit = asyncio.Semaphore(max(1, max_workers))
+        found = await asyncio.gather(*(
+            _enrich_remotely(journalists[i], inferred, limit, timings) for i, inferred in pending
+        ))
+        for (i, _), result in zip(pending, found):
+            results[i] = result
+    return _collect_results(results, stats)
+
+
+def _collect_results(results, stats):
+    enriched = []
+    for record, bucket, served_from in results:
+        enriched.append(record)
+        record_enrichment(stats, bucket, served_from)
+
+    return enriched, stats
+
+
+def enrich_journalist_lists(journalist_lists, max_workers=ENRICHMENT_WORKERS, timings=None):
+    """
+    Enrich several journalist lists (e.g. one per batch query) with a single
+    lookup per distinct journalist, however many lists they appear in.
+    Returns (enriched lists, stats over the distinct journalists).
+    """
+    unique = _distinct_journalists(journalist_lists)
+    _, stats = enrich_journalists(list(unique.values()), max_workers, timings)
+    _copy_emails(journalist_lists, unique)
+    return journalist_lists, stats
+
+
+async def enrich_journalist_lists_async(journalist_lists, max_workers=ENRICHMENT_WORKERS, timings=None):
+    """enrich_journalist_lists with enrich_journalists_async"""
+    unique = _distinct_journalists(journalist_lists)
+    _, stats = await enrich_journalists_async(list(unique.values()), max_workers, timings)
+    _copy_emails(journalist_lists, unique)
+    return journalist_lists, stats
+
+
+def _distinct_journalists(journalist_lists):
+    unique = {}
+    for journalists in journalist_lists:
+        for j in journalists:
+            unique.setdefault(cache_key(j.first_name, j.last_name, j.domain), j)
+    return unique
+
+
+def _copy_emails(journalist_lists, unique):
+    for journalists in journalist_lists:
+        for j in journalists:
+            if not j.enriched:
+                source = unique[cache_key(j.first_name, j.last_name, j.domain)]
+                j.set_email(source.email, source.email_confidence, source.email_source)
+
+
+def iter_enrich_journalists(batches, stats=None, max_workers=ENRICHMENT_WORKERS, timings=None):
+    """
+    Enrich journalists as they arrive.
+    `batches` is an iterable of journalist lists (e.g. one per feed) consumed on a
+    background thread; each enriched record is yielded as soon as its lookup
+    resolves. Stats are accumulated into `stats` when given.
+    """
+    if stats is None:
+        stats = new_enrichment_stats()
+
+    events = queue.Queue()
+    executor = ThreadPoolExecutor(max_workers=max(1, max_workers))
+    submitted = []
+
+    def produce():
+        try:
+            for batch in batches:
+                if not batch:
+                    continue
+                results, pending = _enrich_locally(batch, timings)
+                for result in results:
+                    if result is not None:
+                        submitted.append(_resolved(result))
+                        events.put(submitted[-1])
+                for i, inferred in pending:
+                    future = _submit_remote(batch[i], inferred, executor, timings)
+                    future.add_done_callback(events.put)
+                    submitted.append(future)
+            events.put(("done", None))
+        except Exception as e:
+            events.put(("done", e))
+
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+
+    received = 0
+    total = None
+    try:
+        while total is None or received < total:
+            event = events.get()
+            if isinstance(event, tuple):
+                _, error = event
+                if error is not None:
+                    raise error
+                total = len(submitted)
+                continue
+
+            received += 1
+            record, bucket, served_from = event.result()
+            record_enrichment(stats, bucket, served_from)
+            yield record
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def iter_enrich_journalists_async(batches, stats=None, max_workers=ENRICHMENT_WORKERS, timings=None):
+    """
+    iter_enrich_journalists for the event loop: `batches` is an async iterable
+    of journalist lists. Each batch's cache hits and inferences are yielded
+    as soon as it arrives, the rest as their crawls or Hunter lookups
+    resolve, with up to `max_workers` Hunter lookups in flight.
+    """
+    if stats is None:
+        stats = new_enrichment_stats()
+
+    limit = asyncio.Semaphore(max(1, max_workers))
+    # Enrichment results, finished remote lookup tasks and finally the producer itself
+    finished = asyncio.Queue()
+    tasks = []
+    submitted = 0
+
+    async def produce():
+        nonlocal submitted
+        async for batch in batches:
+            if not batch:
+                continue
+            results, pending = await run_blocking(_enrich_locally, batch, timings)
+            submitted += len(batch)
+            for result in results:
+                if result is not None:
+                    finished.put_nowait(result)
+            for i, inferred in pending:
+                task = asyncio.ensure_future(_enrich_remotely(batch[i], inferred, limit, timings))
+                task.add_done_callback(finished.put_nowait)
+                tasks.append(task)
+
+    producer = asyncio.ensure_future(produce())
+    producer.add_done_callback(finished.put_nowait)
+
+    received = 0
+    try:
+        while not (producer.done() and received == submitted):
+            item = await finished.get()
+            if item is producer:
+                # Raises what the scrape raised
+                item.result()
+                continue
+
+            received += 1
+            record, bucket, served_from = item.result() if isinstance(item, asyncio.Future) else item
+            record_enrichment(stats, bucket, served_from)
+            yield record
+        producer.result()
+    finally:
+        producer.cancel()
+        for task in tasks:
+            task.cancel()
+
+
+def print_enrichment_summary(stats, total):
+    print(f"\n{'='*60}")
+    print(f" Enrichment Summary:")
+    print(f" Verified emails (>={MIN_CONFIDENCE}% confidence): {stats['verified']}")
+    print(f" Unverified emails (inferred or from publisher pages): {stats['unverified']}")
+    print(f" Low confidence emails: {stats['low_confidence']}")
+    print(f" No email found: {stats['not_found']}")
+    print(f" Fallback emails: {stats['fallback']}")
+    print(f" Served from enrichment cache: {stats['cache_hits']}")
+    print(f" Inferred from domain email patterns: {stats['pattern_inferred']}")
+    print(f" Found on publisher pages: {stats['author_pages']}")
+    print(f" Total journalists: {total}")
+    print(f"{'='*60}\n")
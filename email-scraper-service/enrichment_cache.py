@@ -0,0 +1,193 @@
+import argparse
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+ENRICHMENT_CACHE_PATH = os.getenv(
+    "ENRICHMENT_CACHE_PATH",
+    str(Path(__file__).parent / "enrichment_cache.sqlite3")
+)
+# Found emails are kept for 30 days, misses for 3 days by default
+ENRICHMENT_CACHE_TTL = int(os.getenv("ENRICHMENT_CACHE_TTL", 30 * 24 * 3600))
+ENRICHMENT_NEGATIVE_TTL = int(os.getenv("ENRICHMENT_NEGATIVE_TTL", 3 * 24 * 3600))
+
+
+def cache_key(first_name, last_name, domain):
+    return (
+        (first_name or "").strip().lower(),
+        (last_name or "").strip().lower(),
+        (domain or "").strip().lower(),
+    )
+
+
+class EnrichmentCache:
+    """
+    On-disk cache of Hunter.io lookups keyed by (first_name, last_name, domain).
+    Negative results (no email found) are cached too, with a shorter TTL.
+    """
+
+    def __init__(self, path=ENRICHMENT_CACHE_PATH, ttl=ENRICHMENT_CACHE_TTL,
+                 negative_ttl=ENRICHMENT_NEGATIVE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS enrichment (
+                first_name TEXT NOT NULL,
+                last_name TEXT NOT NULL,
+                domain TEXT NOT NULL,
+                email TEXT,
+                score INTEGER NOT NULL DEFAULT 0,
+                source TEXT NOT NULL,
+                looked_up_at REAL NOT NULL,
+                PRIMARY KEY (first_name, last_name, domain)
+            )
+        """)
+        self._conn.commit()
+
+    def _expires_at(self, email, looked_up_at):
+        return looked_up_at + (self.ttl if email else self.negative_ttl)
+
+    def get(self, first_name, last_name, domain):
+        """Return (email, score, source) for a live entry, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT email, score, source, looked_up_at FROM enrichment "
+                "WHERE first_name = ? AND last_name = ? AND domain = ?",
+                cache_key(first_name, last_name, domain)
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        email, score, source, looked_up_at = row
+        if time.time() >= self._expires_at(email, looked_up_at):
+            return None
+        return email, score, source
+
+    def put(self, first_name, last_name, domain, email, score, source):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO enrichment "
+                "(first_name, last_name, domain, email, score, source, looked_up_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (*cache_key(first_name, last_name, domain), email, score or 0, source, time.time())
+            )
+            self._conn.commit()
+
+    def entries(self, domain=None, limit=50):
+        query = ("SELECT first_name, last_name, domain, email, score, source, looked_up_at "
+                 "FROM enrichment")
+        params = []
+        if domain:
+            query += " WHERE domain = ?"
+            params.append(domain.lower())
+        query += " ORDER BY looked_up_at DESC LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            return self._conn.execute(query, params).fetchall()
+
+    def verified(self, min_score, source="hunter"):
+        """(first_name, last_name, domain, email) of live found entries from `source` scoring >= `min_score`"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT first_name, last_name, domain, email FROM enrichment "
+                "WHERE email IS NOT NULL AND source = ? AND score >= ? AND looked_up_at > ?",
+                (source, min_score, time.time() - self.ttl)
+            ).fetchall()
+
+    def purge(self, expired_only=True, domain=None, negative_only=False, source=None):
+        """Delete cache entries; returns the number of rows removed"""
+        now = time.time()
+        conditions = []
+        params = []
+        if expired_only:
+            conditions.append(
+                "((email IS NOT NULL AND looked_up_at <= ?) OR (email IS NULL AND looked_up_at <= ?))"
+            )
+            params.extend([now - self.ttl, now - self.negative_ttl])
+        if domain:
+            conditions.append("domain = ?")
+            params.append(domain.lower())
+        if negative_only:
+            conditions.append("email IS NULL")
+        if source:
+            conditions.append("source = ?")
+            params.append(source)
+
+        query = "DELETE FROM enrichment"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+
+        with self._lock:
+            removed = self._conn.execute(query, params).rowcount
+            self._conn.commit()
+        return removed
+
+    def stats(self):
+        now = time.time()
+        with self._lock:
+            total, found, negative, expired = self._conn.execute(
+                "SELECT COUNT(*), "
+                "COALESCE(SUM(email IS NOT NULL), 0), "
+                "COALESCE(SUM(email IS NULL), 0), "
+                "COALESCE(SUM((email IS NOT NULL AND looked_up_at <= ?) "
+                "OR (email IS NULL AND looked_up_at <= ?)), 0) "
+                "FROM enrichment",
+                (now - self.ttl, now - self.negative_ttl)
+            ).fetchone()
+        return {"entries": total, "found": found, "negative": negative, "expired": expired}
+
+
+_cache = None
+
+
+def get_enrichment_cache():
+    """Shared cache instance, opened on first use"""
+    global _cache
+    if _cache is None:
+        _cache = EnrichmentCache()
+    return _cache
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or purge the Hunter.io enrichment cache")
+    parser.add_argument("--path", default=ENRICHMENT_CACHE_PATH, help="cache file")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("stats", help="show entry counts")
+
+    list_cmd = commands.add_parser("list", help="show the most recent lookups")
+    list_cmd.add_argument("--domain")
+    list_cmd.add_argument("--limit", type=int, default=50)
+
+    purge_cmd = commands.add_parser("purge", help="delete entries (expired ones by default)")
+    purge_cmd.add_argument("--all", action="store_true", help="also delete live entries")
+    purge_cmd.add_argument("--domain")
+    purge_cmd.add_argument("--negative", action="store_true", help="only entries with no email")
+    purge_cmd.add_argument("--source", help="only entries from this source, e.g. pattern")
+
+    args = parser.parse_args()
+    cache = EnrichmentCache(path=args.path)
+
+    if args.command == "stats":
+        for name, value in cache.stats().items():
+            print(f"{name}: {value}")
+    elif args.command == "list":
+        for first, last, domain, email, score, source, looked_up_at in cache.entries(args.domain, args.limit):
+            when = time.strftime("%Y-%m-%d %H:%M", time.localtime(looked_up_at))
+            print(f"{when}  {first} {last} @ {domain}: {email or '-'} (score: {score}, source: {source})")
+    elif args.command == "purge":
+        removed = cache.purge(expired_only=not args.all, domain=args.domain, negative_only=args.negative,
+                              source=args.source)
+        print(f"Removed {removed} entries")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from shared_cache import WEB_CONCURRENCY, get_shared_cache
+
+FEED_CACHE_TTL = float(os.getenv("FEED_CACHE_TTL", 300))
+FEED_CACHE_MAX_BYTES = int(os.getenv("FEED_CACHE_MAX_BYTES", 50 * 1024 * 1024))
+# Fetched feeds are published to the shared cache so other workers reuse them
+# instead of fetching again (on by default when running several workers)
+FEED_CACHE_SHARED = os.getenv("FEED_CACHE_SHARED", "true" if WEB_CONCURRENCY > 1 else "false").lower() == "true"
+
+
+class CachedFeed:
+    """A fetched feed plus the validators needed to revalidate it"""
+
+    __slots__ = ("url", "content", "feed", "etag", "last_modified", "fetched_at")
+
+    def __init__(self, url, content, feed, etag=None, last_modified=None, fetched_at=None):
+        self.url = url
+        self.content = content
+        self.feed = feed
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = time.time() if fetched_at is None else fetched_at
+
+    @property
+    def size(self):
+        return len(self.content)
+
+    def is_fresh(self, ttl):
+        return time.time() - self.fetched_at < ttl
+
+    def conditional_headers(self):
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def encode(self):
+        """The raw feed and its validators as one shared cache value"""
+        header = json.dumps([self.etag, self.last_modified, self.fetched_at]).encode()
+        return header + b"\n" + self.content
+
+    @classmethod
+    def decode(cls, url, value):
+        """A CachedFeed, not yet parsed, from an encode()d value"""
+        header, _, content = value.partition(b"\n")
+        etag, last_modified, fetched_at = json.loads(header)
+        return cls(url, content, None, etag, last_modified, fetched_at)
+
+
+class FeedCache:
+    """
+    In-memory LRU cache of RSS feeds keyed by rss url.
+    Total size is capped by the raw feed bytes held; least recently used
+    feeds are evicted first once the cap is exceeded.
+    With `shared`, fetched feeds are also published to the shared cache for
+    other workers, which adopt them through shared_entry() and adopt().
+    """
+
+    def __init__(self, max_bytes=FEED_CACHE_MAX_BYTES, default_ttl=FEED_CACHE_TTL, shared=FEED_CACHE_SHARED):
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.shared = shared
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.adopted = 0
+
+    def get(self, url, ttl=None):
+        """
+        Look up a cached feed.
+        Returns (entry, fresh); entry is None on a miss, and fresh tells whether
+        it can be served without revalidating against the publisher.
+        """
+        ttl = self.default_ttl if ttl is None else ttl
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None:
+                return None, False
+            self._entries.move_to_end(url)
+            fresh = entry.is_fresh(ttl)
+            if fresh:
+                self.hits += 1
+            return entry, fresh
+
+    def put(self, url, content, feed, etag=None, last_modified=None):
+        entry = CachedFeed(url, content, feed, etag, last_modified)
+        with self._lock:
+            self._store(entry)
+            self.misses += 1
+        self._publish(entry)
+        return entry
+
+    def adopt(self, entry, feed):
+        """Cache a feed another worker fetched (a shared_entry()) once parsed here"""
+        entry.feed = feed
+        with self._lock:
+            self._store(entry)
+            self.adopted += 1
+        return entry
+
+    def touch(self, url):
+        """Mark a cached feed as fresh again after a 304 Not Modified"""
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is not None:
+                entry.fetched_at = time.time()
+                self._entries.move_to_end(url)
+                self.revalidated += 1
+        if entry is not None:
+            self._publish(entry)
+        return entry
+
+    def shared_entry(self, url):
+        """The copy of a feed other workers published (unparsed), or None"""
+        if not self.shared:
+            return None
+        value = get_shared_cache().get(f"feed:{url}")
+        return CachedFeed.decode(url, value) if value is not None else None
+
+    def _publish(self, entry):
+        if self.shared:
+            # Outlives the default TTL, as publishers can set a longer cache_ttl of their own
+            get_shared_cache().set(f"feed:{entry.url}", entry.encode(), ttl=max(self.default_ttl, 3600))
+
+    def _store(self, entry):
+        old = self._entries.pop(entry.url, None)
+        if old is not None:
+            self._size -= old.size
+        self._entries[entry.url] = entry
+        self._size += entry.size
+        self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _evict(self):
+        # Always keep the most recent entry, even if it alone exceeds the cap
+        while self._size > self.max_bytes and len(self._entries) > 1:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= evicted.size
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "revalidated": self.revalidated,
+                "misses": self.misses,
+                "adopted": self.adopted,
+            }
+
+
+feed_cache = FeedCache()
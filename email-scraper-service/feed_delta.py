@@ -0,0 +1,119 @@
+import threading
+
+import metrics
+from article_store import entry_guid, entry_published_ts
+
+# Topic match results remembered per entry; the oldest is dropped beyond this
+ENTRY_MATCH_MEMO = 32
+
+
+class TrackedEntry:
+    """A feed entry's extracted article and the topic matches computed for it so far"""
+
+    __slots__ = ("article", "text", "matches")
+
+    def __init__(self, article, text):
+        self.article = article
+        self.text = text
+        self.matches = {}
+
+    def matched_keywords(self, matcher):
+        key = (matcher.keywords, matcher.mode)
+        found = self.matches.get(key)
+        if found is None:
+            if len(self.matches) >= ENTRY_MATCH_MEMO:
+                del self.matches[next(iter(self.matches))]
+            found = self.matches[key] = tuple(matcher.matched_keywords(self.text))
+        return found
+
+
+class _FeedEntries:
+    __slots__ = ("feed", "entries", "by_key", "lock")
+
+    def __init__(self):
+        self.feed = None
+        self.entries = []
+        self.by_key = {}
+        self.lock = threading.Lock()
+
+
+class FeedDeltaTracker:
+    """
+    Remembers the entries of each feed's last fetch, keyed by guid and
+    published date, so a re-fetched feed only pays author extraction and
+    topic matching for entries that are new (or re-dated) since then.
+    A feed object seen before (served from the feed cache) is not walked at all.
+    Only the latest fetch of each feed is kept.
+    """
+
+    def __init__(self):
+        self._feeds = {}
+        self._lock = threading.Lock()
+
+    def clear(self):
+        with self._lock:
+            self._feeds.clear()
+
+    def _state(self, feed_url):
+        with self._lock:
+            state = self._feeds.get(feed_url)
+            if state is None:
+                state = self._feeds[feed_url] = _FeedEntries()
+        return state
+
+    def _refresh(self, state, pub, feed, extract_author):
+        """Bring `state` up to `feed`; returns the entries that are new. Caller holds state.lock."""
+        if state.feed is feed:
+            metrics.feed_entries.inc("reused", amount=len(state.entries))
+            return set()
+
+        entries = []
+        by_key = {}
+        new = set()
+        for entry in feed.entries:
+            key = (entry_guid(entry), entry_published_ts(entry))
+            tracked = state.by_key.get(key)
+            if tracked is None:
+                tracked = TrackedEntry(
+                    {
+                        "title": entry.get("title", ""),
+                        "url": entry.get("link", ""),
+                        "published": entry.get("published", ""),
+                        "published_ts": key[1],
+                        "author": extract_author(entry, pub["author_fields"]),
+                    },
+                    f"{entry.get('title', '')} {entry.get('summary', '')}",
+                )
+                new.add(tracked)
+            entries.append(tracked)
+            by_key[key] = tracked
+
+        metrics.feed_entries.inc("new", amount=len(new))
+        metrics.feed_entries.inc("reused", amount=len(entries) - len(new))
+        state.feed = feed
+        state.entries = entries
+        state.by_key = by_key
+        return new
+
+    def match(self, pub, feed, matchers, extract_author, limit=0):
+        """
+        Topic matches for the first `limit` entries of a feed (0 = all), one
+        list of (article, matched_keywords) per matcher. Returns the lists,
+        the number of entries considered and how many of those were new
+        (new entries past `limit` are not counted).
+        """
+        state = self._state(pub["rss"])
+        with state.lock:
+            fresh = self._refresh(state, pub, feed, extract_author)
+            entries = state.entries[:limit] if limit else state.entries
+            new = sum(1 for tracked in entries if tracked in fresh) if fresh else 0
+            matched = [[] for _ in matchers]
+            for tracked in entries:
+                for i, matcher in enumerate(matchers):
+                    matched_keywords = tracked.matched_keywords(matcher)
+                    if matched_keywords:
+                        matched[i].append((tracked.article, matched_keywords))
+        return matched, len(entries), new
+
+
+feed_deltas = FeedDeltaTracker()
@@ -0,0 +1,177 @@
+import os
+import threading
+import time
+from collections import deque
+
+# Consecutive failures that open a feed's circuit
+FEED_BREAKER_FAILURES = int(os.getenv("FEED_BREAKER_FAILURES", 3))
+# An open circuit is probed after this many seconds, doubling after each failed probe up to the max
+FEED_BREAKER_COOLDOWN = float(os.getenv("FEED_BREAKER_COOLDOWN", 60))
+FEED_BREAKER_MAX_COOLDOWN = float(os.getenv("FEED_BREAKER_MAX_COOLDOWN", 1800))
+# Adaptive timeout: this multiple of the feed's p95 latency, never below the minimum
+# nor above the configured FEED_TIMEOUT
+FEED_TIMEOUT_MULTIPLIER = float(os.getenv("FEED_TIMEOUT_MULTIPLIER", 3))
+FEED_MIN_TIMEOUT = float(os.getenv("FEED_MIN_TIMEOUT", 2))
+
+# Latency samples kept per feed, outcomes kept for the error rate, and samples
+# needed before the timeout adapts
+_LATENCY_WINDOW = 50
+_OUTCOME_WINDOW = 20
+_MIN_LATENCY_SAMPLES = 5
+
+
+def _percentile(ordered, pct):
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+
+class FeedHealth:
+    """Recent latencies and outcomes of one feed, plus its circuit breaker state"""
+
+    __slots__ = ("publisher", "latencies", "outcomes", "consecutive_failures", "state",
+                 "cooldown", "retry_at", "last_error", "last_success")
+
+    def __init__(self, publisher=None):
+        self.publisher = publisher
+        self.latencies = deque(maxlen=_LATENCY_WINDOW)
+        self.outcomes = deque(maxlen=_OUTCOME_WINDOW)
+        self.consecutive_failures = 0
+        # "closed" (normal), "open" (skipped until retry_at) or "half_open" (a probe is in flight)
+        self.state = "closed"
+        self.cooldown = 0.0
+        self.retry_at = 0.0
+        self.last_error = None
+        self.last_success = None
+
+    @property
+    def error_rate(self):
+        if not self.outcomes:
+            return 0.0
+        return sum(1 for ok in self.outcomes if not ok) / len(self.outcomes)
+
+    def latency_percentiles(self):
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return {f"p{pct}": _percentile(ordered, pct) for pct in (50, 95, 99)}
+
+
+class FeedHealthTracker:
+    """
+    Per-feed health for the fetch path. Each fetch records its latency and
+    outcome. A feed failing FEED_BREAKER_FAILURES times in a row opens its
+    circuit: scrapes skip it immediately, and once its cooldown passes a single
+    background probe decides whether it closes again (success) or stays open
+    with a doubled cooldown (failure). Timeouts adapt to each feed's latency.
+    """
+
+    def __init__(self, failures=FEED_BREAKER_FAILURES, cooldown=FEED_BREAKER_COOLDOWN,
+                 max_cooldown=FEED_BREAKER_MAX_COOLDOWN, timeout_multiplier=FEED_TIMEOUT_MULTIPLIER,
+                 min_timeout=FEED_MIN_TIMEOUT):
+        self.failures = failures
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.timeout_multiplier = timeout_multiplier
+        self.min_timeout = min_timeout
+        self._feeds = {}
+        self._lock = threading.Lock()
+
+    def clear(self):
+        with self._lock:
+            self._feeds.clear()
+
+    def _health(self, feed_url, publisher=None):
+        health = self._feeds.get(feed_url)
+        if health is None:
+            health = self._feeds[feed_url] = FeedHealth(publisher)
+        elif publisher:
+            health.publisher = publisher
+        return health
+
+    def record_success(self, feed_url, seconds, publisher=None):
+        with self._lock:
+            health = self._health(feed_url, publisher)
+            health.latencies.append(seconds)
+            health.outcomes.append(True)
+            health.consecutive_failures = 0
+            health.last_success = time.time()
+            if health.state != "closed":
+                print(f"  Circuit closed for {health.publisher or feed_url}")
+            health.state = "closed"
+            health.cooldown = 0.0
+
+    def record_failure(self, feed_url, error, publisher=None):
+        with self._lock:
+            health = self._health(feed_url, publisher)
+            health.outcomes.append(False)
+            health.consecutive_failures += 1
+            health.last_error = str(error)
+            if health.state == "half_open":
+                health.cooldown = min(self.max_cooldown, health.cooldown * 2)
+            elif health.state == "closed" and health.consecutive_failures >= self.failures:
+                health.cooldown = self.cooldown
+                print(f"  Circuit opened for {health.publisher or feed_url} after "
+                      f"{health.consecutive_failures} failures; retrying in {health.cooldown:.0f}s")
+            else:
+                return
+            health.state = "open"
+            health.retry_at = time.time() + health.cooldown
+
+    def is_open(self, feed_url):
+        """Whether scrapes should skip this feed right now"""
+        with self._lock:
+            health = self._feeds.get(feed_url)
+            return health is not None and health.state != "closed"
+
+    def claim_probe(self, feed_url):
+        """True for exactly one caller once an open circuit's cooldown has passed"""
+        with self._lock:
+            health = self._feeds.get(feed_url)
+            if health is None or health.state != "open" or time.time() < health.retry_at:
+                return False
+            health.state = "half_open"
+            return True
+
+    def timeout_for(self, feed_url, default):
+        """`default` until the feed has enough history, then a multiple of its p95 latency"""
+        with self._lock:
+            health = self._feeds.get(feed_url)
+            if health is None or len(health.latencies) < _MIN_LATENCY_SAMPLES:
+                return default
+            p95 = _percentile(sorted(health.latencies), 95)
+        return max(self.min_timeout, min(default, p95 * self.timeout_multiplier))
+
+    def score(self, health, default_timeout):
+        """0-100: the success rate, discounted as p95 latency nears the timeout"""
+        latency = health.latency_percentiles()
+        slowness = min(1.0, latency["p95"] / default_timeout) if latency else 0.0
+        return round(100 * (1 - health.error_rate) * (1 - 0.5 * slowness))
+
+    def status(self, default_timeout):
+        now = time.time()
+        with self._lock:
+            items = list(self._feeds.items())
+        feeds = []
+        for feed_url, health in items:
+            latency = health.latency_percentiles()
+            feeds.append({
+                "publisher": health.publisher,
+                "rss": feed_url,
+                "state": health.state,
+                "score": self.score(health, default_timeout),
+                "error_rate": round(health.error_rate, 3),
+                "latency_ms": {k: round(v * 1000, 1) for k, v in latency.items()} if latency else None,
+                "timeout": round(self.timeout_for(feed_url, default_timeout), 2),
+                "consecutive_failures": health.consecutive_failures,
+                "retry_in": round(max(0.0, health.retry_at - now), 1) if health.state == "open" else None,
+                "last_success": health.last_success,
+                "last_error": health.last_error,
+            })
+        feeds.sort(key=lambda f: f["score"])
+        return {"feeds": feeds, "open": sum(1 for f in feeds if f["state"] != "closed")}
+
+    def open_count(self):
+        with self._lock:
+            return sum(1 for health in self._feeds.values() if health.state != "closed")
+
+
+feed_health = FeedHealthTracker()
@@ -0,0 +1,266 @@
+import argparse
+import calendar
+import html
+import os
+import re
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from xml.etree.ElementTree import XMLPullParser, ParseError
+
+# "fast" parses RSS/Atom with a streaming XML parser and falls back to feedparser
+# on malformed input; "feedparser" always uses feedparser
+FEED_PARSER = os.getenv("FEED_PARSER", "fast")
+# Entries kept per feed; the fast parser stops reading once it has this many (0 = no limit)
+FEED_MAX_ENTRIES = int(os.getenv("FEED_MAX_ENTRIES", 100))
+
+FEED_CORPUS_DIR = Path(__file__).parent / "feed_corpus"
+
+ATOM_NS = "http://www.w3.org/2005/Atom"
+ATOM03_NS = "http://purl.org/atom/ns#"
+RSS1_NS = "http://purl.org/rss/1.0/"
+DC_NS = "http://purl.org/dc/elements/1.1/"
+CONTENT_NS = "http://purl.org/rss/1.0/modules/content/"
+
+_CHUNK_SIZE = 64 * 1024
+_TAG_RE = re.compile(r"<[^>]+>")
+_SPACE_RE = re.compile(r"\s+")
+
+
+class FallbackToFeedparser(Exception):
+    pass
+
+
+class ParsedFeed:
+    """The part of feedparser's result the scraper reads: a list of entry dicts"""
+
+    __slots__ = ("entries", "parser")
+
+    def __init__(self, entries, parser):
+        self.entries = entries
+        self.parser = parser
+
+
+def _split_tag(tag):
+    if tag.startswith("{"):
+        ns, _, local = tag[1:].partition("}")
+        return ns, local
+    return "", tag
+
+
+def _text(element):
+    return (element.text or "").strip()
+
+
+def _parse_date(value):
+    """RFC 822 or ISO 8601 date -> UTC struct_time, like feedparser's *_parsed fields"""
+    if not value:
+        return None
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).timetuple()
+
+
+def _entry_from_element(item):
+    """Pull the fields the scraper uses out of an RSS <item> or Atom <entry>"""
+    entry = {}
+    content = None
+    for child in item:
+        ns, local = _split_tag(child.tag)
+        if ns in ("", RSS1_NS):
+            if local == "title":
+                entry["title"] = _text(child)
+            elif local == "link":
+                entry["link"] = _text(child)
+            elif local == "description":
+                entry["summary"] = _text(child)
+            elif local == "pubDate":
+                entry["published"] = _text(child)
+            elif local == "guid":
+                entry["id"] = _text(child)
+            elif local == "author":
+                entry["author"] = _text(child)
+            elif len(child) == 0 and local not in entry:
+                # Non-standard elements such as <byline> are read by name via author_fields
+                entry[local] = _text(child)
+        elif ns in (ATOM_NS, ATOM03_NS):
+            if local == "title":
+                entry["title"] = _text(child)
+            elif local == "link":
+                if child.get("rel", "alternate") == "alternate" and "link" not in entry:
+                    entry["link"] = child.get("href", "")
+            elif local == "summary":
+                entry["summary"] = _text(child)
+            elif local == "content":
+                content = _text(child)
+            elif local in ("published", "issued"):
+                entry["published"] = _text(child)
+            elif local in ("updated", "modified"):
+                entry["updated"] = _text(child)
+            elif local == "id":
+                entry["id"] = _text(child)
+            elif local == "author":
+                name = child.find(f"{{{ns}}}name")
+                if name is not None:
+                    entry.setdefault("author", _text(name))
+        elif ns == DC_NS:
+            if local == "creator":
+                entry["dc_creator"] = _text(child)
+                entry.setdefault("author", entry["dc_creator"])
+            elif local == "date":
+                entry.setdefault("updated", _text(child))
+        elif ns == CONTENT_NS and local == "encoded":
+            content = _text(child)
+
+    if "summary" not in entry and content:
+        entry["summary"] = content
+    entry["published_parsed"] = _parse_date(entry.get("published"))
+    entry["updated_parsed"] = _parse_date(entry.get("updated"))
+    return entry
+
+
+def parse_feed_fast(content, max_entries=FEED_MAX_ENTRIES):
+    """
+    Stream RSS 2.0, RSS 1.0 or Atom with a pull parser, keeping only the fields
+    the scraper reads. Parsing stops once `max_entries` entries are read.
+    Raises FallbackToFeedparser for malformed or unrecognised documents.
+    """
+    parser = XMLPullParser(events=("start", "end"))
+    entries = []
+    root_checked = False
+    depth = 0
+    entry_depth = None
+
+    try:
+        for offset in range(0, len(content), _CHUNK_SIZE):
+            parser.feed(content[offset:offset + _CHUNK_SIZE])
+            for event, element in parser.read_events():
+                _, local = _split_tag(element.tag)
+                if event == "start":
+                    depth += 1
+                    if not root_checked:
+                        if local not in ("rss", "feed", "RDF"):
+                            raise FallbackToFeedparser(f"unrecognised root element <{local}>")
+                        root_checked = True
+                    elif entry_depth is None and local in ("item", "entry"):
+                        entry_depth = depth
+                    continue
+
+                if depth == entry_depth:
+                    entries.append(_entry_from_element(element))
+                    entry_depth = None
+                    element.clear()
+                    if max_entries and len(entries) >= max_entries:
+                        return ParsedFeed(entries, "fast")
+                depth -= 1
+        parser.close()
+    except ParseError as e:
+        raise FallbackToFeedparser(str(e))
+
+    if not root_checked:
+        raise FallbackToFeedparser("empty document")
+    return ParsedFeed(entries, "fast")
+
+
+def parse_feed(content, max_entries=FEED_MAX_ENTRIES, parser=None):
+    """Parse feed bytes with the configured parser, falling back to feedparser"""
+    if (parser or FEED_PARSER) == "fast":
+        try:
+            return parse_feed_fast(content, max_entries)
+        except FallbackToFeedparser as e:
+            print(f"  Fast feed parser fell back to feedparser: {e}")
+
+    # Only imported once a feed needs it: feedparser is slow to import and rarely used
+    import feedparser
+
+    feed = feedparser.parse(content)
+    if max_entries:
+        feed["entries"] = feed["entries"][:max_entries]
+    return feed
+
+
+def _plain(value):
+    return _SPACE_RE.sub(" ", html.unescape(_TAG_RE.sub(" ", value or ""))).strip()
+
+
+def extracted_record(entry, author_fields=("author", "dc_creator", "byline")):
+    """
+    The values the scraper derives from an entry, normalised for comparing
+    parsers (summaries are compared as plain text since feedparser sanitises HTML).
+    """
+    author = ""
+    for field in author_fields:
+        if entry.get(field):
+            author = entry.get(field).replace("By ", "").strip()
+            break
+    published_parsed = entry.get("published_parsed") or entry.get("updated_parsed")
+    return {
+        "id": entry.get("id") or entry.get("link") or entry.get("title", ""),
+        "title": entry.get("title", ""),
+        "link": entry.get("link", ""),
+        "summary": _plain(entry.get("summary", "")),
+        "published": entry.get("published", ""),
+        "published_ts": calendar.timegm(published_parsed) if published_parsed else None,
+        "author": author,
+    }
+
+
+def compare_parsers(content, max_entries=FEED_MAX_ENTRIES):
+    """Differences between the fast parser's and feedparser's records for one feed"""
+    import feedparser
+
+    fast = parse_feed_fast(content, max_entries)
+    reference = feedparser.parse(content).entries[:max_entries or None]
+    differences = []
+    if len(fast.entries) != len(reference):
+        differences.append(f"entry count: fast={len(fast.entries)} feedparser={len(reference)}")
+    for i, (a, b) in enumerate(zip(fast.entries, reference)):
+        fast_record, reference_record = extracted_record(a), extracted_record(b)
+        for field, value in fast_record.items():
+            if value != reference_record[field]:
+                differences.append(f"entry {i} {field}: fast={value!r} feedparser={reference_record[field]!r}")
+    return differences
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check that the fast feed parser extracts the same records as feedparser"
+    )
+    parser.add_argument("paths", nargs="*", default=[str(FEED_CORPUS_DIR)],
+                        help="feed files or directories (default: the bundled corpus)")
+    parser.add_argument("--max-entries", type=int, default=FEED_MAX_ENTRIES)
+    args = parser.parse_args()
+
+    files = []
+    for path in map(Path, args.paths):
+        files.extend(sorted(path.glob("*.xml")) if path.is_dir() else [path])
+
+    failed = 0
+    for path in files:
+        content = path.read_bytes()
+        try:
+            differences = compare_parsers(content, args.max_entries)
+        except FallbackToFeedparser as e:
+            print(f"{path.name}: falls back to feedparser ({e})")
+            continue
+        if differences:
+            failed += 1
+            print(f"{path.name}: {len(differences)} differences")
+            for difference in differences:
+                print(f"  {difference}")
+        else:
+            print(f"{path.name}: ok")
+
+    print(f"\n{len(files) - failed}/{len(files)} feeds match")
+    raise SystemExit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+import os
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+from publishers import publisher_registry
+from article_store import get_article_store
+from feed_health import feed_health
+from shared_cache import get_shared_cache
+from run_scraper import fetch_feed_with_timeout, extract_author, FEED_TIMEOUT, MAX_FETCH_WORKERS
+
+FEED_SCHEDULER_ENABLED = os.getenv("FEED_SCHEDULER_ENABLED", "true").lower() in ("1", "true", "yes")
+# Each feed starts at FEED_POLL_INTERVAL and adapts between the min and max (seconds)
+FEED_POLL_INTERVAL = float(os.getenv("FEED_POLL_INTERVAL", 600))
+FEED_POLL_MIN_INTERVAL = float(os.getenv("FEED_POLL_MIN_INTERVAL", 120))
+FEED_POLL_MAX_INTERVAL = float(os.getenv("FEED_POLL_MAX_INTERVAL", 3600))
+# Failing feeds back off exponentially up to this many seconds
+FEED_POLL_MAX_BACKOFF = float(os.getenv("FEED_POLL_MAX_BACKOFF", 6 * 3600))
+FEED_POLL_JITTER = float(os.getenv("FEED_POLL_JITTER", 0.1))
+
+# One worker process polls at a time, holding this lease in the shared cache;
+# if it stops renewing it, another worker takes over once it expires (seconds)
+_LEADER_LEASE = 30
+
+
+class FeedState:
+    """Polling schedule and last outcome of one publisher feed"""
+
+    __slots__ = ("pub", "interval", "next_run", "polling", "failures", "last_polled",
+                 "last_success", "last_new_articles", "last_error")
+
+    def __init__(self, pub, interval):
+        self.pub = pub
+        self.interval = interval
+        self.next_run = 0.0
+        self.polling = False
+        self.failures = 0
+        self.last_polled = None
+        self.last_success = None
+        self.last_new_articles = 0
+        self.last_error = None
+
+    def to_dict(self):
+        return {
+            "name": self.pub["name"],
+            "rss": self.pub["rss"],
+            "interval": round(self.interval, 1),
+            "next_run_in": round(max(0.0, self.next_run - time.time()), 1),
+            "failures": self.failures,
+            "last_polled": self.last_polled,
+            "last_success": self.last_success,
+            "last_new_articles": self.last_new_articles,
+            "last_error": self.last_error,
+        }
+
+
+class FeedScheduler:
+    """
+    Polls every publisher feed in the background and indexes new entries into
+    the article store, so scrapes can be answered without fetching inline.
+    A feed's interval halves when it produced new articles and grows by half
+    when it didn't; failing feeds back off exponentially. Every delay is jittered.
+    A publisher can pin its starting interval with a poll_interval key.
+    Feeds added to or removed from the publisher registry are picked up on reload.
+    With several worker processes, only the one holding the scheduler lease
+    polls; the others keep their article store in sync with what it indexes.
+    """
+
+    def __init__(self, registry=publisher_registry, interval=FEED_POLL_INTERVAL,
+                 min_interval=FEED_POLL_MIN_INTERVAL, max_interval=FEED_POLL_MAX_INTERVAL,
+                 max_backoff=FEED_POLL_MAX_BACKOFF, jitter=FEED_POLL_JITTER,
+                 max_workers=MAX_FETCH_WORKERS):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.max_workers = max_workers
+        self.interval = interval
+        self.registry = registry
+        self._index = registry.index()
+        self._states = {
+            pub["rss"]: FeedState(pub, pub.get("poll_interval", interval))
+            for pub in self._index.publishers
+        }
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._executor = None
+        self._owner = uuid.uuid4().hex
+        self.leader = False
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self._spread_polls()
+        self._stop.clear()
+        self._executor = ThreadPoolExecutor(max_workers=max(1, self.max_workers),
+                                            thread_name_prefix="feed-poll")
+        self._thread = threading.Thread(target=self._loop, name="feed-scheduler", daemon=True)
+        self._thread.start()
+        print(f"Feed scheduler started for {len(self._states)} feeds")
+
+    def _spread_polls(self):
+        # Spread the first polls out so startup (or taking over) doesn't hit every publisher at once
+        now = time.time()
+        with self._lock:
+            for state in self._states.values():
+                state.next_run = now + random.uniform(0, min(30.0, self.min_interval))
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        if self.leader:
+            get_shared_cache().release("feed-scheduler", self._owner)
+            self.leader = False
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _sync(self, index):
+        """Follow a reloaded registry: poll new feeds soon, drop removed ones"""
+        now = time.time()
+        with self._lock:
+            states = {}
+            for pub in index.publishers:
+                state = self._states.get(pub["rss"])
+                if state is None:
+                    state = FeedState(pub, pub.get("poll_interval", self.interval))
+                    state.next_run = now + random.uniform(0, min(30.0, self.min_interval))
+                state.pub = pub
+                states[pub["rss"]] = state
+            added = len(states.keys() - self._states.keys())
+            removed = len(self._states.keys() - states.keys())
+            self._states = states
+            self._index = index
+        if added or removed:
+            print(f"Feed scheduler: {added} feeds added, {removed} removed")
+
+    def _lead(self):
+        """Take or renew the lease; whether this process should poll"""
+        leader = get_shared_cache().lease("feed-scheduler", self._owner, _LEADER_LEASE)
+        if leader != self.leader:
+            self.leader = leader
+            if leader:
+                self._spread_polls()
+            print(f"Feed scheduler: {'polling feeds' if leader else 'another worker polls feeds'}")
+        return leader
+
+    def _loop(self):
+        while not self._stop.is_set():
+            index = self.registry.index()
+            if index is not self._index:
+                self._sync(index)
+            get_article_store().sync()
+            if not self._lead():
+                self._stop.wait(timeout=5.0)
+                continue
+            now = time.time()
+            with self._lock:
+                due = [s for s in self._states.values() if not s.polling and s.next_run <= now]
+                for state in due:
+                    state.polling = True
+                upcoming = [s.next_run for s in self._states.values() if not s.polling]
+
+            for state in due:
+                self._executor.submit(self._poll, state)
+
+            wake_in = (min(upcoming) - now) if upcoming else self.min_interval
+            self._stop.wait(timeout=min(max(wake_in, 0.5), 5.0))
+
+    def _poll(self, state):
+        pub = state.pub
+        started = time.time()
+        try:
+            # ttl=0 always revalidates, so an unchanged feed costs a 304
+            feed = fetch_feed_with_timeout(pub["rss"], feed_health.timeout_for(pub["rss"], FEED_TIMEOUT),
+                                           ttl=0, publisher=pub["name"])
+            new_articles = get_article_store().update_feed(pub, feed, extract_author)
+        except Exception as e:
+            metrics.feed_failures.inc(pub["name"], "timeout" if isinstance(e, TimeoutError) else "error")
+            with self._lock:
+                state.failures += 1
+                state.last_error = str(e)
+                delay = min(self.max_backoff, state.interval * (2 ** state.failures))
+            print(f"  Feed scheduler: {pub['name']} failed ({state.failures}x), retrying in {delay:.0f}s: {e}")
+        else:
+            with self._lock:
+                state.failures = 0
+                state.last_error = None
+                state.last_success = time.time()
+                state.last_new_articles = new_articles
+                if new_articles:
+                    state.interval = max(self.min_interval, state.interval / 2)
+                else:
+                    state.interval = min(self.max_interval, state.interval * 1.5)
+                delay = state.interval
+        finally:
+            with self._lock:
+                state.last_polled = started
+                state.next_run = time.time() + self._jittered(delay)
+                state.polling = False
+
+    def _jittered(self, delay):
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def status(self):
+        with self._lock:
+            feeds = [state.to_dict() for state in self._states.values()]
+        return {
+            "running": self.running,
+            "leader": self.leader,
+            "feeds": feeds,
+            "failing": sum(1 for f in feeds if f["failures"]),
+            "articles": get_article_store().stats(),
+        }
+
+
+feed_scheduler = FeedScheduler()
@@ -0,0 +1,459 @@
+import argparse
+import difflib
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from enrichment_cache import get_enrichment_cache
+from journalists import Journalist, fold_name, journalist_key
+
+# Combine the same person's bylines across publications (and spellings) into one journalist,
+# enriched once; "false" keeps one record per author and publication
+IDENTITY_RESOLUTION = os.getenv("IDENTITY_RESOLUTION", "true").lower() != "false"
+IDENTITY_INDEX_PATH = os.getenv(
+    "IDENTITY_INDEX_PATH",
+    str(Path(__file__).parent / "identity_index.sqlite3")
+)
+# Token-sort similarity (0-1) from which two names in one block may be the same person; a near
+# match also needs the same given name and a shared publication or Hunter address (see IdentityIndex)
+IDENTITY_MATCH_THRESHOLD = float(os.getenv("IDENTITY_MATCH_THRESHOLD", 0.92))
+
+_TOKEN_RE = re.compile(r"\w+")
+# Bylines of one identity checked for a Hunter address shared with a near match
+_MAX_EMAIL_CHECKS = 3
+
+
+def name_tokens(first_name, last_name):
+    """A name's folded words, initials included, sorted: "José A. Álvarez" and "ÁLVAREZ Jose A." agree"""
+    return " ".join(sorted(_TOKEN_RE.findall(fold_name(f"{first_name} {last_name}"))))
+
+
+def given_name(first_name):
+    """The folded first word of a first name, which a near match must share"""
+    words = _TOKEN_RE.findall(fold_name(first_name))
+    return words[0] if words else ""
+
+
+def block_keys(first_name, last_name):
+    """
+    Names are only compared with those sharing a block: one for the first
+    initial and last surname word, one for the first name and the last
+    initial, so a misspelling on either side still meets its match
+    """
+    first = _TOKEN_RE.findall(fold_name(first_name)) or [""]
+    last = _TOKEN_RE.findall(fold_name(last_name)) or [""]
+    return f"{first[0][:1]}:{last[-1]}", f"{first[0]}:{last[-1][:1]}"
+
+
+class IdentityIndex:
+    """
+    Persistent map from bylines (a name at one publication) to identities,
+    so a freelancer writing for several publications, or a name spelled
+    several ways, is one journalist. An identity is named by the key of its
+    first byline. A byline seen before resolves by lookup; a new one is
+    compared only with the names already in its blocks (see block_keys).
+    A match, whether the same folded name or a near one (by token-sort
+    similarity, with the same given name), joins only with some evidence:
+    a byline of the identity at the same publication, or the same address
+    found by Hunter. Without it the byline starts an identity of its own, so
+    two people sharing a name at different publications keep an address
+    each. "Michaela Chen" and "Michael Chen" stay apart.
+    Names of initials only ("J. K.") are never merged. A wrong merge can be
+    undone with split(). Worker processes sharing the file pick up each
+    other's bylines at the start of every pass.
+    """
+
+    def __init__(self, path=IDENTITY_INDEX_PATH, threshold=IDENTITY_MATCH_THRESHOLD):
+        self.path = path
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        # byline key -> identity; block key -> {name tokens: {identity: given name}};
+        # identity -> its bylines as (first_name, last_name, domain). A row's blocks are stored "|"-joined
+        self._identities = {}
+        self._blocks = {}
+        self._members = {}
+        self._synced_id = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS bylines (
+                id INTEGER PRIMARY KEY,
+                byline TEXT NOT NULL UNIQUE,
+                identity TEXT NOT NULL,
+                name TEXT NOT NULL,
+                block TEXT NOT NULL,
+                first_seen REAL NOT NULL,
+                first_name TEXT NOT NULL DEFAULT '',
+                last_name TEXT NOT NULL DEFAULT '',
+                domain TEXT NOT NULL DEFAULT ''
+            )
+        """)
+        # Indexes written before bylines kept their parts
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(bylines)")}
+        for column in ("first_name", "last_name", "domain"):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE bylines ADD COLUMN {column} TEXT NOT NULL DEFAULT ''")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS bylines_identity ON bylines (identity)")
+        self._conn.commit()
+        with self._lock:
+            self._read_rows()
+
+    def _read_rows(self):
+        """Add the bylines recorded (or moved by split) since the last read, by this or another process"""
+        rows = self._conn.execute(
+            "SELECT id, byline, identity, name, block, first_name, last_name, domain "
+            "FROM bylines WHERE id > ? ORDER BY id",
+            (self._synced_id,)
+        ).fetchall()
+        for row_id, byline, identity, name, blocks, first_name, last_name, domain in rows:
+            previous = self._identities.get(byline)
+            if previous != identity:
+                member = (first_name, last_name, domain)
+                if previous is not None:
+                    # Split off (see split): the name now leads to its new identity
+                    members = self._members.get(previous, [])
+                    if member in members:
+                        members.remove(member)
+                self._identities[byline] = identity
+                self._members.setdefault(identity, []).append(member)
+                if blocks:
+                    self._add_name(blocks.split("|"), name, identity, given_name(first_name), previous)
+            self._synced_id = row_id
+
+    def _add_name(self, blocks, name, identity, given, previous=None):
+        # A split-off name stays with its previous identity only if another of its bylines has it
+        drop = previous is not None and not any(
+            name_tokens(first_name, last_name) == name for first_name, last_name, _ in self._members.get(previous, [])
+        )
+        for block in blocks:
+            identities = self._blocks.setdefault(block, {}).setdefault(name, {})
+            if drop:
+                identities.pop(previous, None)
+            identities.setdefault(identity, given)
+
+    def resolve(self, bylines, email_of=None):
+        """
+        The identity of each (first_name, last_name, domain) byline, recording
+        new ones. `email_of(first_name, last_name, domain)` gives a byline's
+        Hunter-verified address, if known, as evidence for near matches.
+        """
+        keys = [journalist_key(first_name, last_name, domain) for first_name, last_name, domain in bylines]
+        with self._lock:
+            self._read_rows()
+            new = []
+            now = time.time()
+            for key, (first_name, last_name, domain) in zip(keys, bylines):
+                if key in self._identities:
+                    continue
+                name = name_tokens(first_name, last_name)
+                given = given_name(first_name)
+                member = (first_name, last_name, domain.lower())
+                if any(len(word) > 1 for word in name.split()):
+                    blocks = block_keys(first_name, last_name)
+                    identity = self._match(blocks, name, given, member, email_of) or key
+                    self._add_name(blocks, name, identity, given)
+                else:
+                    # Initials alone can't tell people apart
+                    blocks, identity = (), key
+                self._identities[key] = identity
+                self._members.setdefault(identity, []).append(member)
+                new.append((key, identity, name, "|".join(blocks), now, *member))
+
+            if new:
+                changes = self._conn.total_changes
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO bylines "
+                    "(byline, identity, name, block, first_seen, first_name, last_name, domain) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    new
+                )
+                self._conn.commit()
+                if self._conn.total_changes - changes < len(new):
+                    # Another worker recorded some of these bylines first; its identities stand
+                    self._read_rows()
+            return [self._identities[key] for key in keys]
+
+    def _match(self, blocks, name, given, member, email_of):
+        candidates = [self._blocks[block] for block in blocks if block in self._blocks]
+        # Identities with the same folded name come first; one with a byline at this publication is taken outright
+        near = {}
+        for names in candidates:
+            for candidate in names.get(name, ()):
+                if any(domain == member[2] for _, _, domain in self._members.get(candidate, [])):
+                    return candidate
+                near[candidate] = 1.0
+
+        matcher = difflib.SequenceMatcher(b=name, autojunk=False)
+        for names in candidates:
+            for other, identities in names.items():
+                if other == name or given not in identities.values():
+                    continue
+                matcher.set_seq1(other)
+                # The cheap upper bounds rule out most names before the full comparison
+                if matcher.real_quick_ratio() < self.threshold or matcher.quick_ratio() < self.threshold:
+                    continue
+                ratio = matcher.ratio()
+                if ratio < self.threshold:
+                    continue
+                for candidate, other_given in identities.items():
+                    if other_given == given and ratio > near.get(candidate, 0):
+                        near[candidate] = ratio
+
+        email = None
+        for candidate in sorted(near, key=near.get, reverse=True):
+            members = self._members.get(candidate, [])
+            if any(domain == member[2] for _, _, domain in members):
+                return candidate
+            if email_of is not None:
+                email = email or email_of(*member)
+                if email and any(email_of(*other) == email for other in members[:_MAX_EMAIL_CHECKS]):
+                    return candidate
+        return None
+
+    def split(self, first_name, last_name, domain):
+        """
+        Undo a wrong merge: give a byline an identity of its own. When the
+        byline names its identity, the identity's other bylines move to a new
+        one instead, named after the first of them. Returns (byline, new
+        identity) for each byline moved.
+        """
+        key = journalist_key(first_name, last_name, domain)
+        with self._lock:
+            self._read_rows()
+            identity = self._identities.get(key)
+            if identity is None:
+                return []
+            rows = self._conn.execute(
+                "SELECT byline, name, block, first_seen, first_name, last_name, domain "
+                "FROM bylines WHERE identity = ? ORDER BY id",
+                (identity,)
+            ).fetchall()
+            if len(rows) < 2:
+                return []
+            if identity == key:
+                moved = [row for row in rows if row[0] != key]
+                new_identity = moved[0][0]
+            else:
+                moved = [row for row in rows if row[0] == key]
+                new_identity = key
+
+            # Re-inserted rather than updated, so other workers read them as new rows
+            self._conn.executemany("DELETE FROM bylines WHERE byline = ?", [(row[0],) for row in moved])
+            self._conn.executemany(
+                "INSERT INTO bylines (byline, identity, name, block, first_seen, first_name, last_name, domain) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(row[0], new_identity, *row[1:]) for row in moved]
+            )
+            self._conn.commit()
+            self._read_rows()
+            return [(row[0], new_identity) for row in moved]
+
+    def bylines(self, identity):
+        """(byline key, first seen) of every byline of `identity`"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT byline, first_seen FROM bylines WHERE identity = ? ORDER BY id", (identity,)
+            ).fetchall()
+
+    def identity_of(self, first_name, last_name, domain):
+        """The identity a byline was resolved to, or None if it wasn't seen"""
+        with self._lock:
+            self._read_rows()
+            return self._identities.get(journalist_key(first_name, last_name, domain))
+
+    def stats(self):
+        with self._lock:
+            bylines, identities = self._conn.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT identity) FROM bylines"
+            ).fetchone()
+        return {"bylines": bylines, "identities": identities, "blocks": len(self._blocks)}
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_identity_index():
+    """Shared index instance, opened and loaded on first use"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = IdentityIndex()
+    return _index
+
+
+def hunter_email(first_name, last_name, domain):
+    """The Hunter-verified address the enrichment cache holds for a byline, if any"""
+    cached = get_enrichment_cache().get(first_name, last_name, domain)
+    return cached[0] if cached is not None and cached[2] == "hunter" else None
+
+
+def _group_by_identity(journalists, index):
+    """identity (or id() for records without a last name) -> records, in order of first appearance"""
+    named = [j for j in journalists if j.first_name and j.last_name]
+    identities = dict(zip(
+        map(id, named), index.resolve([(j.first_name, j.last_name, j.domain) for j in named], hunter_email)
+    ))
+    groups = {}
+    for j in journalists:
+        groups.setdefault(identities.get(id(j), id(j)), []).append(j)
+    return groups
+
+
+def merge_journalists(journalists, index=None):
+    """
+    `journalists` (one record per author and publication) with each
+    identity's records combined into one (see Journalist.combine), in order
+    of first appearance. Records without a last name are left alone: a bare
+    first name is too little to tell people apart.
+    """
+    groups = _group_by_identity(journalists, index or get_identity_index())
+    return [records[0] if len(records) == 1 else Journalist.combine(records) for records in groups.values()]
+
+
+async def merge_journalists_async(journalists, index=None):
+    """merge_journalists on the worker pool, as it reads and writes the index file"""
+    from async_http import run_blocking
+
+    return await run_blocking(merge_journalists, journalists, index)
+
+
+class IdentityMerger:
+    """
+    merge_journalists for a scrape whose batches (one per feed) are enriched
+    as they arrive, as /scrape/stream and background jobs do. Each batch is
+    merged on its own. A record whose identity an earlier batch already
+    passed on is folded into that record (see Journalist.absorb) instead,
+    so the person is enriched once. Records updated that way are listed in
+    `updated`, in order.
+    """
+
+    def __init__(self, index=None):
+        self.index = index or get_identity_index()
+        self.updated = []
+        self._passed_on = {}
+
+    def merge(self, journalists):
+        """The records of `journalists` to pass on: one per person not seen in an earlier batch"""
+        fresh = []
+        for identity, records in _group_by_identity(journalists, self.index).items():
+            earlier = self._passed_on.get(identity)
+            if earlier is not None:
+                earlier.absorb(records)
+                if not any(record is earlier for record in self.updated):
+                    self.updated.append(earlier)
+                continue
+            record = records[0] if len(records) == 1 else Journalist.combine(records)
+            if isinstance(identity, str):
+                self._passed_on[identity] = record
+            fresh.append(record)
+        return fresh
+
+    async def merge_async(self, journalists):
+        """merge() on the worker pool"""
+        from async_http import run_blocking
+
+        return await run_blocking(self.merge, journalists)
+
+
+_SYLLABLES = ["al", "an", "ar", "be", "ca", "da", "el", "fa", "ga", "ha", "in", "jo", "ka", "la",
+              "ma", "ne", "ol", "pa", "ri", "sa", "ta", "um", "va", "we", "ya", "zo"]
+
+
+def _synthetic_bylines(count, seed=0):
+    """
+    (first_name, last_name, domain, person) bylines of about count / 3 people, each
+    at one to three of 500 publications, some spelled with an accent, in
+    lowercase, with a middle initial or with one letter dropped
+    """
+    rng = random.Random(seed)
+
+    def word(parts):
+        return "".join(rng.choice(_SYLLABLES) for _ in range(parts)).title()
+
+    people = [(word(2), word(3), [f"pub{rng.randrange(500)}.example.com" for _ in range(rng.randint(1, 3))])
+              for _ in range(max(1, count // 3))]
+    for _ in range(count):
+        person = rng.randrange(len(people))
+        first, last, domains = people[person]
+        variant = rng.random()
+        if variant < 0.05:
+            first = first.replace("a", "á", 1)
+        elif variant < 0.1:
+            first, last = first.lower(), last.lower()
+        elif variant < 0.15:
+            first = f"{first} {rng.choice('ABCDEFGH')}."
+        elif variant < 0.18 and len(last) > 5:
+            cut = rng.randrange(1, len(last) - 1)
+            last = last[:cut] + last[cut + 1:]
+        yield first, last, rng.choice(domains), person
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect the journalist identity index or time a merge pass")
+    parser.add_argument("--path", default=IDENTITY_INDEX_PATH, help="index file")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("stats", help="show byline and identity counts")
+
+    show_cmd = commands.add_parser("show", help="show the bylines resolved to one person's identity")
+    show_cmd.add_argument("first_name")
+    show_cmd.add_argument("last_name")
+    show_cmd.add_argument("domain")
+
+    split_cmd = commands.add_parser("split", help="give a byline merged with another person an identity of its own")
+    split_cmd.add_argument("first_name")
+    split_cmd.add_argument("last_name")
+    split_cmd.add_argument("domain")
+
+    bench_cmd = commands.add_parser("bench", help="time merge passes over synthetic bylines (in memory)")
+    bench_cmd.add_argument("--bylines", type=int, nargs="+", default=[10000, 50000, 100000])
+
+    args = parser.parse_args()
+
+    if args.command == "bench":
+        for count in args.bylines:
+            generated = list(_synthetic_bylines(count))
+            bylines = [byline[:3] for byline in generated]
+            people = {byline[3] for byline in generated}
+            persons_of = {}
+            distinct = len({journalist_key(*byline) for byline in bylines})
+            index = IdentityIndex(path=":memory:")
+            started = time.perf_counter()
+            identities = index.resolve(bylines)
+            elapsed = time.perf_counter() - started
+            for identity, byline in zip(identities, generated):
+                persons_of.setdefault(identity, set()).add(byline[3])
+            mixed = sum(1 for persons in persons_of.values() if len(persons) > 1)
+            print(f"  {count:>7} bylines  {distinct:>7} author-publication records  "
+                  f"{len(persons_of):>7} identities ({len(people)} people, {mixed} mixing several)  "
+                  f"{elapsed * 1000:>7.0f} ms  {elapsed / count * 1e6:>5.1f} us/byline")
+        return
+
+    index = IdentityIndex(path=args.path)
+    if args.command == "stats":
+        for name, value in index.stats().items():
+            print(f"{name}: {value}")
+    elif args.command == "show":
+        identity = index.identity_of(args.first_name, args.last_name, args.domain)
+        if identity is None:
+            print("Byline not in the index")
+            return
+        print(f"identity: {identity}")
+        for byline, first_seen in index.bylines(identity):
+            print(f"  {time.strftime('%Y-%m-%d %H:%M', time.localtime(first_seen))}  {byline}")
+    elif args.command == "split":
+        moved = index.split(args.first_name, args.last_name, args.domain)
+        if not moved:
+            print("Byline not in the index, or already alone in its identity")
+            return
+        for byline, identity in moved:
+            print(f"  {byline} -> {identity}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from run_scraper import iter_journalists_from_publishers, new_scrape_stats
+from enrichment import iter_enrich_journalists, new_enrichment_stats, print_enrichment_summary
+from feed_scheduler import feed_scheduler
+from identity_index import IdentityMerger, IDENTITY_RESOLUTION
+from shared_cache import WEB_CONCURRENCY, get_shared_cache
+
+MAX_SCRAPE_JOBS = int(os.getenv("MAX_SCRAPE_JOBS", 2))
+MAX_PENDING_SCRAPE_JOBS = int(os.getenv("MAX_PENDING_SCRAPE_JOBS", 20))
+# Finished jobs (and their results) are kept for an hour by default
+JOB_RESULT_TTL = int(os.getenv("JOB_RESULT_TTL", 3600))
+
+# A running job's progress is published to the shared cache at most this often (seconds)
+_PUBLISH_INTERVAL = 1.0
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+def job_key(topic, geography):
+    return (topic or "").strip().lower(), (geography or "").strip().lower()
+
+
+class ScrapeJob:
+    def __init__(self, topic, geography):
+        self.id = uuid.uuid4().hex
+        self.topic = topic
+        self.geography = geography
+        self.status = "queued"
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.scraping = new_scrape_stats()
+        self.enrichment = new_enrichment_stats()
+        self.journalists_enriched = 0
+        self.results = []
+        self.error = None
+
+    @property
+    def finished(self):
+        return self.status in ("completed", "failed")
+
+    def result_dicts(self):
+        return [j.to_dict() for j in self.results]
+
+    def to_dict(self):
+        return {
+            "job_id": self.id,
+            "topic": self.topic,
+            "geography": self.geography,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "progress": {
+                "feeds_total": self.scraping.get("feeds_total", 0),
+                "feeds_done": self.scraping.get("feeds_fetched", 0) + self.scraping.get("feeds_from_store", 0),
+                "journalists_found": self.scraping["unique_journalists"],
+                "journalists_enriched": self.journalists_enriched,
+            },
+            "scraping": dict(self.scraping),
+            "enrichment": dict(self.enrichment),
+            "error": self.error,
+        }
+
+
+class SharedJob:
+    """A job another worker process runs, as it last published it to the shared cache"""
+
+    __slots__ = ("status", "error", "_dict", "_results")
+
+    def __init__(self, snapshot):
+        self._dict = snapshot["job"]
+        self._results = snapshot["results"] or []
+        self.status = self._dict["status"]
+        self.error = self._dict["error"]
+
+    @property
+    def finished(self):
+        return self.status in ("completed", "failed")
+
+    def result_dicts(self):
+        return self._results
+
+    def to_dict(self):
+        return self._dict
+
+
+class ScrapeJobManager:
+    """
+    Runs scrapes in the background on a bounded worker pool.
+    Identical topic + geography jobs submitted while one is queued or running
+    share that job instead of starting another scrape.
+    With several worker processes, jobs are published to the shared cache so
+    any worker can report on them.
+    """
+
+    def __init__(self, max_workers=MAX_SCRAPE_JOBS, max_pending=MAX_PENDING_SCRAPE_JOBS,
+                 result_ttl=JOB_RESULT_TTL, shared=WEB_CONCURRENCY > 1):
+        self.max_pending = max_pending
+        self.result_ttl = result_ttl
+        self.shared = shared
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scrape-job")
+        self._jobs = {}
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def submit(self, topic, geography=None):
+        """Returns (job, coalesced)"""
+        key = job_key(topic, geography)
+        with self._lock:
+            self._prune()
+
+            job = self._in_flight.get(key)
+            if job is not None:
+                return job, True
+
+            if len(self._in_flight) >= self.max_pending:
+                raise JobQueueFull(f"{len(self._in_flight)} scrape jobs already queued or running")
+
+            job = ScrapeJob(topic, geography)
+            self._jobs[job.id] = job
+            self._in_flight[key] = job
+
+        self._publish(job)
+        self._executor.submit(self._run, job, key)
+        return job, False
+
+    def get(self, job_id):
+        """The job, or its SharedJob when another worker runs it; None if unknown"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None and self.shared:
+            snapshot = get_shared_cache().get(f"job:{job_id}")
+            if snapshot is not None:
+                job = SharedJob(json.loads(snapshot))
+        return job
+
+    def _publish(self, job):
+        if self.shared:
+            snapshot = {"job": job.to_dict(), "results": job.result_dicts() if job.finished else None}
+            get_shared_cache().set(f"job:{job.id}", json.dumps(snapshot), ttl=self.result_ttl)
+
+    def _run(self, job, key):
+        job.status = "running"
+        job.started_at = time.time()
+        self._publish(job)
+        print(f"[job {job.id}] Starting scrape for topic: {job.topic} (geography: {job.geography})")
+
+        try:
+            # A person found at several publications is one result, enriched once
+            merger = IdentityMerger() if IDENTITY_RESOLUTION else None
+            batches = (
+                merger.merge(journalists) if merger else journalists
+                for _, journalists in iter_journalists_from_publishers(
+                    job.topic, job.geography, job.scraping, live=not feed_scheduler.running
+                )
+            )
+            published_at = time.monotonic()
+            for record in iter_enrich_journalists(batches, job.enrichment):
+                job.results.append(record)
+                job.journalists_enriched += 1
+                if time.monotonic() - published_at >= _PUBLISH_INTERVAL:
+                    published_at = time.monotonic()
+                    self._publish(job)
+
+            print_enrichment_summary(job.enrichment, len(job.results))
+            # Set before the status, which makes the job finished for _prune on other threads
+            job.finished_at = time.time()
+            job.status = "completed"
+        except Exception as e:
+            print(f"[job {job.id}] Scrape failed: {e}")
+            job.error = str(e)
+            job.finished_at = time.time()
+            job.status = "failed"
+        finally:
+            with self._lock:
+                if self._in_flight.get(key) is job:
+                    del self._in_flight[key]
+            self._publish(job)
+
+    def _prune(self):
+        cutoff = time.time() - self.result_ttl
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished and job.finished_at is not None and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+
+job_manager = ScrapeJobManager()
@@ -0,0 +1,241 @@
+import argparse
+import os
+import random
+import time
+import unicodedata
+from functools import lru_cache
+
+from ranking import article_relevance
+
+# Articles kept per journalist; articles arrive newest first, so later ones are dropped
+JOURNALIST_RECENT_ARTICLES = int(os.getenv("JOURNALIST_RECENT_ARTICLES", 5))
+
+
+@lru_cache(maxsize=4096)
+def fold_name(name):
+    """Case- and accent-insensitive form of a name: "José" and "jose" fold alike"""
+    decomposed = unicodedata.normalize("NFKD", name)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+def journalist_key(first_name, last_name, domain):
+    return f"{fold_name(first_name)}-{fold_name(last_name)}-{domain.lower()}"
+
+
+class Journalist:
+    """
+    One author at one publication, aggregated over their matched articles,
+    or (see combine) one person across several. Enrichment fills in the
+    email fields in place; to_dict() is the API shape.
+    """
+
+    __slots__ = ("first_name", "last_name", "publication_name", "domain", "topics",
+                 "recent_articles", "article_count", "relevance", "latest_ts", "score",
+                 "affiliations", "email", "email_confidence", "email_source")
+
+    def __init__(self, first_name, last_name, publication_name, domain):
+        self.first_name = first_name
+        self.last_name = last_name
+        self.publication_name = publication_name
+        self.domain = domain
+        # Lists rather than sets: small, ordered, and safe to copy while another thread appends
+        self.topics = []
+        self.recent_articles = []
+        # Ranking inputs over every matched article, not just the recent ones kept
+        self.article_count = 0
+        self.relevance = 0.0
+        self.latest_ts = None
+        # Set by ranking.top_journalists
+        self.score = None
+        # The per-publication records of a combined journalist, primary first
+        self.affiliations = None
+        self.email = None
+        self.email_confidence = None
+        self.email_source = None
+
+    @property
+    def key(self):
+        return journalist_key(self.first_name, self.last_name, self.domain)
+
+    @property
+    def enriched(self):
+        return self.email_source is not None
+
+    def add_article(self, title, url, published, topics=(), published_ts=None):
+        for topic in topics:
+            if topic not in self.topics:
+                self.topics.append(topic)
+        self.article_count += 1
+        self.relevance += article_relevance(title, topics)
+        if published_ts and (self.latest_ts is None or published_ts > self.latest_ts):
+            self.latest_ts = published_ts
+        if len(self.recent_articles) < JOURNALIST_RECENT_ARTICLES:
+            self.recent_articles.append((title, url, published))
+
+    @classmethod
+    def combine(cls, records):
+        """
+        One record for the same person's records at several publications.
+        The one with the most matched articles is primary: its spelling,
+        publication, domain (which enrichment looks up) and recent articles
+        are the combined record's. Counts and topics cover them all, and
+        every record stays in `affiliations` with its own article history.
+        """
+        primary = max(records, key=lambda j: j.article_count)
+        combined = cls(primary.first_name, primary.last_name, primary.publication_name, primary.domain)
+        combined.recent_articles = list(primary.recent_articles)
+        for record in records:
+            for topic in record.topics:
+                if topic not in combined.topics:
+                    combined.topics.append(topic)
+            combined.article_count += record.article_count
+            combined.relevance += record.relevance
+            if record.latest_ts and (combined.latest_ts is None or record.latest_ts > combined.latest_ts):
+                combined.latest_ts = record.latest_ts
+        combined.affiliations = sorted(records, key=lambda j: j.article_count, reverse=True)
+        return combined
+
+    def absorb(self, records):
+        """
+        Fold more of this person's records into this one after it was passed
+        on (see identity_index.IdentityMerger): counts, topics and
+        affiliations grow, while its name, publication and domain, which
+        enrichment looked up, stay.
+        """
+        if self.affiliations is None:
+            own = Journalist(self.first_name, self.last_name, self.publication_name, self.domain)
+            own.recent_articles = list(self.recent_articles)
+            own.article_count = self.article_count
+            self.affiliations = [own]
+        for record in records:
+            for topic in record.topics:
+                if topic not in self.topics:
+                    self.topics.append(topic)
+            self.article_count += record.article_count
+            self.relevance += record.relevance
+            if record.latest_ts and (self.latest_ts is None or record.latest_ts > self.latest_ts):
+                self.latest_ts = record.latest_ts
+        self.affiliations = self.affiliations[:1] + sorted(
+            self.affiliations[1:] + list(records), key=lambda j: j.article_count, reverse=True
+        )
+
+    def set_email(self, email, confidence, source):
+        self.email = email
+        self.email_confidence = confidence
+        self.email_source = source
+
+    def to_dict(self):
+        record = {
+            "first_name": self.first_name,
+            "last_name": self.last_name,
+            "publication_name": self.publication_name,
+            "domain": self.domain,
+            "topics": list(self.topics),
+            "recent_articles": self._article_dicts(),
+        }
+        if self.affiliations:
+            record["affiliations"] = [
+                {
+                    "first_name": a.first_name,
+                    "last_name": a.last_name,
+                    "publication_name": a.publication_name,
+                    "domain": a.domain,
+                    "article_count": a.article_count,
+                    "recent_articles": a._article_dicts(),
+                }
+                for a in self.affiliations
+            ]
+        if self.score is not None:
+            record["relevance_score"] = round(self.score, 2)
+        if self.enriched:
+            record["email"] = self.email
+            record["email_confidence"] = self.email_confidence
+            record["email_source"] = self.email_source
+        return record
+
+    def _article_dicts(self):
+        return [
+            {"title": title, "url": url, "published": published}
+            for title, url, published in list(self.recent_articles)
+        ]
+
+
+def add_journalist(journalists, first_name, last_name, pub):
+    """
+    The record for this author at `pub` in `journalists` (a dict keyed by
+    journalist_key), created if needed. Returns (journalist, created).
+    """
+    key = journalist_key(first_name, last_name, pub["domain"])
+    journalist = journalists.get(key)
+    if journalist is not None:
+        # Keep the first spelling seen, unless it was an all-lowercase byline
+        if f"{journalist.first_name} {journalist.last_name}".islower():
+            journalist.first_name, journalist.last_name = first_name, last_name
+        return journalist, False
+    journalist = journalists[key] = Journalist(first_name, last_name, pub["name"], pub["domain"])
+    return journalist, True
+
+
+def _synthetic_articles(entries, seed=0):
+    """(author, domain, title, url, published, topics) tuples, about 20 articles per author"""
+    rng = random.Random(seed)
+    first = ["Jane", "John", "José", "Zoë", "Priya", "Wei", "Amara", "Lars", "Mei", "Omar"]
+    last = ["Doe", "Smith", "Álvarez", "Müller", "Patel", "Chen", "Okafor", "Berg", "Tanaka", "Haddad"]
+    topics = ["ai", "education", "climate", "robotics", "security", "energy"]
+    for i in range(entries):
+        author = rng.randrange(max(1, entries // 20))
+        domain = f"pub{author % 50}.example.com"
+        yield ((first[author % 10], f"{last[author // 10 % 10]}{author // 100}"), domain,
+               f"Story number {i} about things", f"https://{domain}/story/{i}",
+               "Mon, 05 Oct 2026 10:00:00 GMT", rng.sample(topics, 2))
+
+
+def _aggregate_dicts(articles):
+    """The dict-of-dicts aggregation this module replaced, as a memory baseline"""
+    journalists = {}
+    for (first_name, last_name), domain, title, url, published, topics in articles:
+        key = f"{first_name}-{last_name}-{domain}"
+        j = journalists.setdefault(key, {
+            "first_name": "", "last_name": "", "publication_name": "", "domain": "",
+            "topics": set(), "recent_articles": [],
+        })
+        j.update(first_name=first_name, last_name=last_name, publication_name=domain, domain=domain)
+        j["topics"].update(topics)
+        j["recent_articles"].append({"title": title, "url": url, "published": published})
+    return [{**j, "topics": list(j["topics"]), "recent_articles": j["recent_articles"][:5]}
+            for j in journalists.values()]
+
+
+def _aggregate_records(articles):
+    journalists = {}
+    for (first_name, last_name), domain, title, url, published, topics in articles:
+        journalist, _ = add_journalist(journalists, first_name, last_name, {"name": domain, "domain": domain})
+        journalist.add_article(title, url, published, topics)
+    return list(journalists.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Peak memory of journalist aggregation: dict records vs Journalist records"
+    )
+    parser.add_argument("--entries", type=int, default=100000)
+    args = parser.parse_args()
+    import tracemalloc
+
+    # Materialise the input first so only the aggregation is measured
+    articles = list(_synthetic_articles(args.entries))
+    print(f"{args.entries} matched articles")
+    for name, aggregate in (("dict records", _aggregate_dicts), ("Journalist records", _aggregate_records)):
+        tracemalloc.start()
+        started = time.perf_counter()
+        result = aggregate(articles)
+        elapsed = time.perf_counter() - started
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"  {name:<20} {len(result):>7} journalists  peak {peak / 2**20:>7.1f} MB  "
+              f"retained {current / 2**20:>7.1f} MB  {elapsed * 1000:>7.0f} ms")
+        del result
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+import threading
+import time
+from contextlib import contextmanager
+
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+def _format_labels(names, values):
+    if not names:
+        return ""
+    pairs = ",".join(
+        '%s="%s"' % (name, str(value).replace("\\", "\\\\").replace('"', '\\"'))
+        for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+class Counter:
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for label_values, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labels, label_values)} {value}")
+        return lines
+
+
+class Gauge:
+    """
+    A value read from `collect` when metrics are rendered.
+    `collect` returns a number, or a dict of label values -> number; kind="counter"
+    exposes running totals kept elsewhere (e.g. cache hit counts) as counters.
+    """
+
+    def __init__(self, name, help, collect, labels=(), kind="gauge"):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.collect = collect
+        self.kind = kind
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        values = self.collect()
+        if not isinstance(values, dict):
+            values = {(): values}
+        for label_values, value in sorted(values.items()):
+            if value is not None:
+                lines.append(f"{self.name}{_format_labels(self.labels, label_values)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help, labels=(), buckets=DURATION_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        label_names = self.labels + ("le",)
+        with self._lock:
+            for label_values, (counts, total, count) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    lines.append(f"{self.name}_bucket{_format_labels(label_names, label_values + (bound,))} {cumulative}")
+                lines.append(f"{self.name}_bucket{_format_labels(label_names, label_values + ('+Inf',))} {count}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labels, label_values)} {total:.6f}")
+                lines.append(f"{self.name}_count{_format_labels(self.labels, label_values)} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help, labels=()):
+        return self.register(Counter(name, help, labels))
+
+    def gauge(self, name, help, collect, labels=(), kind="gauge"):
+        return self.register(Gauge(name, help, collect, labels, kind))
+
+    def histogram(self, name, help, labels=(), buckets=DURATION_BUCKETS):
+        return self.register(Histogram(name, help, labels, buckets))
+
+    def render(self):
+        """Prometheus text exposition format"""
+        with self._lock:
+            metrics = list(self._metrics)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+stage_seconds = registry.histogram(
+    "scraper_stage_seconds", "Time spent in each scrape stage", labels=("stage",)
+)
+publisher_stage_seconds = registry.counter(
+    "scraper_publisher_stage_seconds_total", "Time spent per publisher and stage", labels=("publisher", "stage")
+)
+feed_failures = registry.counter(
+    "scraper_feed_failures_total", "Feeds that could not be used, by reason", labels=("publisher", "reason")
+)
+enrichment_cache_lookups = registry.counter(
+    "scraper_enrichment_cache_lookups_total", "Enrichment cache lookups", labels=("result",)
+)
+feed_entries = registry.counter(
+    "scraper_feed_entries_total", "Feed entries scanned, by whether they were new or already processed",
+    labels=("result",)
+)
+email_pattern_lookups = registry.counter(
+    "scraper_email_pattern_lookups_total",
+    "Addresses predicted from learned domain patterns: served, or checked against Hunter",
+    labels=("result",)
+)
+hunter_requests = registry.counter(
+    "scraper_hunter_requests_total", "Hunter.io API calls by HTTP status", labels=("status",)
+)
+author_page_lookups = registry.counter(
+    "scraper_author_page_lookups_total",
+    "Publisher page crawls before Hunter, by whether they found a usable address", labels=("result",)
+)
+crawler_pages = registry.counter(
+    "scraper_crawler_pages_total", "Pages requested by the author page crawler, by outcome", labels=("result",)
+)
+
+
+class Timings:
+    """
+    Per-request stage timings, with a per-publisher breakdown.
+    Safe to record into from several threads.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._stages = {}
+        self._publishers = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage, seconds, publisher=None):
+        with self._lock:
+            totals = self._stages.setdefault(stage, [0.0, 0])
+            totals[0] += seconds
+            totals[1] += 1
+            if publisher:
+                by_stage = self._publishers.setdefault(publisher, {})
+                by_stage[stage] = by_stage.get(stage, 0.0) + seconds
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                "total_ms": round((time.perf_counter() - self.started) * 1000, 1),
+                "stages": {
+                    stage: {"total_ms": round(seconds * 1000, 1), "count": count}
+                    for stage, (seconds, count) in self._stages.items()
+                },
+                "publishers": {
+                    publisher: {stage: round(seconds * 1000, 1) for stage, seconds in by_stage.items()}
+                    for publisher, by_stage in self._publishers.items()
+                },
+            }
+
+
+def record(stage, seconds, publisher=None, timings=None):
+    """Record a finished span in the global metrics and, when given, the request's timings"""
+    stage_seconds.observe(seconds, stage)
+    if publisher:
+        publisher_stage_seconds.inc(publisher, stage, amount=seconds)
+    if timings is not None:
+        timings.add(stage, seconds, publisher)
+
+
+@contextmanager
+def span(stage, publisher=None, timings=None):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(stage, time.perf_counter() - started, publisher, timings)
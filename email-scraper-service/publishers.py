@@ -1,247 +1,156 @@
-PUBLISHERS = [
-    {
-        "name": "New York Times",
-        "rss": "https://rss.nytimes.com/services/xml/rss/nyt/Technology.xml",
-        "domain": "nytimes.com",
-        "region": "Northeast",
-        "author_fields": ["dc_creator", "byline", "author"]
-    },
-    {
-        "name": "Reuters",
-        "rss": "https://www.reutersagency.com/feed/?taxonomy=best-topics&post_type=best",
-        "domain": "reuters.com",
-        "region": "National",
-        "author_fields": ["author"]
-    },
-    {
-        "name": "TechCrunch",
-        "rss": "https://techcrunch.com/feed/",
-        "domain": "techcrunch.com",
-        "region": "West Coast",
-        "author_fields": ["dc_creator", "author"]
-    },
-    {
-        "name": "The Verge",
-        "rss": "https://www.theverge.com/rss/index.xml",
-        "domain": "theverge.com",
-        "region": "Northeast",
-        "author_fields": ["author", "dc_creator"]
-    },
-    {
-        "name": "Wired",
-        "rss": "https://www.wired.com/feed/rss",
-        "domain": "wired.com",
-        "region": "West Coast",
-        "author_fields": ["dc_creator", "author"]
-    },
-    {
-        "name": "Ars Technica",
-        "rss": "https://feeds.arstechnica.com/arstechnica/index",
-        "domain": "arstechnica.com",
-        "region": "National",
-        "author_fields": ["author", "dc_creator"]
-    },
-    {
-        "name": "The Wall Street Journal Tech",
-        "rss": "https://feeds.a.dj.com/rss/RSSWSJD.xml",
-        "domain": "wsj.com",
-        "region": "Northeast",
-        "author_fields": ["author", "dc_creator"]
-    },
-    {
-        "name": "CNN Business Tech",
-        "rss": "http://rss.cnn.com/rss/cnn_tech.rss",
-        "domain": "cnn.com",
-        "region": "Southeast",
-        "author_fields": ["author", "dc_creator"]
-    },
-    {
-        "name": "BBC Technology",
-        "rss": "http://feeds.bbci.co.uk/news/technology/rss.xml",
-        "domain": "bbc.com",
-        "region": "International",
-        "author_fields": ["author"]
-    },
-    {
-        "name": "CNET",
-        "rss": "https://www.cnet.com/rss/news/",
-        "domain": "cnet.com",
-        "region": "West Coast",
-        "author_fields": ["author", "dc_creator"]
-    },
-    {
-        "name": "VentureBeat",
-        "rss": "https://venturebeat.com/feed/",
-        "domain": "venturebeat.com",
-        "region": "West Coast",
-        "author_fields": ["dc_creator", "author"]
-    },
-    {
-        "name": "Engadget",
-        "rss": "https://www.engadget.com/rss.xml",
-        "domain": "engadget.com",
-        "region": "National",
-        "author_fields": ["author", "dc_creator"]
-    },
-    {
-        "name": "ZDNet",
-        "rss": "https://www.zdnet.com/news/rss.xml",
-        "domain": "zdnet.com",
-        "region": "National",
-        "author_fields": ["author", "dc_creator"]
-    },
-    {
-        "name": "Forbes Technology",
-        "rss": "https://www.forbes.com/innovation/feed/",
-        "domain": "forbes.com",
-        "region": "National",
-        "author_fields": ["author", "dc_creator"]
-    },
-    {
-        "name": "Fast Company Technology",
-        "rss": "https://www.fastcompany.com/technology/rss",
-        "domain": "fastcompany.com",
-        "region": "Northeast",
-        "author_fields": ["author", "dc_creator"]
-    },
-    {
-        "name": "MIT Technology Review",
-        "rss": "https://www.technologyreview.com/feed/",
-        "domain": "technologyreview.com",
-        "region": "Northeast",
-        "author_fields": ["author", "dc_creator"]
-    },
-    {
-        "name": "Boston Globe Tech",
-        "rss": "https://www.bostonglobe.com/business/technology/?outputType=rss",
-        "domain": "bostonglobe.com",
-        "region": "Northeast",
-        "author_fields": ["author", "dc_creator"]
-    },
-    {
-        "name": "Philadelphia Inquirer Business",
-        "rss": "https://www.inquirer.com/arc/outboundfeeds/rss/category/business/",
-        "domain": "inquirer.com",
-        "region": "Northeast",
-        "author_fields": ["author", "dc_creator"]
-    },
-    {
-        "name": "Washington Post Tech",
-        "rss": "https://feeds.washingtonpost.com/rss/business/technology",
-        "domain": "washingtonpost.com",
-        "region": "Mid-Atlantic",
-        "author_fields": ["author", "dc_creator"]
-    },
-    {
-        "name": "USA Today Tech",
-        "rss": "http://rssfeeds.usatoday.com/usatoday-TechTopStories",
-        "domain": "usatoday.com",
-        "region": "National",
-        "author_fields": ["author", "dc_creator"]
-    },
-    {
-        "name": "Miami Herald Business",
-        "rss": "https://www.miamiherald.com/news/business/arc.xml",
-        "domain": "miamiherald.com",
-        "region": "Southeast",
-        "author_fields": ["author", "dc_creator"]
-    },
-    {
-        "name": "Atlanta Journal-Constitution Business",
-        "rss": "https://www.ajc.com/business/?outputType=rss",
-        "domain": "ajc.com",
-        "region": "Southeast",
-        "author_fields": ["author", "dc_creator"]
-    },
-    {
-        "name": "Charlotte Observer Business",
-        "rss": "https://www.charlotteobserver.com/news/business/arc.xml",
-        "domain": "charlotteobserver.com",
-        "region": "Southeast",
-        "author_fields": ["author", "dc_creator"]
-    },
-    {
-        "name": "Austin American-Statesman Tech",
-        "rss": "https://www.statesman.com/business/?outputType=rss",
-        "domain": "statesman.com",
-        "region": "Southwest",
-        "author_fields": ["author", "dc_creator"]
-    },
-    {
-        "name": "Chicago Tribune Business",
-        "rss": "https://www.chicagotribune.com/business/?outputType=rss",
-        "domain": "chicagotribune.com",
-        "region": "Midwest",
-        "author_fields": ["author", "dc_creator"]
-    },
-    {
-        "name": "Detroit Free Press Business",
-        "rss": "https://www.freep.com/business/?outputType=rss",
-        "domain": "freep.com",
-        "region": "Midwest",
-        "author_fields": ["author", "dc_creator"]
-    },
-    {
-        "name": "Denver Post Business",
-        "rss": "https://www.denverpost.com/business/feed/",
-        "domain": "denverpost.com",
-        "region": "Mountain West",
-        "author_fields": ["author", "dc_creator"]
-    },
-    {
-        "name": "Arizona Republic Business",
-        "rss": "https://www.azcentral.com/business/?outputType=rss",
-        "domain": "azcentral.com",
-        "region": "Southwest",
-        "author_fields": ["author", "dc_creator"]
-    },
-    {
-        "name": "Seattle Times Business",
-        "rss": "https://www.seattletimes.com/business/feed/",
-        "domain": "seattletimes.com",
-        "region": "Pacific Northwest",
-        "author_fields": ["author", "dc_creator"]
-    },
-    {
-        "name": "Portland Oregonian Business",
-        "rss": "https://www.oregonlive.com/arc/outboundfeeds/rss/category/business/",
-        "domain": "oregonlive.com",
-        "region": "Pacific Northwest",
-        "author_fields": ["author", "dc_creator"]
-    },
-    {
-        "name": "Los Angeles Times Business",
-        "rss": "https://www.latimes.com/business/rss2.0.xml",
-        "domain": "latimes.com",
-        "region": "West Coast",
-        "author_fields": ["author", "dc_creator"]
-    },
-    {
-        "name": "San Diego Union-Tribune Business",
-        "rss": "https://www.sandiegouniontribune.com/business/?outputType=rss",
-        "domain": "sandiegouniontribune.com",
-        "region": "West Coast",
-        "author_fields": ["author", "dc_creator"]
-    },
-    {
-        "name": "Sacramento Bee Business",
-        "rss": "https://www.sacbee.com/news/business/arc.xml",
-        "domain": "sacbee.com",
-        "region": "West Coast",
-        "author_fields": ["author", "dc_creator"]
-    },
-    {
-        "name": "Mashable",
-        "rss": "https://mashable.com/feeds/rss/all",
-        "domain": "mashable.com",
-        "region": "National",
-        "author_fields": ["author", "dc_creator"]
-    },
-    {
-        "name": "TechRadar",
-        "rss": "https://www.techradar.com/rss",
-        "domain": "techradar.com",
-        "region": "International",
-        "author_fields": ["author", "dc_creator"]
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+# Publisher list and geography aliases; edits are picked up without a restart
+PUBLISHERS_PATH = os.getenv("PUBLISHERS_PATH", str(Path(__file__).parent / "publishers.json"))
+# How often (seconds) the file's mtime is checked for changes
+PUBLISHERS_RELOAD_INTERVAL = float(os.getenv("PUBLISHERS_RELOAD_INTERVAL", 5))
+
+_MAX_PARTIAL_GEOGRAPHIES = 1024
+
+
+class PublisherIndex:
+    """
+    One loaded version of the publisher file: the publishers in file order plus
+    lookup tables by region and geography. Never mutated after construction;
+    a reload builds a new index and swaps it in.
+    """
+
+    def __init__(self, publishers, geographies=None):
+        self.publishers = tuple(publishers)
+        self.by_region = {}
+        for pub in self.publishers:
+            self.by_region.setdefault(pub["region"], []).append(pub)
+
+        # geography (lowercase) -> (regions, publishers); regions is None for "all publishers"
+        self.geographies = {region.lower(): ([region], tuple(pubs)) for region, pubs in self.by_region.items()}
+        for alias, regions in (geographies or {}).items():
+            if regions is None:
+                self.geographies[alias.lower()] = (None, self.publishers)
+            else:
+                wanted = set(regions)
+                self.geographies[alias.lower()] = (
+                    list(regions), tuple(pub for pub in self.publishers if pub["region"] in wanted)
+                )
+        self._partial = {}
+
+    def __len__(self):
+        return len(self.publishers)
+
+    def geography(self, geography):
+        """
+        (regions, publishers, partial) for a geography name or alias, falling back
+        to regions containing it as a substring. None when nothing matches.
+        """
+        key = geography.lower().strip()
+        match = self.geographies.get(key)
+        if match is not None:
+            return match[0], match[1], False
+
+        partial = self._partial.get(key)
+        if partial is None:
+            regions = [region for region in self.by_region if key in region.lower()]
+            partial = (regions, tuple(pub for region in regions for pub in self.by_region[region]))
+            if len(self._partial) < _MAX_PARTIAL_GEOGRAPHIES:
+                self._partial[key] = partial
+        if not partial[1]:
+            return None
+        return partial[0], partial[1], True
+
+
+def _normalize(pub):
+    """A publisher entry with its defaults filled in; raises ValueError if a field is missing or mistyped"""
+    if not isinstance(pub, dict):
+        raise ValueError(f"publisher entry {pub!r} is not an object")
+    name = pub.get("name") or pub.get("rss")
+    missing = [field for field in ("name", "rss", "domain") if not pub.get(field)]
+    if missing:
+        raise ValueError(f"publisher {name!r} is missing {', '.join(missing)}")
+    for field in ("name", "rss", "domain", "region"):
+        if not isinstance(pub.get(field, ""), str):
+            raise ValueError(f"publisher {name!r}: {field} must be a string")
+    for field in ("author_fields", "categories"):
+        value = pub.get(field)
+        if value is not None and not (isinstance(value, list) and all(isinstance(v, str) for v in value)):
+            raise ValueError(f"publisher {name!r}: {field} must be a list of strings")
+    return {
+        **pub,
+        "region": pub.get("region", ""),
+        "author_fields": list(pub.get("author_fields") or ["author"]),
+        "categories": list(pub.get("categories") or []),
     }
-]
\ No newline at end of file
+
+
+def load_publishers(path):
+    """Read a publisher file into a PublisherIndex; raises ValueError if it is invalid"""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, list):
+        data = {"publishers": data}
+    if not isinstance(data, dict) or not isinstance(data.get("publishers", []), list):
+        raise ValueError("expected a list of publishers, or an object with a \"publishers\" list")
+    geographies = data.get("geographies") or {}
+    if not isinstance(geographies, dict) or not all(
+        regions is None or (isinstance(regions, list) and all(isinstance(r, str) for r in regions))
+        for regions in geographies.values()
+    ):
+        raise ValueError("geographies must map each name to a list of regions or null")
+
+    publishers = []
+    seen = set()
+    for pub in data.get("publishers", []):
+        pub = _normalize(pub)
+        if pub["rss"] in seen:
+            print(f"Skipping duplicate publisher feed {pub['rss']}")
+            continue
+        seen.add(pub["rss"])
+        publishers.append(pub)
+    return PublisherIndex(publishers, geographies)
+
+
+class PublisherRegistry:
+    """
+    The publisher file, reloaded when its mtime changes. Readers take the
+    current PublisherIndex from index(); a file that fails to load leaves
+    the previous index in place.
+    """
+
+    def __init__(self, path=PUBLISHERS_PATH, reload_interval=PUBLISHERS_RELOAD_INTERVAL):
+        self.path = path
+        self.reload_interval = reload_interval
+        self._lock = threading.Lock()
+        self._mtime = os.stat(path).st_mtime
+        self._index = load_publishers(path)
+        self._checked_at = time.time()
+
+    def index(self):
+        if time.time() - self._checked_at >= self.reload_interval:
+            self.maybe_reload()
+        return self._index
+
+    def all(self):
+        return self.index().publishers
+
+    def maybe_reload(self):
+        """Reload if the file changed since the last load; returns True if it did"""
+        with self._lock:
+            self._checked_at = time.time()
+            try:
+                mtime = os.stat(self.path).st_mtime
+                if mtime == self._mtime:
+                    return False
+                # Remember a broken file's mtime too, so it is reported once rather than every check
+                self._mtime = mtime
+                index = load_publishers(self.path)
+            except (OSError, ValueError) as e:
+                print(f"Could not reload publishers from {self.path}, keeping the current list: {e}")
+                return False
+            self._index = index
+        print(f"Reloaded {len(index)} publishers from {self.path}")
+        return True
+
+
+publisher_registry = PublisherRegistry()
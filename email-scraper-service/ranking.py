@@ -0,0 +1,73 @@
+import heapq
+import math
+import os
+import time
+
+# Journalists returned per scrape, best first (0 = all), and the lowest relevance score kept;
+# /scrape's limit and min_score override them per request
+SCRAPE_LIMIT = int(os.getenv("SCRAPE_LIMIT", 0))
+SCRAPE_MIN_SCORE = float(os.getenv("SCRAPE_MIN_SCORE", 0))
+# A journalist's latest matched article counts half as recent after this many hours
+RANK_RECENCY_HALF_LIFE = float(os.getenv("RANK_RECENCY_HALF_LIFE", 48))
+
+# Score of a topic keyword found in an article's title, and in its summary only
+_TITLE_HIT = 2.0
+_SUMMARY_HIT = 1.0
+# Weight of recency (1 for an article published now, halving every half-life)
+_RECENCY_WEIGHT = 2.0
+# Bonus at 100% email confidence, applied when ordering enriched journalists
+_EMAIL_WEIGHT = 1.0
+_FALLBACK_SOURCES = ("fallback", "low_confidence")
+
+
+def article_relevance(title, matched_keywords):
+    """Keyword hits of one matched article, a hit in the title counting more than one in the summary"""
+    title = (title or "").lower()
+    return sum(_TITLE_HIT if keyword in title else _SUMMARY_HIT for keyword in matched_keywords)
+
+
+def relevance_score(journalist, now=None):
+    """
+    How well a journalist fits the topic before enrichment: keyword hits over
+    their matched articles, how many articles matched (diminishing), and how
+    recent the latest one is. One article with one keyword in its title,
+    published today, scores about 5.
+    """
+    score = journalist.relevance + math.log2(1 + journalist.article_count)
+    if journalist.latest_ts:
+        age_hours = max(0.0, ((now or time.time()) - journalist.latest_ts) / 3600)
+        score += _RECENCY_WEIGHT * 0.5 ** (age_hours / RANK_RECENCY_HALF_LIFE)
+    return score
+
+
+def top_journalists(journalists, limit=SCRAPE_LIMIT, min_score=SCRAPE_MIN_SCORE, now=None):
+    """
+    The `limit` best-scoring journalists (all when 0) scoring at least
+    `min_score`, best first, with each one's score set. Selection is a heap
+    of `limit` entries, so only the survivors are ever sorted; equal scores
+    keep scrape order.
+    """
+    now = now or time.time()
+    candidates = []
+    for journalist in journalists:
+        journalist.score = relevance_score(journalist, now)
+        if journalist.score >= min_score:
+            candidates.append(journalist)
+    if limit and limit < len(candidates):
+        return heapq.nlargest(limit, candidates, key=lambda j: j.score)
+    return sorted(candidates, key=lambda j: j.score, reverse=True)
+
+
+def rank_enriched(journalists):
+    """
+    Order enriched journalists (already picked by top_journalists) by their
+    score plus their email confidence, so verified addresses lead among
+    similarly relevant journalists.
+    """
+    return sorted(journalists, key=_final_score, reverse=True)
+
+
+def _final_score(journalist):
+    # Fallback addresses (editor@domain) earn nothing, whatever confidence Hunter gave
+    confidence = 0 if journalist.email_source in _FALLBACK_SOURCES else journalist.email_confidence or 0
+    return (journalist.score or 0) + _EMAIL_WEIGHT * confidence / 100
@@ -0,0 +1,103 @@
+import asyncio
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+    Allows bursts of up to `capacity` calls and refills at `rate` tokens per second.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1, rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, tokens=1):
+        """Block until `tokens` are available, then take them"""
+        if self.rate <= 0:
+            return
+        while True:
+            wait_for = self._try_take(tokens)
+            if not wait_for:
+                return
+            time.sleep(wait_for)
+
+    def _try_take(self, tokens):
+        """0 after taking `tokens`, else the seconds until they are available"""
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0
+            return (tokens - self._tokens) / self.rate
+
+    async def acquire_async(self, tokens=1):
+        """acquire() for the event loop: waits without blocking other tasks"""
+        if self.rate <= 0:
+            return
+        while True:
+            wait_for = self._try_take(tokens)
+            if not wait_for:
+                return
+            await asyncio.sleep(wait_for)
+
+
+class MonthlyQuota:
+    """
+    Counts calls per calendar month against a fixed limit (0 means unlimited).
+    With `store` (a callable returning a shared_cache store) the count is kept
+    there under `key`, so every worker process draws from one quota.
+    """
+
+    def __init__(self, limit, store=None, key="quota"):
+        self.limit = int(limit)
+        self.store = store
+        self.key = key
+        self._used = 0
+        self._month = time.strftime("%Y-%m")
+        self._lock = threading.Lock()
+
+    def _shared_key(self):
+        return f"{self.key}:{time.strftime('%Y-%m')}"
+
+    @property
+    def used(self):
+        if self.store is not None:
+            # Refused calls are counted too (see try_consume); they don't count as used
+            used = int(self.store().get(self._shared_key()) or 0)
+            return min(used, self.limit) if self.limit else used
+        with self._lock:
+            return self._used if self._month == time.strftime("%Y-%m") else 0
+
+    def try_consume(self):
+        if self.store is not None:
+            # Counted before checking, as INCR is the one atomic step
+            used = self.store().incr(self._shared_key(), ttl=32 * 24 * 3600)
+            return not self.limit or used <= self.limit
+        with self._lock:
+            month = time.strftime("%Y-%m")
+            if month != self._month:
+                self._month = month
+                self._used = 0
+            if self.limit and self._used >= self.limit:
+                return False
+            self._used += 1
+            return True
+
+    async def try_consume_async(self):
+        """try_consume() for the event loop: a count kept in a blocking shared store is taken on the worker pool"""
+        if self.store is not None:
+            return await self.store().run_async(self.try_consume)
+        return self.try_consume()
+
+    def remaining(self):
+        return None if not self.limit else max(0, self.limit - self.used)
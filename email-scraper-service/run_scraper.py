@@ -1,27 +1,234 @@
-import feedparser
-import requests
-from collections import defaultdict
-from publishers import PUBLISHERS
+from publishers import publisher_registry
+from feed_cache import feed_cache
+from feed_parser import parse_feed
+from topic_matcher import compile_matcher
+from name_parser import parse_name
+from journalists import add_journalist
+from article_store import get_article_store
+from feed_delta import feed_deltas
+from feed_health import feed_health
+from shared_cache import get_shared_cache
+import metrics
 from urllib.parse import urlparse
-from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import os
+import re
+import time
+from functools import lru_cache
+
+FEED_TIMEOUT = float(os.getenv("FEED_TIMEOUT", 10))
+MAX_FETCH_WORKERS = int(os.getenv("MAX_FETCH_WORKERS", 8))
+SCRAPE_DEADLINE = float(os.getenv("SCRAPE_DEADLINE", 30))
+# "index" answers topic queries from the article store's inverted index; the
+# other modes scan each feed's entries with a compiled topic matcher: "word"
+# for whole words, "stem" for related word forms and "substring" for the
+# original keyword-in-text semantics
+TOPIC_MATCH_MODE = os.getenv("TOPIC_MATCH_MODE", "index")
+MATCH_MODES = ("index", "word", "stem", "substring")
+# Without a live fetch, feeds indexed within this many seconds are answered from the article store
+FEED_STORE_MAX_AGE = float(os.getenv("FEED_STORE_MAX_AGE", 2 * 3600))
+# Entries per feed considered by the scanning modes (0 = every parsed entry, up to FEED_MAX_ENTRIES)
+FEED_SCAN_ENTRIES = int(os.getenv("FEED_SCAN_ENTRIES", 0))
+
+_WORD_RE = re.compile(r"\b\w+\b")
+_STOP_WORDS = frozenset({"in", "the", "of", "and", "or", "a", "an", "to", "for"})
+
+# Background fetches of feeds whose circuit breaker is open
+_probe_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="feed-probe")
+
+
+def fetch_feed_with_timeout(rss_url, timeout=10, ttl=None, publisher=None, timings=None):
+    """
+    Fetch RSS feed with timeout support using requests.
+    Feeds are served from the feed cache while fresh; stale feeds are
+    revalidated with a conditional GET so a 304 skips the download and parse.
+    One thread across all workers fetches a stale feed at a time; the others
+    wait for it and reuse what it fetched.
+    Download and parse times are recorded as the fetch and parse stages, and
+    every network fetch's latency and outcome feed the publisher's health.
+    """
+    cached, fresh = feed_cache.get(rss_url, ttl)
+    if fresh:
+        return cached.feed
+
+    # Held for the fetch plus parsing
+    with get_shared_cache().lock(f"feed:{rss_url}", timeout + 5):
+        cached, feed = reuse_feed(rss_url, ttl, publisher, timings)
+        if feed is not None:
+            return feed
+        return _fetch_feed(rss_url, cached, timeout, publisher, timings)
+
 
+def _fetch_feed(rss_url, cached, timeout, publisher, timings):
+    # Imported on first use, as the async path (the default) never needs it
+    import requests
+
+    headers = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+    }
+    if cached:
+        headers.update(cached.conditional_headers())
 
-def fetch_feed_with_timeout(rss_url, timeout=10):
-    """Fetch RSS feed with timeout support using requests"""
     try:
         # Use requests with timeout to fetch the feed content first
-        response = requests.get(rss_url, timeout=timeout, headers={
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+        started = time.perf_counter()
+        with metrics.span("fetch", publisher, timings):
+            response = requests.get(rss_url, timeout=timeout, headers=headers)
+        fetch_seconds = time.perf_counter() - started
+        if response.status_code == 304 and cached:
+            feed_health.record_success(rss_url, fetch_seconds, publisher)
+            feed_cache.touch(rss_url)
+            return cached.feed
         response.raise_for_status()
-
-        # Parse the fetched content with feedparser
-        return feedparser.parse(response.content)
+        feed_health.record_success(rss_url, fetch_seconds, publisher)
+        return parse_and_cache_feed(rss_url, response.content, response.headers, publisher, timings)
     except requests.Timeout:
-        raise TimeoutError(f"Feed fetch timed out after {timeout}s")
+        feed_health.record_failure(rss_url, f"timed out after {timeout:g}s", publisher)
+        raise TimeoutError(f"Feed fetch timed out after {timeout:g}s")
     except requests.RequestException as e:
+        feed_health.record_failure(rss_url, e, publisher)
         raise Exception(f"Failed to fetch feed: {str(e)}")
 
+
+def reuse_feed(rss_url, ttl=None, publisher=None, timings=None):
+    """
+    (this process's cached entry, feed to serve without fetching): the feed is
+    fresh in the feed cache, or a fresh copy another worker published, parsed
+    and cached here; None when it has to be fetched.
+    """
+    cached, fresh = feed_cache.get(rss_url, ttl)
+    if fresh:
+        return cached, cached.feed
+
+    shared = feed_cache.shared_entry(rss_url)
+    if (shared is not None and shared.is_fresh(feed_cache.default_ttl if ttl is None else ttl)
+            and (cached is None or shared.fetched_at > cached.fetched_at)):
+        with metrics.span("parse", publisher, timings):
+            feed = parse_feed(shared.content)
+        return feed_cache.adopt(shared, feed), feed
+    return cached, None
+
+
+def parse_and_cache_feed(rss_url, content, headers, publisher=None, timings=None):
+    """Parse fetched feed content (fast path, falling back to feedparser) and cache it"""
+    with metrics.span("parse", publisher, timings):
+        feed = parse_feed(content)
+    feed_cache.put(
+        rss_url,
+        content,
+        feed,
+        etag=headers.get("ETag"),
+        last_modified=headers.get("Last-Modified"),
+    )
+    return feed
+
+
+def probe_feed(pub):
+    """Background fetch of a feed whose circuit is open; the outcome closes or re-opens it"""
+    try:
+        fetch_feed_with_timeout(pub["rss"], FEED_TIMEOUT, ttl=0, publisher=pub["name"])
+    except Exception as e:
+        print(f"  Probe of {pub['name']} failed: {e}")
+
+
+def iter_feeds(publishers, timeout=FEED_TIMEOUT, max_workers=MAX_FETCH_WORKERS,
+               deadline=SCRAPE_DEADLINE, timings=None):
+    """
+    Fetch the RSS feeds of several publishers in parallel.
+    Yields (publisher, parsed feed) in completion order for every feed that
+    finished before the overall deadline (seconds). Failed, timed out and
+    unfinished feeds are left out, so callers get partial results instead of waiting.
+    Feeds with an open circuit are skipped without a request (and probed in
+    the background once due); the rest get a timeout adapted to their latency,
+    capped at `timeout`.
+    """
+    publishers = skip_open_circuits(publishers)
+    if not publishers:
+        return
+
+    started = time.monotonic()
+    fetched = 0
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(publishers))))
+    futures = {
+        executor.submit(
+            fetch_feed_with_timeout, pub["rss"], feed_health.timeout_for(pub["rss"], timeout),
+            pub.get("cache_ttl"), pub["name"], timings
+        ): pub
+        for pub in publishers
+    }
+    pending = set(futures)
+
+    try:
+        while pending:
+            remaining = deadline - (time.monotonic() - started)
+            if remaining <= 0:
+                break
+
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                pub = futures[future]
+                feed = feed_result(pub, future)
+                if feed is not None:
+                    fetched += 1
+                    yield pub, feed
+    finally:
+        # Don't block on stragglers once the deadline has passed
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    report_fetches(publishers, fetched, [futures[f] for f in pending], deadline, started)
+
+
+def skip_open_circuits(publishers):
+    """
+    The publishers whose feed circuit is closed. Open ones are counted as
+    "circuit_open" failures and get a background probe once their cooldown passed.
+    """
+    broken = [pub for pub in publishers if feed_health.is_open(pub["rss"])]
+    if not broken:
+        return publishers
+    for pub in broken:
+        metrics.feed_failures.inc(pub["name"], "circuit_open")
+        if feed_health.claim_probe(pub["rss"]):
+            _probe_executor.submit(probe_feed, pub)
+    print(f"  Circuit open - skipping {', '.join(pub['name'] for pub in broken)}")
+    return [pub for pub in publishers if pub not in broken]
+
+
+def feed_result(pub, future):
+    """The parsed feed of a finished fetch (a Future or asyncio Task), or None after reporting its failure"""
+    try:
+        feed = future.result()
+    except TimeoutError as e:
+        print(f"  TIMEOUT ({e}) - skipping {pub['name']}")
+        metrics.feed_failures.inc(pub["name"], "timeout")
+        return None
+    except Exception as e:
+        print(f"  ERROR fetching {pub['name']}: {e}")
+        metrics.feed_failures.inc(pub["name"], "error")
+        return None
+    print(f"Fetched RSS from {pub['name']}: {len(feed.entries)} articles")
+    return feed
+
+
+def report_fetches(publishers, fetched, unfinished, deadline, started):
+    if unfinished:
+        for pub in unfinished:
+            metrics.feed_failures.inc(pub["name"], "deadline")
+        skipped = ", ".join(pub["name"] for pub in unfinished)
+        print(f"  DEADLINE of {deadline}s reached - returning partial results, skipped: {skipped}")
+
+    print(f"Fetched {fetched}/{len(publishers)} feeds in {time.monotonic() - started:.2f}s")
+
+
+def fetch_feeds_concurrently(publishers, timeout=FEED_TIMEOUT, max_workers=MAX_FETCH_WORKERS,
+                             deadline=SCRAPE_DEADLINE, timings=None):
+    """Fetch feeds in parallel; returns a dict of rss url -> parsed feed (see iter_feeds)"""
+    return {
+        pub["rss"]: feed
+        for pub, feed in iter_feeds(publishers, timeout, max_workers, deadline, timings)
+    }
+
+
 def extract_author(entry, author_fields):
     for field in author_fields:
         value = entry.get(field)
@@ -29,217 +236,313 @@ def extract_author(entry, author_fields):
             return value.replace("By ", "").strip()
     return ""
 
-def parse_name(full_name):
+def new_scrape_stats():
+    return {
+        "total_articles_checked": 0,
+        "new_articles": 0,
+        "matched_articles": 0,
+        "articles_with_authors": 0,
+        "unique_journalists": 0,
+    }
+
+
+def build_topic_keywords(topic):
+    # Parse topic keywords for matching
+    # Extract meaningful keywords from phrases like "AI in EdTech, AI in Education"
+    return list(_topic_keywords(topic))
+
+
+@lru_cache(maxsize=256)
+def _topic_keywords(topic):
+    topic_keywords = []
+    for phrase in topic.split(','):
+        # Extract key terms, dropping common words like 'in', 'the', 'of', 'and'
+        words = _WORD_RE.findall(phrase.strip().lower())
+        topic_keywords.extend(w for w in words if w not in _STOP_WORDS and len(w) > 2)
+
+    # Remove duplicates while preserving order
+    return tuple(dict.fromkeys(topic_keywords))
+
+
+def select_publishers(geography=None):
+    """Publishers for a geography, resolved from the registry's precomputed index"""
+    index = publisher_registry.index()
+    if not (geography and geography.strip()):
+        return index.publishers
+
+    match = index.geography(geography)
+    if match is None:
+        print(f"Geography '{geography}' not recognized, using all publishers")
+        return index.publishers
+
+    regions, publishers_to_scrape, partial = match
+    if partial:
+        print(f"Partial match: {len(publishers_to_scrape)} publishers for geography '{geography}'")
+    elif regions is not None:
+        print(f"Filtered to {len(publishers_to_scrape)} publishers for geography '{geography}'")
+        print(f"Regions included: {regions}")
+    return publishers_to_scrape
+
+
+def match_articles_scan(pub, feed, topic_keywords, stats, mode="substring"):
+    """Scan a feed's entries with a compiled topic matcher"""
+    return match_articles_scan_multi(pub, feed, [topic_keywords], [stats], mode)[0]
+
+
+def match_articles_scan_multi(pub, feed, keyword_lists, stats_list, mode="substring"):
     """
-    Parse a full name string into (first_name, last_name) tuples.
-    Handles multiple authors separated by 'and', '&', or commas.
-    Returns a list of (first_name, last_name) tuples.
+    Match several topics over a feed's entries (the first FEED_SCAN_ENTRIES,
+    if set) in one pass. Entries already processed by an earlier scrape reuse
+    their extracted author and match results, so only new entries cost work.
+    Returns one list of matched articles per keyword list, each article
+    carrying the keywords it matched.
     """
-    if not full_name:
-        return []
-
-    bad_terms = ["Editorial", "Staff", "Team", "Newsroom"]
-    if any(bad.lower() in full_name.lower() for bad in bad_terms):
-        return []
+    matchers = [compile_matcher(tuple(keywords), mode) for keywords in keyword_lists]
+    matched, checked, new = feed_deltas.match(pub, feed, matchers, extract_author, FEED_SCAN_ENTRIES)
+    for stats in stats_list:
+        stats["total_articles_checked"] += checked
+        stats["new_articles"] += new
+    return [
+        [{**article, "matched_keywords": list(matched_keywords)} for article, matched_keywords in found]
+        for found in matched
+    ]
 
-    # Split by common delimiters for multiple authors
-    # Handle patterns like: "John Doe and Jane Smith" or "A, B and C"
-    import re
 
-    # Replace various separators with a uniform delimiter
-    normalized = full_name
-    normalized = re.sub(r'\s+and\s+', '|', normalized, flags=re.IGNORECASE)
-    normalized = re.sub(r'\s*&\s*', '|', normalized)
+def match_articles_indexed(pub, feed, topic_keywords, stats):
+    """
+    Whole-term match over every stored article of a feed, newest first.
+    `feed` is indexed first when given; None queries the store as it is.
+    """
+    store = get_article_store()
+    if feed is not None:
+        stats["new_articles"] += store.update_feed(pub, feed, extract_author)
+    stats["total_articles_checked"] += store.feed_size(pub["rss"])
+    return store.search(topic_keywords, pub["rss"])
 
-    # Split by the delimiter
-    author_names = [name.strip() for name in normalized.split('|')]
 
-    # Also handle comma-separated lists (but not commas within names)
-    # This handles "Smith, Jones and Brown"
-    expanded_names = []
-    for name in author_names:
-        # Check if this looks like "Last1, Last2, Last3" pattern
-        if ',' in name:
-            parts = [p.strip() for p in name.split(',')]
-            # If all parts are single words (likely last names only), skip
-            if all(len(p.split()) == 1 for p in parts):
-                continue
-            expanded_names.extend(parts)
+def collect_journalists(pub, feed, topic_keywords, journalists, stats, match_mode=None, timings=None):
+    """
+    Match one publisher's articles against the topic keywords and add
+    their authors to `journalists` (a dict keyed by name and domain).
+    Returns the journalists first seen in this feed.
+    """
+    mode = match_mode or TOPIC_MATCH_MODE
+    with metrics.span("match", pub["name"], timings):
+        if mode == "index":
+            matched = match_articles_indexed(pub, feed, topic_keywords, stats)
         else:
-            expanded_names.append(name)
+            matched = match_articles_scan(pub, feed, topic_keywords, stats, mode)
+
+    return add_journalists(pub, matched, journalists, stats, timings)
+
+
+def add_journalists(pub, matched, journalists, stats, timings=None):
+    """
+    Add the authors of one publisher's matched articles to `journalists`
+    (Journalist records keyed by journalist_key).
+    Returns the journalists first seen here.
+    """
+    new_journalists = []
+    name_parse_seconds = 0.0
+    for article in matched:
+        stats["matched_articles"] += 1
+
+        started = time.perf_counter()
+        parsed_authors = parse_name(article["author"])
+        name_parse_seconds += time.perf_counter() - started
 
-    # Parse each individual name
-    results = []
-    for name in expanded_names:
-        name = name.strip()
-        if not name:
+        if not parsed_authors:
             continue
 
-        parts = name.split()
-        if len(parts) == 1:
-            # Single name - use as first name only
-            results.append((parts[0], ""))
-        elif len(parts) >= 2:
-            # Multiple parts - first is first_name, rest is last_name
-            first = parts[0]
-            last = " ".join(parts[1:])
-            results.append((first, last))
-
-    return results
-
-
-def scrape_journalists_from_publishers(topic: str, geography: str = None):
-    journalists = defaultdict(lambda: {
-        "first_name": "",
-        "last_name": "",
-        "publication_name": "",
-        "domain": "",
-        "topics": set(),
-        "recent_articles": []
-    })
+        stats["articles_with_authors"] += 1
 
-    # Parse topic keywords for matching
-    # Extract meaningful keywords from phrases like "AI in EdTech, AI in Education"
-    import re
-    topic_keywords = []
-    for phrase in topic.split(','):
-        phrase = phrase.strip().lower()
-        # Extract key terms (remove common words like 'in', 'the', 'of', 'and')
-        words = re.findall(r'\b\w+\b', phrase)
-        # Filter out stop words
-        stop_words = {'in', 'the', 'of', 'and', 'or', 'a', 'an', 'to', 'for'}
-        meaningful_words = [w for w in words if w not in stop_words and len(w) > 2]
-        topic_keywords.extend(meaningful_words)
+        # Create separate entries for each co-author
+        for first_name, last_name in parsed_authors:
+            if not first_name:
+                continue
 
-    # Remove duplicates while preserving order
-    topic_keywords = list(dict.fromkeys(topic_keywords))
+            journalist, created = add_journalist(journalists, first_name, last_name, pub)
+            if created:
+                new_journalists.append(journalist)
+            journalist.add_article(article["title"], article["url"], article["published"],
+                                   article["matched_keywords"], article["published_ts"])
+
+    stats["unique_journalists"] = len(journalists)
+    if matched:
+        metrics.record("name_parse", name_parse_seconds, pub["name"], timings)
+        print(f"  ✓ {pub['name']}: matched {len(matched)} topic-relevant articles")
+    return new_journalists
+
+
+def stored_feeds(publishers, match_mode=None, live=True):
+    """
+    Rss urls of the publishers that can be answered from the article store
+    without fetching: none for a live or scanning scrape, otherwise every
+    feed indexed within FEED_STORE_MAX_AGE.
+    """
+    if live or (match_mode or TOPIC_MATCH_MODE) != "index":
+        return set()
+    store = get_article_store()
+    return {pub["rss"] for pub in publishers if store.is_fresh(pub["rss"], FEED_STORE_MAX_AGE)}
+
+
+def print_scrape_stats(stats):
+    print(f"\n--- Scraping Statistics ---")
+    print(f"Total articles checked: {stats['total_articles_checked']}")
+    print(f"New since the last fetch: {stats['new_articles']}")
+    print(f"Articles matching topic: {stats['matched_articles']}")
+    print(f"Articles with valid authors: {stats['articles_with_authors']}")
+    print(f"Unique journalists found: {stats['unique_journalists']}")
+    print(f"---------------------------\n")
+
+
+def scrape_journalists_from_publishers(topic: str, geography: str = None, match_mode: str = None,
+                                       live: bool = True, timings=None):
+    """
+    Find journalists writing about `topic`, as Journalist records.
+    With live=False, feeds recently indexed (e.g. by the feed scheduler) are
+    queried from the article store and only the rest are fetched.
+    Stage timings are recorded into `timings` (a metrics.Timings) when given.
+    """
+    topic_keywords = build_topic_keywords(topic)
     print(f"Topic keywords for matching: {topic_keywords}")
 
-    # Filter publishers by geography if specified
-    publishers_to_scrape = PUBLISHERS
-    if geography and geography.strip():
-        geography_lower = geography.lower().strip()
-
-        # Map common geography terms to publisher regions
-        region_mapping = {
-            'us': ['Northeast', 'West Coast', 'National', 'Midwest', 'Southeast', 'Southwest',
-                   'Mid-Atlantic', 'Mountain West', 'Pacific Northwest'],
-            'usa': ['Northeast', 'West Coast', 'National', 'Midwest', 'Southeast', 'Southwest',
-                    'Mid-Atlantic', 'Mountain West', 'Pacific Northwest'],
-            'united states': ['Northeast', 'West Coast', 'National', 'Midwest', 'Southeast', 'Southwest',
-                              'Mid-Atlantic', 'Mountain West', 'Pacific Northwest'],
-            'northeast': ['Northeast'],
-            'west coast': ['West Coast'],
-            'east coast': ['Northeast', 'Mid-Atlantic'],
-            'national': ['National'],
-            'midwest': ['Midwest'],
-            'south': ['Southeast', 'Southwest'],
-            'southeast': ['Southeast'],
-            'southwest': ['Southwest'],
-            'mid-atlantic': ['Mid-Atlantic'],
-            'mountain west': ['Mountain West'],
-            'pacific northwest': ['Pacific Northwest'],
-            'global': None,  # None means all publishers
-            'international': ['International']
-        }
-
-        # Get matching regions
-        matching_regions = region_mapping.get(geography_lower)
-
-        if matching_regions is not None:
-            # Filter publishers by matching regions
-            publishers_to_scrape = [
-                pub for pub in PUBLISHERS
-                if pub.get('region') in matching_regions
-            ]
-            print(f"Filtered to {len(publishers_to_scrape)} publishers for geography '{geography}'")
-            print(f"Regions included: {matching_regions}")
-        else:
-            # If geography specified but not recognized, try partial match on region
-            publishers_to_scrape = [
-                pub for pub in PUBLISHERS
-                if geography_lower in pub.get('region', '').lower()
-            ]
-            if publishers_to_scrape:
-                print(f"Partial match: {len(publishers_to_scrape)} publishers for geography '{geography}'")
-            else:
-                print(f"Geography '{geography}' not recognized, using all publishers")
-                publishers_to_scrape = PUBLISHERS
-
-    total_articles_checked = 0
-    matched_articles = 0
-    articles_with_authors = 0
-
-    for idx, pub in enumerate(publishers_to_scrape, 1):
-        print(f"[{idx}/{len(publishers_to_scrape)}] Fetching RSS from {pub['name']}...")
-        try:
-            feed = fetch_feed_with_timeout(pub["rss"], timeout=10)
-            print(f"  Found {len(feed.entries)} articles")
-        except TimeoutError:
-            print(f"  TIMEOUT after 10s - skipping {pub['name']}")
-            continue
-        except Exception as e:
-            print(f"  ERROR fetching {pub['name']}: {e}")
+    publishers_to_scrape = select_publishers(geography)
+
+    stored = stored_feeds(publishers_to_scrape, match_mode, live)
+    feeds = fetch_feeds_concurrently(
+        [pub for pub in publishers_to_scrape if pub["rss"] not in stored], timings=timings
+    )
+    return journalists_from_feeds(publishers_to_scrape, topic_keywords, feeds, stored, match_mode, timings)
+
+
+def journalists_from_feeds(publishers, topic_keywords, feeds, stored, match_mode=None, timings=None):
+    """
+    The journalists found in fetched `feeds` (rss url -> parsed feed) and in
+    the article store for the `stored` rss urls, as Journalist records.
+    """
+    journalists = {}
+    stats = new_scrape_stats()
+    if stored:
+        print(f"Answering {len(stored)}/{len(publishers)} feeds from the article store")
+
+    # Process feeds in publisher order so the output matches the sequential path
+    for pub in publishers:
+        feed = feeds.get(pub["rss"])
+        if feed is None and pub["rss"] not in stored:
             continue
+        collect_journalists(pub, feed, topic_keywords, journalists, stats, match_mode, timings)
 
-        pub_matched = 0
-        for entry in feed.entries[:20]:
-            total_articles_checked += 1
+    print_scrape_stats(stats)
 
-            # Check if article matches topic keywords
-            article_title = entry.get("title", "").lower()
-            article_summary = entry.get("summary", "").lower()
-            article_text = f"{article_title} {article_summary}"
+    return list(journalists.values())
 
-            # Must match at least one keyword
-            if not any(keyword in article_text for keyword in topic_keywords):
-                continue
 
-            matched_articles += 1
-            pub_matched += 1
+def iter_journalists_from_publishers(topic: str, geography: str = None, stats=None,
+                                     match_mode: str = None, live: bool = True, timings=None):
+    """
+    Streaming variant of scrape_journalists_from_publishers.
+    Yields (publisher, journalists) as each feed finishes, fastest feed first,
+    with the journalists first seen in that feed. Feeds answered from the
+    article store come first. Scraping statistics are accumulated into
+    `stats` when given.
+    """
+    topic_keywords = build_topic_keywords(topic)
+    print(f"Topic keywords for matching: {topic_keywords}")
 
-            author_raw = extract_author(entry, pub["author_fields"])
-            parsed_authors = parse_name(author_raw)
+    publishers_to_scrape = select_publishers(geography)
 
-            if not parsed_authors:
-                continue
+    journalists = {}
+    if stats is None:
+        stats = new_scrape_stats()
+    stats["feeds_total"] = len(publishers_to_scrape)
+    stats["feeds_fetched"] = 0
+    stats["feeds_from_store"] = 0
 
-            articles_with_authors += 1
+    stored = stored_feeds(publishers_to_scrape, match_mode, live)
+    for pub in publishers_to_scrape:
+        if pub["rss"] in stored:
+            stats["feeds_from_store"] += 1
+            yield pub, collect_journalists(pub, None, topic_keywords, journalists, stats, match_mode, timings)
 
-            # Create separate entries for each co-author
-            for first_name, last_name in parsed_authors:
-                if not first_name:
-                    continue
+    to_fetch = [pub for pub in publishers_to_scrape if pub["rss"] not in stored]
+    for pub, feed in iter_feeds(to_fetch, timings=timings):
+        stats["feeds_fetched"] += 1
+        yield pub, collect_journalists(pub, feed, topic_keywords, journalists, stats, match_mode, timings)
 
-                key = f"{first_name}-{last_name}-{pub['domain']}"
+    print_scrape_stats(stats)
 
-                journalist = journalists[key]
-                journalist["first_name"] = first_name
-                journalist["last_name"] = last_name
-                journalist["publication_name"] = pub["name"]
-                journalist["domain"] = pub["domain"]
 
-                journalist["recent_articles"].append({
-                    "title": entry.get("title", ""),
-                    "url": entry.get("link", ""),
-                    "published": entry.get("published", "")
-                })
+def scrape_journalists_for_queries(queries, match_mode: str = None, live: bool = True, timings=None):
+    """
+    Scrape several (topic, geography) queries with one fetch pass.
+    Every publisher needed by any query is fetched once, and each feed's
+    entries are matched against all of that feed's queries together.
+    Returns a (journalists, stats) pair per query, in query order.
+    """
+    plans, publishers_to_scrape = plan_queries(queries)
+    stored = stored_feeds(publishers_to_scrape, match_mode, live)
+    feeds = fetch_feeds_concurrently(
+        [pub for pub in publishers_to_scrape if pub["rss"] not in stored], timings=timings
+    )
+    return match_queries(queries, plans, publishers_to_scrape, feeds, stored, match_mode, timings)
 
-        if pub_matched > 0:
-            print(f"  ✓ Matched {pub_matched} topic-relevant articles")
 
-    print(f"\n--- Scraping Statistics ---")
-    print(f"Total articles checked: {total_articles_checked}")
-    print(f"Articles matching topic: {matched_articles}")
-    print(f"Articles with valid authors: {articles_with_authors}")
-    print(f"Unique journalists found: {len(journalists)}")
-    print(f"---------------------------\n")
+def plan_queries(queries):
+    """
+    (topic keywords, rss urls) per (topic, geography) query, and the
+    publishers needed by any of them in registry order.
+    """
+    plans = []
+    needed = set()
+    for topic, geography in queries:
+        topic_keywords = build_topic_keywords(topic)
+        rss_urls = {pub["rss"] for pub in select_publishers(geography)}
+        plans.append((topic_keywords, rss_urls))
+        needed |= rss_urls
+    print(f"Batch of {len(queries)} queries needs {len(needed)} feeds")
+
+    # Registry order, so each query sees its publishers in the same order as a single scrape
+    publishers_to_scrape = [pub for pub in publisher_registry.all() if pub["rss"] in needed]
+    return plans, publishers_to_scrape
+
+
+def match_queries(queries, plans, publishers, feeds, stored, match_mode=None, timings=None):
+    """
+    Match each feed's entries against all of that feed's queries together,
+    with `plans` from plan_queries. Returns a (journalists, stats) pair per
+    query, in query order.
+    """
+    journalists = [{} for _ in queries]
+    stats = [new_scrape_stats() for _ in queries]
+    mode = match_mode or TOPIC_MATCH_MODE
+
+    for pub in publishers:
+        feed = feeds.get(pub["rss"])
+        if feed is None and pub["rss"] not in stored:
+            continue
+
+        wanted = [i for i, (_, rss_urls) in enumerate(plans) if pub["rss"] in rss_urls]
+        with metrics.span("match", pub["name"], timings):
+            if mode == "index":
+                if feed is not None:
+                    new = get_article_store().update_feed(pub, feed, extract_author)
+                    for i in wanted:
+                        stats[i]["new_articles"] += new
+                matched = [match_articles_indexed(pub, None, plans[i][0], stats[i]) for i in wanted]
+            else:
+                matched = match_articles_scan_multi(
+                    pub, feed, [plans[i][0] for i in wanted], [stats[i] for i in wanted], mode
+                )
+
+        for i, articles in zip(wanted, matched):
+            add_journalists(pub, articles, journalists[i], stats[i], timings)
+
+    for (topic, geography), query_stats in zip(queries, stats):
+        print(f"  {topic} ({geography or 'all'}): {query_stats['matched_articles']} articles, "
+              f"{query_stats['unique_journalists']} journalists")
 
     return [
-        {
-            **j,
-            "topics": list(j["topics"]),
-            "recent_articles": j["recent_articles"][:5]
-        }
-        for j in journalists.values()
+        (list(query_journalists.values()), query_stats)
+        for query_journalists, query_stats in zip(journalists, stats)
     ]
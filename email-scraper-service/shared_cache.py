@@ -0,0 +1,397 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from contextlib import asynccontextmanager, contextmanager
+from pathlib import Path
+
+from async_http import run_blocking
+
+# Worker processes `python app.py` starts (uvicorn's own setting); with more
+# than one, feeds, locks, the Hunter quota and job state go through a store
+# every worker shares instead of each worker's memory
+WEB_CONCURRENCY = max(1, int(os.getenv("WEB_CONCURRENCY", 1)))
+# The shared store: "memory" (this process only), a SQLite file path (workers
+# on one host), or redis://host:port/db (workers on several hosts; needs the
+# redis package). Unset, it is memory for one worker and SHARED_CACHE_PATH
+# for several
+SHARED_CACHE_URL = os.getenv("SHARED_CACHE_URL", "")
+SHARED_CACHE_PATH = os.getenv(
+    "SHARED_CACHE_PATH",
+    str(Path(__file__).parent / "shared_cache.sqlite3")
+)
+# Prepended to every key the service writes to Redis, so it can share a
+# database with other applications (clear() only removes keys with it)
+SHARED_CACHE_PREFIX = os.getenv("SHARED_CACHE_PREFIX", "scraper:")
+# Longest a worker may hold a single-flight lock before others stop waiting
+# for it (so a crashed worker's lock frees itself), in seconds
+SHARED_LOCK_TTL = float(os.getenv("SHARED_LOCK_TTL", 30))
+
+# How often a worker waiting on another's lock checks whether it was released
+_POLL_INTERVAL = 0.02
+# Expired SQLite rows are deleted at most this often (seconds)
+_PURGE_INTERVAL = 60
+
+
+class SharedStore:
+    """
+    Key-value store with expiring keys, shared by the service's worker
+    processes. Backends implement a small subset of Redis' commands (GET,
+    SET with NX/EX, DEL, compare-and-delete, INCR with an expiry); the
+    single-flight locks and leases below are built on those.
+    """
+
+    # Whether commands can block (on a busy file or the network), so the event loop runs them on the worker pool
+    blocking = True
+
+    def __init__(self):
+        # acquire()'s callers still waiting, and the thread retrying for them
+        self._waiting = []
+        self._waiting_lock = threading.Lock()
+        self._poller = None
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def set(self, key, value, ttl=None, nx=False):
+        """Store `value` (bytes, str or int), expiring after `ttl` seconds; with nx only if `key` is unset"""
+        raise NotImplementedError
+
+    def delete(self, key, value=None):
+        """Delete `key`, only while it holds `value` when given; returns whether it was deleted"""
+        raise NotImplementedError
+
+    def incr(self, key, ttl=None):
+        """Add one to the counter at `key` (created with expiry `ttl`) and return the new count"""
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def _try_lock(self, key, ttl):
+        token = uuid.uuid4().hex
+        return token if self.set(f"lock:{key}", token, ttl, nx=True) else None
+
+    def _unlock(self, key, token):
+        if token is not None:
+            self.delete(f"lock:{key}", token)
+
+    @contextmanager
+    def lock(self, key, ttl=SHARED_LOCK_TTL):
+        """
+        Hold `key`'s lock for the block, so one caller across all workers does
+        the work behind it at a time; the others wait for it and then find its
+        result cached. Yields whether the lock is held: a caller that waited
+        `ttl` seconds runs without it.
+        """
+        deadline = time.monotonic() + ttl
+        token = self._try_lock(key, ttl)
+        while token is None and time.monotonic() < deadline:
+            time.sleep(_POLL_INTERVAL)
+            token = self._try_lock(key, ttl)
+        try:
+            yield token is not None
+        finally:
+            self._unlock(key, token)
+
+    @asynccontextmanager
+    async def lock_async(self, key, ttl=SHARED_LOCK_TTL):
+        """
+        lock() for the event loop: waits without blocking other tasks, and
+        each attempt on a blocking store runs on the worker pool
+        """
+        deadline = time.monotonic() + ttl
+        token = await self._try_lock_async(key, ttl)
+        while token is None and time.monotonic() < deadline:
+            await asyncio.sleep(_POLL_INTERVAL)
+            token = await self._try_lock_async(key, ttl)
+        try:
+            yield token is not None
+        finally:
+            if token is not None:
+                await self.run_async(self._unlock, key, token)
+
+    async def run_async(self, fn, *args, **kwargs):
+        """Call one of the store's methods from the event loop, on the worker pool if the store can block"""
+        if not self.blocking:
+            return fn(*args, **kwargs)
+        return await run_blocking(fn, *args, **kwargs)
+
+    async def _try_lock_async(self, key, ttl):
+        if not self.blocking:
+            return self._try_lock(key, ttl)
+        attempt = asyncio.ensure_future(run_blocking(self._try_lock, key, ttl))
+        try:
+            return await asyncio.shield(attempt)
+        except asyncio.CancelledError:
+            # The attempt carries on in its thread; give back a lock it takes for a caller that left
+            attempt.add_done_callback(self._release_abandoned(key))
+            raise
+
+    def _release_abandoned(self, key):
+        def release(attempt):
+            if not attempt.cancelled() and attempt.exception() is None and attempt.result() is not None:
+                asyncio.ensure_future(run_blocking(self._unlock, key, attempt.result()))
+        return release
+
+    def acquire(self, key, ttl=SHARED_LOCK_TTL):
+        """
+        lock() for callers that mustn't block a thread while they wait: a
+        Future of the token for unlock(), or of None once `ttl` seconds passed
+        without getting it. Waits are retried on one thread for all callers.
+        """
+        future = Future()
+        token = self._try_lock(key, ttl)
+        if token is not None:
+            future.set_result(token)
+            return future
+        with self._waiting_lock:
+            self._waiting.append((key, ttl, time.monotonic() + ttl, future))
+            if self._poller is None:
+                self._poller = threading.Thread(target=self._poll, name="shared-lock-poller", daemon=True)
+                self._poller.start()
+        return future
+
+    def _poll(self):
+        while True:
+            time.sleep(_POLL_INTERVAL)
+            with self._waiting_lock:
+                waiting = list(self._waiting)
+            done = []
+            for entry in waiting:
+                key, ttl, deadline, future = entry
+                token = self._try_lock(key, ttl)
+                if token is not None or time.monotonic() >= deadline:
+                    done.append(entry)
+                    future.set_result(token)
+            with self._waiting_lock:
+                for entry in done:
+                    self._waiting.remove(entry)
+                if not self._waiting:
+                    self._poller = None
+                    return
+
+    def try_lock(self, key, ttl=SHARED_LOCK_TTL):
+        """Take `key`'s lock without waiting: a token for unlock(), or None if another caller holds it"""
+        return self._try_lock(key, ttl)
+
+    def unlock(self, key, token):
+        self._unlock(key, token)
+
+    def lease(self, key, owner, ttl):
+        """Take or renew `key` for `owner` for `ttl` seconds; False while another owner holds it"""
+        key = f"lease:{key}"
+        if self.set(key, owner, ttl, nx=True):
+            return True
+        if _text(self.get(key)) == owner:
+            self.set(key, owner, ttl)
+            return True
+        return False
+
+    def release(self, key, owner):
+        """Give up `owner`'s lease on `key`"""
+        self.delete(f"lease:{key}", owner)
+
+
+def _text(value):
+    return value.decode() if isinstance(value, bytes) else value
+
+
+class MemoryStore(SharedStore):
+    """The store within one process"""
+
+    blocking = False
+
+    def __init__(self):
+        super().__init__()
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def _live(self, key, now):
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= now:
+            del self._entries[key]
+            return None
+        return entry
+
+    def get(self, key):
+        with self._lock:
+            entry = self._live(key, time.time())
+            return entry[0] if entry is not None else None
+
+    def set(self, key, value, ttl=None, nx=False):
+        now = time.time()
+        with self._lock:
+            if nx and self._live(key, now) is not None:
+                return False
+            self._entries[key] = (value, now + ttl if ttl else None)
+            return True
+
+    def delete(self, key, value=None):
+        with self._lock:
+            entry = self._live(key, time.time())
+            if entry is None or (value is not None and entry[0] != value):
+                return False
+            del self._entries[key]
+            return True
+
+    def incr(self, key, ttl=None):
+        now = time.time()
+        with self._lock:
+            entry = self._live(key, now)
+            count = (entry[0] if entry is not None else 0) + 1
+            self._entries[key] = (count, entry[1] if entry is not None else (now + ttl if ttl else None))
+            return count
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SqliteStore(SharedStore):
+    """
+    The store in a SQLite file, for worker processes on one host (the local
+    stand-in for Redis). Each command is a single statement, so it is atomic
+    across processes.
+    """
+
+    def __init__(self, path=SHARED_CACHE_PATH):
+        super().__init__()
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS shared (
+                key TEXT PRIMARY KEY,
+                value BLOB,
+                expires_at REAL
+            )
+        """)
+        self._purged_at = 0.0
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM shared WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (key, time.time())
+            ).fetchone()
+        return row[0] if row is not None else None
+
+    def set(self, key, value, ttl=None, nx=False):
+        now = time.time()
+        expires_at = now + ttl if ttl else None
+        query = ("INSERT INTO shared (key, value, expires_at) VALUES (?, ?, ?) "
+                 "ON CONFLICT (key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at")
+        params = [key, value, expires_at]
+        if nx:
+            query += " WHERE shared.expires_at IS NOT NULL AND shared.expires_at <= ?"
+            params.append(now)
+        with self._lock:
+            stored = self._conn.execute(query, params).rowcount > 0
+            self._purge(now)
+        return stored
+
+    def delete(self, key, value=None):
+        query = "DELETE FROM shared WHERE key = ?"
+        params = [key]
+        if value is not None:
+            query += " AND value = ?"
+            params.append(value)
+        with self._lock:
+            return self._conn.execute(query, params).rowcount > 0
+
+    def incr(self, key, ttl=None):
+        now = time.time()
+        with self._lock:
+            (count,) = self._conn.execute(
+                "INSERT INTO shared (key, value, expires_at) VALUES (?, 1, ?) "
+                "ON CONFLICT (key) DO UPDATE SET "
+                "value = CASE WHEN shared.expires_at <= ? THEN 1 ELSE shared.value + 1 END, "
+                "expires_at = CASE WHEN shared.expires_at <= ? THEN excluded.expires_at ELSE shared.expires_at END "
+                "RETURNING value",
+                (key, now + ttl if ttl else None, now, now)
+            ).fetchone()
+        return count
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM shared")
+
+    def _purge(self, now):
+        if now - self._purged_at >= _PURGE_INTERVAL:
+            self._purged_at = now
+            self._conn.execute("DELETE FROM shared WHERE expires_at <= ?", (now,))
+
+
+class RedisStore(SharedStore):
+    """The store on a Redis (or Redis-compatible) server, for workers on several hosts"""
+
+    _DELETE_IF = "if redis.call('GET', KEYS[1]) == ARGV[1] then return redis.call('DEL', KEYS[1]) end return 0"
+    _INCR = ("local n = redis.call('INCR', KEYS[1]) "
+             "if n == 1 and tonumber(ARGV[1]) > 0 then redis.call('PEXPIRE', KEYS[1], ARGV[1]) end return n")
+
+    def __init__(self, url, prefix=SHARED_CACHE_PREFIX):
+        # Only deployments that point SHARED_CACHE_URL at Redis need the client installed
+        import redis
+
+        super().__init__()
+        self.url = url
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+        self._delete_if = self._client.register_script(self._DELETE_IF)
+        self._incr = self._client.register_script(self._INCR)
+
+    def get(self, key):
+        return self._client.get(self.prefix + key)
+
+    def set(self, key, value, ttl=None, nx=False):
+        return bool(self._client.set(self.prefix + key, value, px=int(ttl * 1000) if ttl else None, nx=nx))
+
+    def delete(self, key, value=None):
+        if value is None:
+            return bool(self._client.delete(self.prefix + key))
+        return bool(self._delete_if(keys=[self.prefix + key], args=[value]))
+
+    def incr(self, key, ttl=None):
+        return int(self._incr(keys=[self.prefix + key], args=[int(ttl * 1000) if ttl else 0]))
+
+    def clear(self):
+        # Only this service's keys: the database may be shared with other applications
+        batch = []
+        for key in self._client.scan_iter(match=self.prefix + "*", count=500):
+            batch.append(key)
+            if len(batch) == 500:
+                self._client.unlink(*batch)
+                batch = []
+        if batch:
+            self._client.unlink(*batch)
+
+
+def open_store(url=None):
+    """The store SHARED_CACHE_URL (or `url`) names"""
+    url = SHARED_CACHE_URL if url is None else url
+    if not url:
+        url = "memory" if WEB_CONCURRENCY == 1 else SHARED_CACHE_PATH
+    if url == "memory":
+        return MemoryStore()
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisStore(url)
+    return SqliteStore(url)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_shared_cache():
+    """Shared store instance, opened on first use"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = open_store()
+    return _store
@@ -0,0 +1,177 @@
+import argparse
+import codecs
+import random
+import re
+import time
+from functools import lru_cache
+
+# "word" matches whole words, "stem" also matches a keyword's stem followed
+# by a common inflection (teacher ~ teach, teaches, teaching), "substring"
+# keeps the original `keyword in text` semantics
+MATCHER_MODES = ("word", "stem", "substring")
+
+_SUFFIXES = ("ations", "ation", "ments", "ment", "ings", "ing", "ies", "ers", "er", "es", "ed", "ly", "s")
+# What may follow a stem in "stem" mode; anything longer ("tech" -> "techniques") is another word
+_INFLECTIONS = ("", "s", "es", "ed", "ing", "er", "ers")
+
+# ASCII word characters kept, everything else a space
+_WORD_BYTES = bytes(b if chr(b).isalnum() or b == 0x5F else 0x20 for b in range(256))
+
+
+def _replace_non_ascii(error):
+    # Non-ASCII letters stay word characters ("_"), anything else separates words
+    chars = error.object[error.start:error.end]
+    return "".join("_" if ch.isalnum() else " " for ch in chars), error.end
+
+
+codecs.register_error("topic_matcher", _replace_non_ascii)
+
+
+def tokenize(text):
+    """
+    Lowercased `text` as ASCII bytes in which words (runs of \\w characters)
+    are separated by spaces only, framed by a space on either side
+    """
+    return b" " + text.lower().encode("ascii", "topic_matcher").translate(_WORD_BYTES) + b" "
+
+
+def _alternative(lead, tails):
+    # Words may be separated by any number of spaces in tokenized text
+    pattern = b" +".join(re.escape(word) for word in lead.split(b" "))
+    if tails != {b""}:
+        pattern += b"(?:" + b"|".join(re.escape(t) for t in sorted(tails, key=len, reverse=True)) + b")"
+    return pattern
+
+
+def stem(word):
+    """Crude suffix stripping; only needs to map related forms onto a shared prefix"""
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 4:
+            return word[:-len(suffix)]
+    return word
+
+
+class TopicMatcher:
+    """
+    All of a topic's keywords compiled into one regex over tokenized text, so
+    an article is scanned once instead of once per keyword. With words only
+    ever separated by spaces, each alternative starts with a literal space,
+    which the regex engine can skip to directly instead of testing a word
+    boundary at every position. A multi-word keyword matches its words in
+    sequence, whatever separated them in the text.
+    """
+
+    def __init__(self, keywords, mode="word"):
+        if mode not in MATCHER_MODES:
+            raise ValueError(f"mode must be one of: {', '.join(MATCHER_MODES)}")
+        self.keywords = tuple(dict.fromkeys(k.lower() for k in keywords if k))
+        self.mode = mode
+
+        if mode == "substring":
+            self._lookup = None
+            # Longest first so "technology" wins over "tech"
+            alternatives = "|".join(re.escape(k) for k in sorted(self.keywords, key=len, reverse=True))
+            self._pattern = re.compile(f"({alternatives})") if alternatives else None
+            return
+
+        # Every matching form (words joined by single spaces) -> its keywords, and the
+        # endings allowed after each form's leading part
+        self._lookup = {}
+        endings = {}
+        for keyword in self.keywords:
+            words = tokenize(keyword).split()
+            if not words:
+                continue
+            last = words[-1]
+            head = stem(last.decode()).encode() if mode == "stem" else last
+            tails = {last[len(head):]}
+            if mode == "stem":
+                tails.update(inflection.encode() for inflection in _INFLECTIONS)
+            lead = b" ".join(words[:-1] + [head])
+            endings.setdefault(lead, set()).update(tails)
+            for tail in tails:
+                self._lookup.setdefault(lead + tail, []).append(keyword)
+
+        alternatives = b"|".join(_alternative(lead, tails) for lead, tails in endings.items())
+        self._pattern = re.compile(b" (" + alternatives + b")(?= )") if alternatives else None
+
+    def matches(self, text):
+        if self._pattern is None:
+            return False
+        if self._lookup is None:
+            return self._pattern.search(text.lower()) is not None
+        return self._pattern.search(tokenize(text)) is not None
+
+    def matched_keywords(self, text):
+        """Keywords found in `text`, in keyword order"""
+        if self._pattern is None:
+            return []
+        if self._lookup is None:
+            found = set(self._pattern.findall(text.lower()))
+        else:
+            found = set()
+            for form in set(self._pattern.findall(tokenize(text))):
+                found.update(self._lookup[b" ".join(form.split())])
+        return [k for k in self.keywords if k in found]
+
+
+@lru_cache(maxsize=256)
+def compile_matcher(keywords, mode="word"):
+    """Shared matcher for a keyword tuple, compiled once per topic and mode"""
+    return TopicMatcher(keywords, mode)
+
+
+_FILLER = (
+    "the a said report market people week new plans city company year government police "
+    "game season music film data state officials announced thursday biotech techniques"
+).split()
+
+
+def _synthetic_corpus(entries, seed=0):
+    """Title + summary sized texts; about one in seven mentions a topic word"""
+    from bench_servers import VOCABULARY
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(entries):
+        words = [rng.choice(_FILLER) + rng.choice(("", "", ",", ".")) for _ in range(rng.randint(20, 60))]
+        if rng.random() < 0.15:
+            words[rng.randrange(len(words))] = rng.choice(VOCABULARY).title()
+        corpus.append(" ".join(words))
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare compiled topic matching with the per-keyword substring loop"
+    )
+    parser.add_argument("--entries", type=int, default=10000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--keywords", default="ai,education,climate,robotics,security,energy,tech,space")
+    args = parser.parse_args()
+
+    corpus = _synthetic_corpus(args.entries)
+    keywords = [k.strip().lower() for k in args.keywords.split(",") if k.strip()]
+
+    def loop(texts):
+        return sum(1 for text in texts if any(keyword in text.lower() for keyword in keywords))
+
+    def compiled(mode):
+        matcher = compile_matcher(tuple(keywords), mode)
+        return lambda texts: sum(1 for text in texts if matcher.matches(text))
+
+    candidates = [("keyword loop", loop)] + [(f"matcher ({mode})", compiled(mode)) for mode in MATCHER_MODES]
+    print(f"{len(corpus)} entries, {len(keywords)} keywords, best of {args.rounds} rounds")
+    baseline = None
+    for name, run in candidates:
+        best = float("inf")
+        for _ in range(args.rounds):
+            started = time.perf_counter()
+            matched = run(corpus)
+            best = min(best, time.perf_counter() - started)
+        baseline = baseline or best
+        print(f"  {name:<22} {matched:>6} matched  {len(corpus) / best:>12,.0f} entries/s  "
+              f"{baseline / best:>5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
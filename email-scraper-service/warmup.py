@@ -0,0 +1,60 @@
+import asyncio
+import os
+import time
+
+from publishers import publisher_registry
+
+# Before the service reports ready (and starts accepting connections), do the first request's
+# one-off work: import the HTTP client and, with STARTUP_WARMUP_FEEDS, fetch every feed into the
+# feed cache; for at most STARTUP_WARMUP_TIMEOUT seconds
+STARTUP_WARMUP = os.getenv("STARTUP_WARMUP", "false").lower() == "true"
+STARTUP_WARMUP_FEEDS = os.getenv("STARTUP_WARMUP_FEEDS", "true").lower() != "false"
+STARTUP_WARMUP_TIMEOUT = float(os.getenv("STARTUP_WARMUP_TIMEOUT", 15))
+
+
+async def warm_up(scrape_async=True, feeds=STARTUP_WARMUP_FEEDS, timeout=STARTUP_WARMUP_TIMEOUT):
+    """
+    Run from the app's lifespan, so uvicorn only reports startup complete
+    afterwards. On the async path the feeds are fetched through the shared
+    session, which leaves its connections open (for ASYNC_HTTP_KEEPALIVE
+    seconds) and its resolver cache filled for the first scrape; the fresh
+    feed cache outlasts both. Whatever isn't done within `timeout` seconds
+    is left to the first request. Returns counts of what was warmed and the
+    seconds taken.
+    """
+    started = time.perf_counter()
+    report = {"feeds": 0}
+    try:
+        await asyncio.wait_for(_warm_up(scrape_async, feeds, report), timeout)
+    except asyncio.TimeoutError:
+        print(f"Warm-up stopped after {timeout:g}s")
+    report["seconds"] = round(time.perf_counter() - started, 3)
+    print(f"Warm-up: fetched {report['feeds']} feeds in {report['seconds']}s")
+    return report
+
+
+async def _warm_up(scrape_async, feeds, report):
+    from async_http import run_blocking
+
+    await run_blocking(_import_client, scrape_async)
+    if not feeds:
+        return
+
+    publishers = publisher_registry.all()
+    if scrape_async:
+        import async_scraper
+
+        async for _ in async_scraper.iter_feeds(publishers):
+            report["feeds"] += 1
+    else:
+        from run_scraper import fetch_feeds_concurrently
+
+        report["feeds"] = len(await run_blocking(fetch_feeds_concurrently, publishers))
+
+
+def _import_client(scrape_async):
+    # The scrape path imports these on first use
+    if scrape_async:
+        import aiohttp
+    else:
+        import requests